@@ -1,25 +1,73 @@
-from typing import Generator
+import os
+from dataclasses import dataclass, asdict
+from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
- 
-from app.core.db import get_db
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_async_db
 from app.core.security import SECRET_KEY, ALGORITHM
+from app.core.cache import Cache, MemoryCacheBackend
 from app import models
- 
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
-) -> models.User:
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """User yang sedang login, hasil resolve token (id user + id profile sekaligus)."""
+    id: int
+    email: str
+    username: Optional[str] = None
+    profile_id: Optional[int] = None
+
+
+# Key: subject token (email). Ganti `user_cache.backend` untuk memakai backend lain (mis. Redis)
+user_cache = Cache("auth_user", MemoryCacheBackend(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL))
+
+def _subject_key(email: str) -> str:
+    return f"sub:{email}"
+
+def _user_id_key(user_id: int) -> str:
+    return f"uid:{user_id}"
+
+def invalidate_user_cache(user_id: int = None, email: str = None):
+    if email is None and user_id is not None:
+        email = user_cache.backend.get(_user_id_key(user_id))
+    if user_id is not None:
+        user_cache.delete(_user_id_key(user_id))
+    if email is not None:
+        user_cache.delete(_subject_key(email))
+
+
+# Invalidasi otomatis setiap ada perubahan User / Profile lewat ORM
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target):
+    invalidate_user_cache(user_id=target.id, email=target.email)
+
+@event.listens_for(models.Profile, "after_insert")
+@event.listens_for(models.Profile, "after_update")
+@event.listens_for(models.Profile, "after_delete")
+def _invalidate_on_profile_change(mapper, connection, target):
+    invalidate_user_cache(user_id=target.user_id)
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
     try:
         # Decode Token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -28,10 +76,23 @@ def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    # Cari user di Database
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if user is None:
+
+    # Cek cache dulu
+    cached = user_cache.get(_subject_key(email))
+    if cached is not None:
+        return CurrentUser(**cached)
+
+    # Cari user + profile di Database (satu query)
+    result = await db.execute(
+        select(models.User.id, models.User.email, models.User.username, models.Profile.id)
+        .outerjoin(models.Profile, models.Profile.user_id == models.User.id)
+        .where(models.User.email == email)
+    )
+    row = result.first()
+    if row is None:
         raise credentials_exception
-        
-    return user
\ No newline at end of file
+
+    user = CurrentUser(id=row[0], email=row[1], username=row[2], profile_id=row[3])
+    user_cache.set(_subject_key(email), asdict(user))
+    user_cache.set(_user_id_key(user.id), email)
+    return user
@@ -1,19 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session        
-from app.core.db import get_db             
-from app.services.ai_service import AIService
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, delete, insert, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_async_db, AsyncSessionLocal
+from app.services.ai_service import ai_service
+from app.services.response_sanitizer import sanitize_response, render_result, ThinkTagStripper
+from app.services.conversation_store import ConversationStore
+from app.services.profile_service import ProfileService
+from app.services.question_bank import question_bank
+from app.services.competency_status import area_code, get_statuses, record_status
+from app.services.mapping_jobs import mapping_jobs, with_assessment_status, to_response as to_job_response
 from app.schemas import ai_schema
 from app.api import deps
 from app import models
 from datetime import date, datetime
-from typing import List
-import re 
+from typing import List, Optional
+import hashlib
 import json  
+import logging
+import os
 
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ai", tags=["AI Integration"])
-ai_service = AIService()
+profile_service = ProfileService()
 SYSTEM_PROMPT_TEXT = """Anda adalah interviewer dari platform talenta digital Diploy khusus Area Fungsi. Tugas Anda adalah menggali detail kompetensi talenta berdasarkan data awal yang diberikan, meluruskan jawaban yang kurang relevan, dan memastikan informasi yang terkumpul cukup tajam untuk pemetaan Area Fungsi dan Level Okupasi. Gunakan bahasa Indonesia yang baik dan benar, tetap profesional, dan jangan menggunakan bahasa gaul atau singkatan informal."""
 
+# Prefix ChatML per sesi interview, supaya tiap giliran cukup menambahkan percakapan terbaru
+conversation_store = ConversationStore(system_prompt=SYSTEM_PROMPT_TEXT)
+
+# Lama /ai/mapping (sinkron) menunggu job selesai, dan interval heartbeat SSE status job (detik)
+MAPPING_SYNC_TIMEOUT = float(os.getenv("MAPPING_SYNC_TIMEOUT", "600"))
+MAPPING_EVENTS_HEARTBEAT = float(os.getenv("MAPPING_EVENTS_HEARTBEAT", "15"))
+
+# Ukuran halaman /ai/history (default cukup untuk satu sesi interview utuh)
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "200"))
+HISTORY_PAGE_MAX = int(os.getenv("HISTORY_PAGE_MAX", "500"))
+
 
 # --- MAPPING AREA ---
 AREA_MAPPING = {
@@ -26,30 +48,6 @@ AREA_MAPPING = {
 }
 
 # --- HELPER FUNCTIONS ---
-def build_chatml_prompt(system_prompt: str, history_logs: list, current_input: str) -> str:
-    """
-    Menyusun prompt panjang dengan format ChatML:
-    <|im_start|>system
-    ...
-    <|im_end|>
-    <|im_start|>user
-    ...
-    <|im_end|>
-    ...
-    """
-    # 1. Mulai dengan System Prompt
-    full_prompt = f"<|im_start|>system\n{system_prompt}\n<|im_end|>\n"
- 
-    for log in history_logs:
-        # User turn lama
-        full_prompt += f"\n<|im_start|>user\n{log.user_prompt}\n<|im_end|>\n" 
-        ai_resp = clean_think_tag(log.ai_response) 
-        full_prompt += f"\n<|im_start|>assistant\n{ai_resp}\n<|im_end|>\n"
- 
-    full_prompt += f"\n<|im_start|>user\n{current_input}\n\nData konteks terkait kompetensi:\n{{context}}\n<|im_end|>\n\n<|im_start|>assistant"
-    
-    return full_prompt
-
 def calculate_duration(start_date: date, end_date: date = None):
     if not start_date:
         return "0 tahun 0 bulan 0 hari"
@@ -129,36 +127,85 @@ def format_profile_for_ai(user: models.User, profile: models.Profile, educations
     
     return prompt_text
 
-def clean_think_tag(text: str) -> str:
-    if not text:
-        return ""
-    
-    # 1. Cari tag <RESULT> di teks ASLI (sebelum dibersihkan)
-    result_match = re.search(r'<RESULT>.*?</RESULT>', text, flags=re.DOTALL)
-    result_content = result_match.group(0) if result_match else None
-    
-    # 2. Hapus <think>...</think> beserta isinya
-    cleaned = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL)
-    
-    # 3. Logic Penyelamatan: Kembalikan RESULT jika hilang
-    if result_content and "<RESULT>" not in cleaned:
-        cleaned = cleaned.strip() + "\n\n" + result_content
-        
-    return cleaned.strip()
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
+async def save_interview_log(db: AsyncSession, user_id: int, user_prompt: str, ai_response: str,
+                             result_payload: dict | None = None) -> models.InterviewLog:
+    new_log = models.InterviewLog(
+        user_id=user_id,
+        user_prompt=user_prompt,
+        ai_response=ai_response,
+        result_payload=result_payload
+    )
+    db.add(new_log)
+    await db.commit()
+    # Log tepat sebelumnya di DB, supaya cache percakapan hanya disambung kalau urutannya cocok
+    previous_log_id = await db.scalar(select(func.max(models.InterviewLog.id)).where(
+        models.InterviewLog.user_id == user_id, models.InterviewLog.id < new_log.id
+    ))
+    conversation_store.append(user_id, new_log.id, previous_log_id, user_prompt, ai_response)
+    return new_log
+
+async def _save_interview_log(user_id: int, user_prompt: str, ai_response: str, result_payload: dict | None):
+    # Session sendiri karena dipanggil setelah response streaming dimulai
+    async with AsyncSessionLocal() as db:
+        await save_interview_log(db, user_id, user_prompt, ai_response, result_payload)
+
+async def stream_interview_reply(user_id: int, user_prompt: str, full_prompt: str):
+    """
+    Relay token dari AI service sebagai Server-Sent Events.
+    Event: `token` (potongan teks bersih), `done` (jawaban final, sudah tersimpan), `error`.
+    """
+    # Kirim sesuatu segera supaya header + byte pertama langsung sampai ke client
+    yield ": stream-open\n\n"
+
+    stripper = ThinkTagStripper()
+    try:
+        async for chunk in ai_service.stream_interview_reply(full_prompt):
+            text = stripper.feed(chunk)
+            if text:
+                yield _sse_event("token", {"text": text})
+        tail = stripper.finish()
+        if tail:
+            yield _sse_event("token", {"text": tail})
+    except HTTPException as e:
+        error = {"status_code": e.status_code, "detail": e.detail}
+        if e.headers and "Retry-After" in e.headers:
+            error["retry_after"] = int(e.headers["Retry-After"])
+        yield _sse_event("error", error)
+        return
+
+    sanitized = stripper.sanitized
+    clean_response = sanitized.text
+    await _save_interview_log(user_id, user_prompt, clean_response, sanitized.result)
+
+    yield _sse_event("done", {
+        "success": True,
+        "message": "Interview reply streamed",
+        "data": {"answer": clean_response}
+    })
+
+def _sse_response(generator) -> StreamingResponse:
+    return StreamingResponse(
+        generator,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # --- ENDPOINTS ---
 
 @router.post("/interview/start", response_model=ai_schema.InterviewResponse)
 async def start_interview_session(
-    current_user: models.User = Depends(deps.get_current_user),
-    db: Session = Depends(get_db)
+    stream: bool = False,
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    profile = db.query(models.Profile).filter(models.Profile.user_id == current_user.id).first()
-    # ... (kode query education, experience, dll tetap sama) ...
-    educations = db.query(models.Education).filter(models.Education.profile_id == profile.id).all()
-    experiences = db.query(models.Experience).filter(models.Experience.profile_id == profile.id).all()
-    certifications = db.query(models.Certification).filter(models.Certification.profile_id == profile.id).all()
+    # Profil beserta pendidikan, pengalaman, dan sertifikasi (satu query)
+    profile = await profile_service.get_full_profile(db, current_user.id)
+    educations = profile.educations
+    experiences = profile.experiences
+    certifications = profile.certifications
 
     # Format data diri menjadi string
     user_data_text = format_profile_for_ai(current_user, profile, educations, experiences, certifications)
@@ -166,29 +213,24 @@ async def start_interview_session(
     final_user_input = f"Input pengguna:\n{user_data_text}"
     
     # Reset Session Lama
-    db.query(models.InterviewLog).filter(models.InterviewLog.user_id == current_user.id).delete()
-    db.commit()
+    await db.execute(delete(models.InterviewLog).where(models.InterviewLog.user_id == current_user.id))
+    await db.commit()
  
-    full_prompt_payload = build_chatml_prompt(
-        system_prompt=SYSTEM_PROMPT_TEXT,
-        history_logs=[], # Belum ada history karena ini sesi baru
-        current_input=final_user_input
-    )
+    # Belum ada history karena ini sesi baru
+    conversation = conversation_store.reset(current_user.id)
+    full_prompt_payload = conversation.build_prompt(final_user_input)
+
+    if stream:
+        return _sse_response(stream_interview_reply(current_user.id, final_user_input, full_prompt_payload))
 
     # Kirim ke AI Service (hanya prompt string)
     ai_result = await ai_service.get_interview_reply(prompt=full_prompt_payload)
     
-    clean_response = clean_think_tag(ai_result.data.answer)
-    ai_result.data.answer = clean_response
+    sanitized = sanitize_response(ai_result.data.answer)
+    ai_result.data.answer = sanitized.text
     
     # Simpan ke DB (Simpan input aslinya saja, bukan full prompt ChatML, agar history rapi)
-    new_log = models.InterviewLog(
-        user_id=current_user.id,
-        user_prompt=final_user_input,
-        ai_response=clean_response 
-    )
-    db.add(new_log)
-    db.commit()
+    await save_interview_log(db, current_user.id, final_user_input, sanitized.text, sanitized.result)
 
     return ai_result
 
@@ -196,138 +238,209 @@ async def start_interview_session(
 @router.post("/interview", response_model=ai_schema.InterviewResponse)
 async def chat_interview(
     request: ai_schema.InterviewRequest,
-    current_user: models.User = Depends(deps.get_current_user),
-    db: Session = Depends(get_db)
+    stream: bool = False,
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Ambil history chat sebelumnya dari DB
-    past_logs = db.query(models.InterviewLog).filter(
-        models.InterviewLog.user_id == current_user.id
-    ).order_by(models.InterviewLog.created_at.asc()).all()
-     
-    
-    full_prompt_payload = build_chatml_prompt(
-        system_prompt=SYSTEM_PROMPT_TEXT,
-        history_logs=past_logs,
-        current_input=request.prompt
-    )
+    # Prefix ChatML dari history sebelumnya (dibangun ulang dari DB hanya jika belum ada di cache)
+    conversation = await conversation_store.get(db, current_user.id)
+    full_prompt_payload = conversation.build_prompt(request.prompt)
+
+    if stream:
+        return _sse_response(stream_interview_reply(current_user.id, request.prompt, full_prompt_payload))
     
     # Kirim prompt lengkap ke AI Service
     ai_result = await ai_service.get_interview_reply(prompt=full_prompt_payload)
     
-    clean_response = clean_think_tag(ai_result.data.answer)
-    ai_result.data.answer = clean_response
+    sanitized = sanitize_response(ai_result.data.answer)
+    ai_result.data.answer = sanitized.text
     
     # Simpan log baru ke DB (User prompt asli & AI response bersih)
-    new_log = models.InterviewLog(
-        user_id=current_user.id,
-        user_prompt=request.prompt, 
-        ai_response=clean_response
-    )
-    db.add(new_log)
-    db.commit()
+    await save_interview_log(db, current_user.id, request.prompt, sanitized.text, sanitized.result)
     
     return ai_result
 
+def _history_etag(*parts) -> str:
+    return '"' + hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest() + '"'
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
 @router.get("/history", response_model=List[ai_schema.ChatLogResponse])
-def get_chat_history(
-    current_user: models.User = Depends(deps.get_current_user),
-    db: Session = Depends(get_db)
+async def get_chat_history(
+    request: Request,
+    response: Response,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_PAGE_MAX),
+    since: Optional[int] = None,
+    before: Optional[int] = None,
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    logs = db.query(models.InterviewLog).filter(
-        models.InterviewLog.user_id == current_user.id
-    ).order_by(models.InterviewLog.created_at.asc()).all()
-     
-    profile = db.query(models.Profile).filter(models.Profile.user_id == current_user.id).first()
-    latest_status = "Unassessed"
-    
-    if profile: 
-        assessment = db.query(models.AssessmentResult).filter(
-            models.AssessmentResult.profile_id == profile.id
-        ).order_by(models.AssessmentResult.created_at.desc()).first()
-        
-        if assessment: 
-            raw_status = assessment.raw_data.get("status", "Assessed")
-            latest_status = raw_status.capitalize() 
- 
-    cleaned_logs = []
-    for log in logs:
-        if "Berikut data singkat saya" in log.user_prompt:
-            log.user_prompt = "" 
-        
-        if "<RESULT>" in log.ai_response:
-            try:
-                pattern = r"<RESULT>(.*?)</RESULT>"
-                match = re.search(pattern, log.ai_response, re.DOTALL)
-                
-                if match:
-                    json_str = match.group(1)
-                    data = json.loads(json_str)
- 
-                    data['status'] = latest_status
-                    
-                    new_json_str = json.dumps(data)
-                    new_response = re.sub(pattern, f"<RESULT>{new_json_str}</RESULT>", log.ai_response, flags=re.DOTALL)
-                    log.ai_response = new_response
-            except Exception as e:
-                print(f"Error patching status in history: {e}")
-
-        cleaned_logs.append(log)
-            
-    return cleaned_logs
+    """
+    Keyset pagination di (user_id, created_at, id), cursor = id log.
+    - tanpa cursor: `limit` pesan terbaru (urut lama -> baru)
+    - `before`: halaman sebelum log tersebut (scroll ke atas)
+    - `since`: hanya pesan setelah log tersebut (polling pesan baru)
+    Header X-History-Has-More menandai masih ada pesan di arah halaman itu.
+    """
+    if since is not None and before is not None:
+        raise HTTPException(status_code=400, detail="Gunakan salah satu: since atau before")
+
+    Log = models.InterviewLog
+    statuses = await get_statuses(db, current_user.profile_id)
+
+    # Log hanya pernah ditambah / dihapus semua (reset sesi), jadi count + id terbesar cukup sebagai versi
+    total, newest_id = (await db.execute(
+        select(func.count(), func.max(Log.id)).where(Log.user_id == current_user.id)
+    )).one()
+    etag = _history_etag(current_user.id, total, newest_id, sorted(statuses.items()), limit, since, before)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    query = select(Log.id, Log.user_prompt, Log.ai_response, Log.result_payload).where(Log.user_id == current_user.id)
+    cursor = since if since is not None else before
+    if cursor is not None:
+        cursor_exists = await db.scalar(select(Log.id).where(Log.id == cursor, Log.user_id == current_user.id))
+        if cursor_exists is None:
+            raise HTTPException(status_code=410, detail="Cursor history tidak berlaku (sesi interview sudah direset), muat ulang history")
+        # created_at cursor dibandingkan di DB (subquery), bukan dikirim balik dari Python
+        cursor_created = select(Log.created_at).where(Log.id == cursor).scalar_subquery()
+
+    if since is not None:
+        query = query.where(or_(
+            Log.created_at > cursor_created,
+            and_(Log.created_at == cursor_created, Log.id > since)
+        )).order_by(Log.created_at.asc(), Log.id.asc())
+    else:
+        if before is not None:
+            query = query.where(or_(
+                Log.created_at < cursor_created,
+                and_(Log.created_at == cursor_created, Log.id < before)
+            ))
+        query = query.order_by(Log.created_at.desc(), Log.id.desc())
+
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if since is None:
+        rows.reverse()
+
+    logs = []
+    for row in rows:
+        # RESULT sudah di-parse saat disimpan; log lama (sebelum kolom result_payload ada) di-parse di sini
+        payload = row.result_payload
+        if payload is None and "<RESULT>" in row.ai_response:
+            payload = sanitize_response(row.ai_response).result
+        ai_response = row.ai_response
+        if payload is not None:
+            # Status area yang disebut di RESULT, bukan status assessment terakhir area mana pun
+            status = statuses.get(area_code(str(payload.get("area_fungsi", ""))), "unassessed")
+            ai_response = render_result(row.ai_response, payload, status.capitalize())
+        logs.append(ai_schema.ChatLogResponse(
+            id=row.id,
+            user_prompt="" if "Berikut data singkat saya" in row.user_prompt else row.user_prompt,
+            ai_response=ai_response
+        ))
+
+    response.headers.update(headers)
+    response.headers["X-History-Has-More"] = "true" if has_more else "false"
+    return logs
 
 @router.post("/mapping", response_model=ai_schema.MappingResponse)
 async def talent_mapping(
-    current_user: models.User = Depends(deps.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    logs = db.query(models.InterviewLog).filter(
-        models.InterviewLog.user_id == current_user.id
-    ).order_by(models.InterviewLog.created_at.asc()).all()
-    
-    if not logs:
-        full_text = "User belum melakukan interview."
+    # Kompatibel dengan frontend lama: job diproses worker, request ini hanya menunggu hasilnya
+    job = await mapping_jobs.submit(db, current_user.id, current_user.profile_id)
+    job = await mapping_jobs.wait(db, current_user.id, job.id, timeout=MAPPING_SYNC_TIMEOUT)
+    job = await with_assessment_status(db, current_user.profile_id, job)
+
+    if job.status == "done":
+        return job.result
+    if job.status == "failed":
+        raise HTTPException(status_code=job.error_status or 500, detail=job.error)
+    raise HTTPException(
+        status_code=504,
+        detail=f"Mapping masih diproses, cek status di /ai/mapping/jobs/{job.job_id}",
+        headers={"Location": f"/ai/mapping/jobs/{job.job_id}"}
+    )
+
+@router.post("/mapping/jobs", response_model=ai_schema.MappingJobResponse, status_code=202)
+async def submit_mapping_job(
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    job = await mapping_jobs.submit(db, current_user.id, current_user.profile_id)
+    return await with_assessment_status(db, current_user.profile_id, to_job_response(job))
+
+@router.get("/mapping/jobs/{job_id}", response_model=ai_schema.MappingJobResponse)
+async def get_mapping_job(
+    job_id: int,
+    wait: float = 0,
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # wait > 0: long polling, respons dikirim begitu job selesai (maks MAPPING_SYNC_TIMEOUT detik)
+    if wait > 0:
+        job = await mapping_jobs.wait(db, current_user.id, job_id, timeout=min(wait, MAPPING_SYNC_TIMEOUT))
     else:
-        full_text = " ".join([
-            f"User berkata: {log.user_prompt}. AI menjawab: {clean_think_tag(log.ai_response)}." 
-            for log in logs
-        ])
-
-    result = await ai_service.analyze_talent_mapping(full_text)
-     
-    profile = db.query(models.Profile).filter(models.Profile.user_id == current_user.id).first()
-    if profile:
-        assessment_result = db.query(models.AssessmentResult).filter(
-            models.AssessmentResult.profile_id == profile.id
-        ).order_by(models.AssessmentResult.created_at.desc()).first()
-
-        if assessment_result:
-            real_status = assessment_result.raw_data.get("status", "unassessed")
-            if result.data:
-                for area_key, area_data in result.data.items():
-                    if area_data and area_data.level_kompetensi > 0:
-                        area_data.status = real_status
-
-    return result
+        job = to_job_response(await mapping_jobs.get(db, current_user.id, job_id))
+    return await with_assessment_status(db, current_user.profile_id, job)
+
+async def stream_mapping_job(user_id: int, profile_id: int | None, job_id: int):
+    # Sesi DB sendiri: generator berjalan setelah dependency request ditutup
+    async with AsyncSessionLocal() as db:
+        last_status = None
+        while True:
+            job = await mapping_jobs.wait(db, user_id, job_id, timeout=MAPPING_EVENTS_HEARTBEAT)
+            if job.status != last_status:
+                last_status = job.status
+                yield _sse_event("status", {"job_id": job.job_id, "status": job.status})
+            else:
+                yield ": heartbeat\n\n"
+            if job.status == "done":
+                job = await with_assessment_status(db, profile_id, job)
+                yield _sse_event("done", job.model_dump(mode="json"))
+                return
+            if job.status == "failed":
+                yield _sse_event("error", {"status_code": job.error_status or 500, "detail": job.error})
+                return
+
+@router.get("/mapping/jobs/{job_id}/events")
+async def mapping_job_events(
+    job_id: int,
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Subscribe via SSE: event `status` setiap perubahan, lalu `done` (berisi hasil) atau `error`
+    await mapping_jobs.get(db, current_user.id, job_id)
+    return _sse_response(stream_mapping_job(current_user.id, current_user.profile_id, job_id))
  
 @router.post("/questions", response_model=ai_schema.QuestionResponse)
 async def generate_questions(
     request: ai_schema.QuestionRequest,
-    current_user: models.User = Depends(deps.get_current_user)
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
  
     nama_panjang = AREA_MAPPING.get(request.area_fungsi, request.area_fungsi)
-    print(f"🔄 Mapping Area: {request.area_fungsi} -> {nama_panjang}")
+    logger.info("Mapping area %s -> %s", request.area_fungsi, nama_panjang)
     
-    return await ai_service.generate_questions(nama_panjang, request.level_kompetensi)
+    # Diambil acak dari bank soal; AI service hanya dipanggil kalau bank masih kosong
+    return await question_bank.get_questions(db, nama_panjang, request.level_kompetensi)
 
 @router.post("/assessment/submit", response_model=ai_schema.AssessmentResultResponse)
-def submit_assessment(
+async def submit_assessment(
     payload: ai_schema.AssessmentSubmitRequest,
-    current_user: models.User = Depends(deps.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    profile = db.query(models.Profile).filter(models.Profile.user_id == current_user.id).first()
-    if not profile:
+    if not current_user.profile_id:
         raise HTTPException(status_code=404, detail="Profile not found")
 
     total_correct = 0
@@ -356,45 +469,61 @@ def submit_assessment(
     final_score = (total_correct / total_soal) * 100 if total_soal > 0 else 0
     status_assessment = "lulus" if final_score >= 80 else "gagal"
 
-    new_attempt = models.AssessmentAttempt(
-        profile_id=profile.id,
-        status=status_assessment, 
-        submitted_at=datetime.now()
+    # Satu transaksi: attempt (id via RETURNING), semua jawaban dalam satu INSERT multi-row, hasil,
+    # lalu status kompetensi area ini
+    attempt_id = await db.scalar(
+        insert(models.AssessmentAttempt).values(
+            profile_id=current_user.profile_id,
+            status=status_assessment,
+            submitted_at=datetime.now()
+        ).returning(models.AssessmentAttempt.id)
     )
-    db.add(new_attempt)
-    db.commit()
-    db.refresh(new_attempt)
-
-    for p_ans in processed_answers:
-        db_ans = models.AssessmentAnswer(
-            attempt_id=new_attempt.id,
-            question_no=p_ans["question_no"],
-            question_text=p_ans["question_text"],
-            options=p_ans["options"],
-            chosen_option=p_ans["chosen_option"],
-            correct_option=p_ans["correct_option"],
-            is_correct=p_ans["is_correct"]
+
+    if processed_answers:
+        await db.execute(
+            insert(models.AssessmentAnswer).values([
+                {"attempt_id": attempt_id, **p_ans} for p_ans in processed_answers
+            ])
         )
-        db.add(db_ans)
-    
-    new_result = models.AssessmentResult(
-        attempt_id=new_attempt.id,
-        profile_id=profile.id,
-        score=final_score,
-        threshold=80.0, 
-        raw_data={
-            "area": payload.area_fungsi, 
-            "correct": total_correct, 
-            "total": total_soal,
-            "status": status_assessment
-        }
+
+    assessment_id = await db.scalar(
+        insert(models.AssessmentResult).values(
+            attempt_id=attempt_id,
+            profile_id=current_user.profile_id,
+            score=final_score,
+            threshold=80.0,
+            raw_data={
+                "area": payload.area_fungsi,
+                "correct": total_correct,
+                "total": total_soal,
+                "status": status_assessment
+            }
+        ).returning(models.AssessmentResult.id)
+    )
+
+    await record_status(
+        db, current_user.profile_id,
+        area=area_code(payload.area_fungsi) or payload.area_fungsi.strip().upper(),
+        status=status_assessment, score=final_score, assessment_id=assessment_id
     )
-    db.add(new_result)
-    db.commit()
+    await db.commit()
 
     return {
         "success": True, 
         "score": final_score, 
         "status": status_assessment,
         "message": f"Assessment selesai. Status: {status_assessment.upper()} (Skor: {final_score:.2f})"
-    }
\ No newline at end of file
+    }
+
+@router.get("/assessment/status", response_model=List[ai_schema.CompetencyStatusResponse])
+async def get_assessment_status(
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Status assessment terakhir per area milik user
+    if not current_user.profile_id:
+        return []
+    result = await db.execute(select(models.CompetencyStatus).where(
+        models.CompetencyStatus.profile_id == current_user.profile_id
+    ).order_by(models.CompetencyStatus.area_fungsi))
+    return result.scalars().all()
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Any
 
 from app import crud, schemas, models
-from app.api import deps
 from app.core import security
 from app.core.db import get_db  # Ambil dari core/db.py
 from app import models
@@ -13,23 +13,30 @@ from app import models
 router = APIRouter()
 
 @router.post("/login", response_model=schemas.Token)
-def login(
-    db: Session = Depends(deps.get_db),
+async def login(
+    db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     # 1. Cari user di DB
-    user = crud.get_user_by_email(db, email=form_data.username)
+    user = await run_in_threadpool(crud.get_user_by_email, db, form_data.username)
     
-    # 2. Validasi Password
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    # 2. Validasi Password (bcrypt jalan di executor khusus, bukan di worker request)
+    if not user:
         raise HTTPException(status_code=400, detail="Email atau password salah")
+    is_valid, new_hash = await security.password_hasher.verify_and_update(form_data.password, user.hashed_password)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail="Email atau password salah")
+
+    # 2b. Rehash transparan kalau skema / cost factor berubah
+    if new_hash:
+        await run_in_threadpool(crud.update_password_hash, db, user, new_hash)
+        security.PASSWORD_REHASHED.inc()
     
     # 3. Bikin Token
     access_token = security.create_access_token(subject=user.email)
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.post("/register")
-def register(user_in: schemas.UserCreate, db: Session = Depends(deps.get_db)):
+def ensure_unique_registration(db: Session, user_in: schemas.UserCreate):
     # 1. Cek Email Duplikat
     if crud.get_user_by_email(db, email=user_in.email):
         raise HTTPException(
@@ -49,8 +56,14 @@ def register(user_in: schemas.UserCreate, db: Session = Depends(deps.get_db)):
             status_code=400, 
             detail="NIK sudah terdaftar dalam sistem."
         ) 
+
+@router.post("/register")
+async def register(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
+    await run_in_threadpool(ensure_unique_registration, db, user_in)
+
+    hashed_password = await security.password_hasher.hash(user_in.password)
     try:
-        crud.create_user(db, user_in)
+        await run_in_threadpool(crud.create_user, db, user_in, hashed_password)
     except Exception as e:
         # Jaga-jaga kalau ada error database lain
         db.rollback()
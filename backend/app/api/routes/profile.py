@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from app.core.db import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.core.db import get_async_db
 from app.schemas import profile_schema  
 from app.services.profile_service import ProfileService
-from app.api.deps import get_current_user
-from app import models
-from app.core.storage import minio_client, bucket_name # Import MinIO Client
-import uuid
-import os
-import io # Untuk handle file stream
+from app.services.avatar_variants import generate_avatar_variants, remove_avatar_variants
+from app.api.deps import get_current_user, CurrentUser
+from app.core.storage import ( # Import MinIO Client
+    minio_client,
+    bucket_name,
+    stream_upload,
+    presign_upload,
+    confirm_upload,
+    MAX_AVATAR_SIZE,
+    MAX_CERTIFICATION_SIZE,
+    UPLOAD_PRESIGN_EXPIRES,
+)
 from datetime import date
+import logging
 from app.schemas.profile_schema import (
     EducationLevelEnum, 
     GenderEnum, 
@@ -18,6 +26,8 @@ from app.schemas.profile_schema import (
     SKILL_OPTIONS
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/profile",
     tags=["Profile"]
@@ -25,24 +35,40 @@ router = APIRouter(
 
 service = ProfileService()
 
+# Aturan upload per jenis file (dipakai upload multipart maupun presigned)
+UPLOAD_RULES = {
+    profile_schema.UploadKindEnum.AVATAR: dict(
+        folder="avatars",
+        allowed_types=["image/jpeg", "image/png", "image/webp"],
+        max_size=MAX_AVATAR_SIZE,
+        invalid_type_message="Format file harus JPG, PNG, atau WebP",
+    ),
+    profile_schema.UploadKindEnum.CERTIFICATION: dict(
+        folder="certifications",
+        allowed_types=["image/jpeg", "image/png", "application/pdf"],
+        max_size=MAX_CERTIFICATION_SIZE,
+        invalid_type_message="Format file harus JPG, PNG, atau PDF",
+    ),
+}
+
 # --- ENDPOINT UTAMA (GET & UPDATE PROFILE) ---
 
 @router.get("/", response_model=profile_schema.ProfileFullResponse)
-def get_my_profile(
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_my_profile(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    profile = service.get_profile_by_user_id(db, current_user.id)
+    profile = await service.get_full_profile(db, current_user.id)
     profile.email = current_user.email 
     return profile
 
 @router.put("/", response_model=profile_schema.ProfileFullResponse)
-def update_my_profile(
+async def update_my_profile(
     data: profile_schema.ProfileUpdate,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return service.update_profile(db, current_user.id, data)
+    return await service.update_profile(db, current_user.id, data)
 
 # --- CONSTANTS & COMPLETENESS ---
 
@@ -58,11 +84,11 @@ def get_all_constants():
     }
 
 @router.get("/completeness")
-def get_profile_completeness(
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_profile_completeness(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    profile = service.get_profile_by_user_id(db, current_user.id)
+    profile = await service.get_full_profile(db, current_user.id)
     score = 0
     missing_fields = []
 
@@ -97,20 +123,20 @@ def get_profile_completeness(
 # --- SUB-MODULE: EDUCATION ---
 
 @router.post("/education", response_model=profile_schema.EducationResponse)
-def add_education(
+async def add_education(
     data: profile_schema.EducationCreate,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return service.add_education(db, current_user.id, data)
+    return await service.add_education(db, current_user.id, data)
 
 @router.delete("/education/{edu_id}")
-def delete_education(
+async def delete_education(
     edu_id: int,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return service.delete_education(db, current_user.id, edu_id)
+    return await service.delete_education(db, current_user.id, edu_id)
 
 # --- SUB-MODULE: CERTIFICATION (MINIO UPDATED) ---
 
@@ -122,8 +148,8 @@ async def add_certification(
     description: str = Form(..., min_length=5),
     bidang_keahlian: str = Form(...),
     file: UploadFile = File(...),
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # 1. Validasi Tahun
     current_year = date.today().year
@@ -133,40 +159,13 @@ async def add_certification(
             detail=f"Tahun sertifikasi harus antara {current_year - 5} dan {current_year + 5}"
         )
 
-    # 2. Validasi Tipe File
-    allowed_types = ["image/jpeg", "image/png", "application/pdf"]
-    if file.content_type not in allowed_types:
-        raise HTTPException(status_code=400, detail="Format file harus JPG, PNG, atau PDF")
-
-    # 3. Upload ke MinIO
-    try:
-        # Baca file ke memori
-        file_content = await file.read()
-        file_stream = io.BytesIO(file_content)
-        file_size = len(file_content)
-        
-        file_extension = file.filename.split(".")[-1]
-        # Path: certifications/USER_ID_UUID.pdf
-        object_name = f"certifications/{current_user.id}_{uuid.uuid4()}.{file_extension}"
-
-        # Upload
-        minio_client.put_object(
-            bucket_name,
-            object_name,
-            file_stream,
-            length=file_size,
-            content_type=file.content_type
-        )
-
-        # Generate URL Publik
-        endpoint = os.getenv("MINIO_ENDPOINT")
-        # Format: http://IP_VPS:PORT/bucket/certifications/file.pdf
-        file_url = f"http://{endpoint}/{bucket_name}/{object_name}"
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Gagal upload MinIO: {str(e)}")
+    # 2. Validasi Tipe File (dari isi file) + Upload streaming ke MinIO
+    # Path: certifications/USER_ID_UUID.pdf
+    _, file_url = await stream_upload(
+        file, owner_id=current_user.id, **UPLOAD_RULES[profile_schema.UploadKindEnum.CERTIFICATION]
+    )
 
-    # 4. Simpan Data ke Database
+    # 3. Simpan Data ke Database
     cert_data = profile_schema.CertificationCreate(
         name=name,
         organizer=organizer,
@@ -176,102 +175,137 @@ async def add_certification(
         proof_url=file_url
     )
 
-    return service.add_certification(db, current_user.id, cert_data)
+    return await service.add_certification(db, current_user.id, cert_data)
 
 @router.delete("/certification/{cert_id}")
-def delete_certification(
+async def delete_certification(
     cert_id: int,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Ambil data sertifikat dulu untuk dapat URL file
-    cert = service.get_certification(db, current_user.id, cert_id)
+    cert = await service.get_certification(db, current_user.id, cert_id)
     
     # Hapus File di MinIO jika ada URL-nya
     if cert.proof_url:
         try:
             object_name = cert.proof_url.split(f"/{bucket_name}/")[-1]
             
-            minio_client.remove_object(bucket_name, object_name)
+            await run_in_threadpool(minio_client.remove_object, bucket_name, object_name)
         except Exception as e:
-            print(f"Warning: Gagal menghapus file fisik di MinIO: {e}")
+            logger.warning("Gagal menghapus file fisik di MinIO: %s", e)
 
-    return service.delete_certification(db, current_user.id, cert_id)
+    return await service.delete_certification(db, current_user.id, cert_id)
 
 # --- SUB-MODULE: EXPERIENCE ---
 
 @router.post("/experience", response_model=profile_schema.ExperienceResponse)
-def add_experience(
+async def add_experience(
     data: profile_schema.ExperienceCreate,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return service.add_experience(db, current_user.id, data)
+    return await service.add_experience(db, current_user.id, data)
 
 @router.delete("/experience/{exp_id}")
-def delete_experience(
+async def delete_experience(
     exp_id: int,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return service.delete_experience(db, current_user.id, exp_id)
+    return await service.delete_experience(db, current_user.id, exp_id)
 
 # --- SUB-MODULE: AVATAR (MINIO UPDATED) ---
 
 @router.post("/avatar", response_model=profile_schema.ProfileFullResponse)
 async def upload_avatar(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # 1. Validasi Tipe File
-    allowed_types = ["image/jpeg", "image/png", "image/webp"]
-    if file.content_type not in allowed_types:
-        raise HTTPException(status_code=400, detail="Format file harus JPG, PNG, atau WebP")
-
-    # 2. Upload ke MinIO
-    try:
-        file_content = await file.read()
-        file_stream = io.BytesIO(file_content)
-        file_size = len(file_content)
-        
-        file_extension = file.filename.split(".")[-1]
-        # Path: avatars/USER_ID_UUID.jpg
-        object_name = f"avatars/{current_user.id}_{uuid.uuid4()}.{file_extension}"
-
-        minio_client.put_object(
-            bucket_name,
-            object_name,
-            file_stream,
-            length=file_size,
-            content_type=file.content_type
-        )
-
-        endpoint = os.getenv("MINIO_ENDPOINT")
-        file_url = f"http://{endpoint}/{bucket_name}/{object_name}"
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Gagal upload MinIO: {str(e)}")
+    # 1. Validasi Tipe File (dari isi file) + Upload streaming ke MinIO
+    # Path: avatars/USER_ID_UUID.jpg
+    _, file_url = await stream_upload(
+        file, owner_id=current_user.id, **UPLOAD_RULES[profile_schema.UploadKindEnum.AVATAR]
+    )
 
-    # 3. Update Database
+    # 2. Update Database
     update_data = profile_schema.ProfileUpdate(avatar_url=file_url)
-    return service.update_profile(db, current_user.id, update_data)
+    profile = await service.update_profile(db, current_user.id, update_data)
+
+    # 3. Thumbnail dibuat setelah response terkirim
+    background_tasks.add_task(generate_avatar_variants, profile.id, file_url)
+    return profile
 
 @router.delete("/avatar", response_model=profile_schema.ProfileFullResponse)
-def delete_avatar(
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def delete_avatar(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    profile = service.get_profile_by_user_id(db, current_user.id)
+    profile = await service.get_profile_by_user_id(db, current_user.id)
     
     # Hapus File di MinIO
     if profile.avatar_url:
         try:
             # URL: http://IP:PORT/bucket_name/avatars/filename.jpg
             object_name = profile.avatar_url.split(f"/{bucket_name}/")[-1]
-            minio_client.remove_object(bucket_name, object_name)
+            await run_in_threadpool(minio_client.remove_object, bucket_name, object_name)
+            await run_in_threadpool(remove_avatar_variants, object_name)
         except Exception as e:
-            print(f"Warning: Gagal menghapus avatar di MinIO: {e}")
+            logger.warning("Gagal menghapus avatar di MinIO: %s", e)
     
     # Hapus Link di Database
-    return service.remove_avatar(db, current_user.id)
\ No newline at end of file
+    return await service.remove_avatar(db, current_user.id)
+
+# --- SUB-MODULE: UPLOAD LANGSUNG KE MINIO (PRESIGNED URL) ---
+# Browser POST file langsung ke MinIO (presigned post policy), backend hanya menerbitkan policy dan memverifikasi hasilnya.
+# Endpoint multipart di atas tetap ada sebagai fallback.
+
+@router.post("/uploads/presign", response_model=profile_schema.UploadPresignResponse)
+async def presign_profile_upload(
+    data: profile_schema.UploadPresignRequest,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    rules = UPLOAD_RULES[data.kind]
+    object_name, upload_url, fields = await presign_upload(
+        owner_id=current_user.id, content_type=data.content_type, size=data.size, **rules
+    )
+    return profile_schema.UploadPresignResponse(
+        upload_url=upload_url,
+        fields=fields,
+        object_name=object_name,
+        content_type=data.content_type,
+        max_size=rules["max_size"],
+        expires_in=UPLOAD_PRESIGN_EXPIRES,
+    )
+
+@router.post("/uploads/avatar/confirm", response_model=profile_schema.ProfileFullResponse)
+async def confirm_avatar_upload(
+    data: profile_schema.AvatarUploadConfirm,
+    background_tasks: BackgroundTasks,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    _, file_url = await confirm_upload(
+        data.object_name, owner_id=current_user.id, **UPLOAD_RULES[profile_schema.UploadKindEnum.AVATAR]
+    )
+    update_data = profile_schema.ProfileUpdate(avatar_url=file_url)
+    profile = await service.update_profile(db, current_user.id, update_data)
+    background_tasks.add_task(generate_avatar_variants, profile.id, file_url)
+    return profile
+
+@router.post("/uploads/certification/confirm", response_model=profile_schema.CertificationResponse)
+async def confirm_certification_upload(
+    data: profile_schema.CertificationUploadConfirm,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    _, file_url = await confirm_upload(
+        data.object_name, owner_id=current_user.id, **UPLOAD_RULES[profile_schema.UploadKindEnum.CERTIFICATION]
+    )
+    cert_data = profile_schema.CertificationCreate(
+        **data.dict(exclude={"object_name", "proof_url"}),
+        proof_url=file_url
+    )
+    return await service.add_certification(db, current_user.id, cert_data)
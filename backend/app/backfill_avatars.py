@@ -0,0 +1,39 @@
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select
+from app.core.db import SessionLocal
+from app import models
+from app.services.avatar_variants import generate_avatar_variants
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Jalankan: python -m app.backfill_avatars [--workers 4]
+# Aman diulang: avatar yang thumbnail-nya sudah lengkap dilewati.
+
+def backfill(workers: int) -> None:
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(models.Profile.id, models.Profile.avatar_url).where(models.Profile.avatar_url.isnot(None))
+        ).all()
+    finally:
+        db.close()
+
+    logger.info("Memproses %d avatar", len(rows))
+
+    created = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for names in executor.map(generate_avatar_variants, [r.id for r in rows], [r.avatar_url for r in rows]):
+            created += len(names)
+    logger.info("%d thumbnail baru dibuat", created)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Buat thumbnail untuk avatar yang sudah ada")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    backfill(args.workers)
+
+if __name__ == "__main__":
+    main()
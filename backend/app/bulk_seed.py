@@ -0,0 +1,317 @@
+import argparse
+import csv
+import io
+import json
+import logging
+import random
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from faker import Faker
+from sqlalchemy import insert, select
+from app import models
+from app.core.db import engine
+from app.core.security import get_password_hash
+from app.seeder import UNIVERSITIES, MAJORS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Data sintetis dalam jumlah besar untuk benchmark index & query (bukan untuk data demo, pakai initial_data.py).
+# Jalankan (setelah `alembic upgrade head`):
+#   python -m app.bulk_seed --users 100000 --workers 4
+#   python -m app.bulk_seed --users 1000000 --workers 8 --copy      (PostgreSQL: COPY untuk tabel anak)
+# Hasil deterministik untuk kombinasi --seed, --batch-size dan --start yang sama (berapa pun --workers).
+# Password user ke-i: {prefix}{i % --passwords}! (hanya --passwords hash bcrypt yang dihitung).
+
+EDU_LEVELS = ["SMA/SMK", "D3", "D4", "S1", "S2"]
+JOB_TYPES = ["Kerja", "Freelance", "Magang", "Tidak/belum bekerja"]
+AREAS = {
+    "TKTI": "Tata Kelola Teknologi Informasi (IT Governance)",
+    "PPD": "Pengembangan Produk Digital (Digital Product Development)",
+    "DSC": "Sains Data-Kecerdasan Artifisial (Data Science-AI)",
+    "CYBER": "Keamanan Informasi dan Siber",
+    "TI": "Teknologi dan Infrastruktur",
+}
+OPTIONS = {"a": "Pilihan A", "b": "Pilihan B", "c": "Pilihan C", "d": "Pilihan D"}
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+# Diisi per proses oleh _init_worker
+_pools: dict = {}
+_password_hashes: list[str] = []
+_options: argparse.Namespace | None = None
+
+
+def build_pools(seed: int, size: int = 500) -> dict:
+    """Kumpulan nama/kota/perusahaan dari Faker, dibuat sekali lalu dipilih acak per baris (Faker per baris terlalu lambat)."""
+    Faker.seed(seed)
+    fake = Faker("id_ID")
+    return {
+        "first_names": [fake.first_name() for _ in range(size)],
+        "last_names": [fake.last_name() for _ in range(size)],
+        "cities": [fake.city() for _ in range(size)],
+        "addresses": [fake.address().replace("\n", ", ") for _ in range(size)],
+        "companies": [fake.company() for _ in range(size)],
+        "jobs": [fake.job() for _ in range(size)],
+        "sentences": [fake.sentence() for _ in range(size)],
+    }
+
+
+def _init_worker(pools: dict, password_hashes: list[str], options: argparse.Namespace):
+    global _pools, _password_hashes, _options
+    _pools, _password_hashes, _options = pools, password_hashes, options
+    # Koneksi pool warisan dari proses induk tidak boleh dipakai ulang setelah fork
+    engine.dispose(close=False)
+
+
+def _copy_rows(conn, table, rows: list[dict]):
+    # COPY ... FROM STDIN (CSV): jauh lebih cepat dari INSERT untuk tabel anak yang id-nya tidak dibutuhkan
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            json.dumps(value) if isinstance(value, (dict, list)) else value
+            for value in (row[column] for column in columns)
+        ])
+    buffer.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _insert_rows(conn, model, rows: list[dict], returning=None):
+    if not rows:
+        return []
+    if returning is not None:
+        # INSERT multi-row ... RETURNING id, urutan id sama dengan urutan baris
+        result = conn.execute(insert(model).returning(returning, sort_by_parameter_order=True), rows)
+        return result.scalars().all()
+    if _options.copy:
+        _copy_rows(conn, model.__table__, rows)
+    else:
+        conn.execute(insert(model), rows)
+    return []
+
+
+def _created_at(rng: random.Random) -> datetime:
+    return NOW - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86399))
+
+
+def _build_user(rng: random.Random, index: int) -> tuple[dict, dict]:
+    prefix = _options.prefix
+    first, last = rng.choice(_pools["first_names"]), rng.choice(_pools["last_names"])
+    username = f"{prefix}{index:07d}"
+    user = {
+        "username": username,
+        "email": f"{username}@{prefix}.dtp.test",
+        "hashed_password": _password_hashes[index % len(_password_hashes)],
+    }
+    profile = {
+        # 16 digit, unik per (prefix, index)
+        "nik": f"9{zlib.crc32(prefix.encode()) % 100_000:05d}{index:010d}",
+        "full_name": f"{first} {last}",
+        "gender": rng.choice(["Laki-laki", "Perempuan"]),
+        "birth_date": date(rng.randint(1988, 2005), rng.randint(1, 12), rng.randint(1, 28)),
+        "phone": f"08{rng.randint(10**9, 10**10 - 1)}",
+        "address": rng.choice(_pools["addresses"]),
+        "bio": rng.choice(_pools["sentences"]),
+        "linkedin_url": f"https://linkedin.com/in/{username}",
+        "skills": rng.sample(["Python", "SQL", "Excel", "Figma", "Linux", "Docker", "Java", "Power BI"], 3),
+        "created_at": _created_at(rng),
+    }
+    return user, profile
+
+
+def _build_children(rng: random.Random, profile_id: int, user_id: int, rows: dict):
+    for _ in range(rng.randint(1, 2)):
+        level = rng.choice(EDU_LEVELS)
+        is_school = level == "SMA/SMK"
+        rows["educations"].append({
+            "profile_id": profile_id,
+            "level": level,
+            "institution_name": f"SMA {rng.choice(_pools['cities'])}" if is_school else rng.choice(UNIVERSITIES),
+            "major": "IPA/IPS" if is_school else rng.choice(MAJORS),
+            "enrollment_year": rng.randint(2015, 2019),
+            "graduation_year": rng.randint(2020, 2023),
+            "is_current": False,
+            "gpa": None if is_school else f"{rng.uniform(3.0, 4.0):.2f}",
+        })
+
+    for _ in range(rng.randint(0, 2)):
+        is_current = rng.random() < 0.4
+        start = date(rng.randint(2019, 2023), rng.randint(1, 12), 1)
+        rows["experiences"].append({
+            "profile_id": profile_id,
+            "position": rng.choice(_pools["jobs"]),
+            "company_name": rng.choice(_pools["companies"]),
+            "job_type": rng.choice(JOB_TYPES),
+            "functional_area": rng.choice(list(AREAS.values())),
+            "start_date": start,
+            "end_date": None if is_current else start + timedelta(days=rng.randint(90, 900)),
+            "is_current": is_current,
+            "description": rng.choice(_pools["sentences"]),
+        })
+
+    if rng.random() < 0.5:
+        rows["certifications"].append({
+            "profile_id": profile_id,
+            "name": f"Sertifikat {rng.choice(_pools['jobs'])}",
+            "organizer": rng.choice(_pools["companies"]),
+            "year": rng.randint(NOW.year - 4, NOW.year),
+            "bidang_keahlian": rng.choice(list(AREAS.values())),
+            "description": rng.choice(_pools["sentences"]),
+            "proof_url": f"certifications/{profile_id}/dummy.pdf",
+        })
+
+    turns = rng.randint(0, _options.logs_per_user * 2)
+    started = _created_at(rng)
+    area_code = rng.choice(list(AREAS))
+    for turn in range(turns):
+        result = {"area_fungsi": AREAS[area_code], "level": rng.randint(1, 6)} if turn == turns - 1 else None
+        answer = rng.choice(_pools["sentences"])
+        rows["interview_logs"].append({
+            "user_id": user_id,
+            "user_prompt": rng.choice(_pools["sentences"]),
+            "ai_response": f"{answer}\n\n<RESULT>{json.dumps(result)}</RESULT>" if result else answer,
+            "result_payload": result,
+            "created_at": started + timedelta(minutes=turn),
+        })
+
+    if turns and rng.random() < _options.assessment_rate:
+        rows["attempts"].append((profile_id, area_code, started + timedelta(minutes=turns + 5)))
+
+
+def _seed_chunk(chunk: tuple[int, int]) -> dict:
+    start, stop = chunk
+    # Satu Random per chunk (bukan per proses) supaya hasil tidak bergantung pada jumlah worker
+    rng = random.Random(_options.seed * 1_000_003 + start)
+    users, profiles = zip(*(_build_user(rng, index) for index in range(start, stop)))
+    rows = {name: [] for name in ("educations", "experiences", "certifications", "interview_logs", "attempts")}
+
+    with engine.begin() as conn:
+        user_ids = _insert_rows(conn, models.User, list(users), returning=models.User.id)
+        profile_rows = [{**profile, "user_id": user_id} for profile, user_id in zip(profiles, user_ids)]
+        profile_ids = _insert_rows(conn, models.Profile, profile_rows, returning=models.Profile.id)
+
+        for profile_id, user_id in zip(profile_ids, user_ids):
+            _build_children(rng, profile_id, user_id, rows)
+        _insert_rows(conn, models.Education, rows["educations"])
+        _insert_rows(conn, models.Experience, rows["experiences"])
+        _insert_rows(conn, models.Certification, rows["certifications"])
+        _insert_rows(conn, models.InterviewLog, rows["interview_logs"])
+
+        attempts = rows["attempts"]
+        scores = [rng.randint(0, _options.answers_per_attempt) for _ in attempts]
+        attempt_ids = _insert_rows(conn, models.AssessmentAttempt, [
+            {"profile_id": profile_id, "status": "lulus" if correct * 100 >= 80 * _options.answers_per_attempt else "gagal",
+             "started_at": submitted - timedelta(minutes=20), "submitted_at": submitted}
+            for (profile_id, _, submitted), correct in zip(attempts, scores)
+        ], returning=models.AssessmentAttempt.id)
+
+        answers = []
+        for attempt_id, correct in zip(attempt_ids, scores):
+            for number in range(1, _options.answers_per_attempt + 1):
+                is_correct = number <= correct
+                answers.append({
+                    "attempt_id": attempt_id, "question_no": number, "question_text": f"Soal nomor {number}",
+                    "options": OPTIONS, "chosen_option": "Pilihan A" if is_correct else "Pilihan B",
+                    "correct_option": "Pilihan A", "is_correct": is_correct,
+                })
+        _insert_rows(conn, models.AssessmentAnswer, answers)
+
+        results = []
+        for (profile_id, area_code, submitted), attempt_id, correct in zip(attempts, attempt_ids, scores):
+            score = correct * 100 / _options.answers_per_attempt
+            status = "lulus" if score >= 80 else "gagal"
+            results.append({
+                "attempt_id": attempt_id, "profile_id": profile_id, "score": score, "threshold": 80.0,
+                "raw_data": {"area": area_code, "correct": correct, "total": _options.answers_per_attempt,
+                             "status": status},
+                "created_at": submitted,
+            })
+        result_ids = _insert_rows(conn, models.AssessmentResult, results, returning=models.AssessmentResult.id)
+        # Satu attempt per profile, jadi tidak ada konflik (profile, area)
+        _insert_rows(conn, models.CompetencyStatus, [
+            {"profile_id": result["profile_id"], "area_fungsi": result["raw_data"]["area"],
+             "status": result["raw_data"]["status"], "score": result["score"], "assessment_id": result_id,
+             "updated_at": result["created_at"]}
+            for result, result_id in zip(results, result_ids)
+        ])
+
+    counts = {name: len(value) for name, value in rows.items()}
+    counts.update(users=len(user_ids), answers=len(answers))
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate data sintetis skala besar untuk benchmark")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--start", type=int, default=0, help="Index user pertama (untuk menambah data ke run sebelumnya)")
+    parser.add_argument("--batch-size", type=int, default=2_000, help="User per transaksi / chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah proses paralel (PostgreSQL)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--prefix", default="load", help="Awalan username/email data sintetis")
+    parser.add_argument("--passwords", type=int, default=4, help="Jumlah hash password berbeda yang dihitung")
+    parser.add_argument("--logs-per-user", type=int, default=6, help="Rata-rata log interview per user")
+    parser.add_argument("--assessment-rate", type=float, default=0.5, help="Proporsi user yang pernah assessment")
+    parser.add_argument("--answers-per-attempt", type=int, default=10)
+    parser.add_argument("--copy", action="store_true", help="Pakai COPY untuk tabel anak (hanya PostgreSQL)")
+    options = parser.parse_args()
+
+    dialect = engine.dialect.name
+    if options.copy and dialect != "postgresql":
+        parser.error("--copy hanya didukung di PostgreSQL")
+    if options.workers > 1 and dialect == "sqlite":
+        logger.info("SQLite hanya mengizinkan satu penulis, --workers diturunkan ke 1")
+        options.workers = 1
+
+    first_username = f"{options.prefix}{options.start:07d}"
+    with engine.connect() as conn:
+        if conn.scalar(select(models.User.id).where(models.User.username == first_username)):
+            parser.error(f"User {first_username} sudah ada: pakai --start atau --prefix lain")
+
+    started = time.perf_counter()
+    password_hashes = [get_password_hash(f"{options.prefix}{k}!") for k in range(options.passwords)]
+    pools = build_pools(options.seed)
+    chunks = [
+        (start, min(start + options.batch_size, options.start + options.users))
+        for start in range(options.start, options.start + options.users, options.batch_size)
+    ]
+
+    totals: dict[str, int] = {}
+    logger.info("🌱 Seeding %d user dalam %d chunk (%d worker)...", options.users, len(chunks), options.workers)
+    if options.workers > 1:
+        engine.dispose()
+        with ProcessPoolExecutor(options.workers, initializer=_init_worker,
+                                 initargs=(pools, password_hashes, options)) as executor:
+            results = executor.map(_seed_chunk, chunks)
+            for done, counts in enumerate(results, start=1):
+                for name, value in counts.items():
+                    totals[name] = totals.get(name, 0) + value
+                _log_progress(done, len(chunks), totals, started)
+    else:
+        _init_worker(pools, password_hashes, options)
+        for done, chunk in enumerate(chunks, start=1):
+            for name, value in _seed_chunk(chunk).items():
+                totals[name] = totals.get(name, 0) + value
+            _log_progress(done, len(chunks), totals, started)
+
+    if dialect == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("ANALYZE")
+    logger.info("✅ Selesai dalam %.1fs: %s", time.perf_counter() - started,
+                ", ".join(f"{name}={value}" for name, value in sorted(totals.items())))
+
+
+def _log_progress(done: int, total: int, totals: dict, started: float):
+    if done == total or done % 10 == 0:
+        elapsed = time.perf_counter() - started
+        logger.info("  %d/%d chunk, %d user (%.0f user/s)", done, total, totals["users"], totals["users"] / elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import threading
+from typing import Any, Optional
+from cachetools import TTLCache
+from app.core.metrics import registry
+
+CACHE_HITS = registry.counter("cache_hits_total", "Jumlah cache hit per cache")
+CACHE_MISSES = registry.counter("cache_misses_total", "Jumlah cache miss per cache")
+
+
+class CacheBackend:
+    """
+    Interface backend cache. Default-nya in-process (MemoryCacheBackend);
+    backend lain (mis. Redis) cukup mengimplementasikan get/set/delete dengan nilai yang JSON-serializable.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Cache in-process dengan ukuran terbatas dan eviction berbasis TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._data = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = value
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class Cache:
+    def __init__(self, name: str, backend: CacheBackend):
+        self.name = name
+        self.backend = backend
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.backend.get(key)
+        if value is None:
+            CACHE_MISSES.inc(cache=self.name)
+        else:
+            CACHE_HITS.inc(cache=self.name)
+        return value
+
+    def set(self, key: str, value: Any):
+        self.backend.set(key, value)
+
+    def delete(self, key: str):
+        self.backend.delete(key)
+
+    def clear(self):
+        self.backend.clear()
+
+    @property
+    def hits(self) -> int:
+        return int(CACHE_HITS.value(cache=self.name))
+
+    @property
+    def misses(self) -> int:
+        return int(CACHE_MISSES.value(cache=self.name))
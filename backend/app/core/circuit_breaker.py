@@ -0,0 +1,105 @@
+import logging
+import math
+import time
+from contextlib import contextmanager
+from typing import Callable
+from fastapi import HTTPException
+from app.core.metrics import registry
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+logger = logging.getLogger(__name__)
+
+BREAKER_STATE = registry.gauge("circuit_breaker_state", "State circuit breaker (0=closed, 1=open, 2=half_open)")
+BREAKER_TRANSITIONS = registry.counter("circuit_breaker_transitions_total", "Perpindahan state circuit breaker")
+BREAKER_REJECTED = registry.counter("circuit_breaker_rejected_total", "Panggilan yang langsung ditolak karena breaker terbuka")
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker closed -> open -> half_open.
+    - closed: semua panggilan lewat; `failure_threshold` kegagalan berturut-turut membuka breaker.
+    - open: panggilan langsung ditolak 503 (Retry-After = sisa waktu) selama `reset_timeout`.
+    - half_open: maksimal `half_open_probes` panggilan percobaan; sukses menutup, gagal membuka lagi.
+    `is_failure` menentukan exception mana yang dihitung sebagai upstream down; exception lain netral.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float,
+                 is_failure: Callable[[BaseException], bool], half_open_probes: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.is_failure = is_failure
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        BREAKER_STATE.set(STATE_VALUES[CLOSED], breaker=name)
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning("Circuit breaker %s: %s -> %s", self.name, self.state, state)
+        BREAKER_TRANSITIONS.inc(breaker=self.name, from_state=self.state, to_state=state)
+        BREAKER_STATE.set(STATE_VALUES[state], breaker=self.name)
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != HALF_OPEN:
+            self._probes = 0
+        if state == CLOSED:
+            self._failures = 0
+
+    def _reject(self) -> HTTPException:
+        BREAKER_REJECTED.inc(breaker=self.name)
+        remaining = max(1, math.ceil(self._opened_at + self.reset_timeout - time.monotonic()))
+        return HTTPException(
+            status_code=503,
+            detail="AI Service sedang tidak tersedia, silakan coba lagi beberapa saat lagi.",
+            headers={"Retry-After": str(remaining)},
+        )
+
+    def before_call(self):
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                raise self._reject()
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                raise self._reject()
+            self._probes += 1
+
+    def on_success(self):
+        if self.state == HALF_OPEN:
+            self._transition(CLOSED)
+        self._failures = 0
+
+    def on_failure(self):
+        if self.state == HALF_OPEN:
+            self._transition(OPEN)
+            return
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._transition(OPEN)
+
+    def on_neutral(self):
+        # Probe selesai tanpa kesimpulan (mis. error 4xx / dibatalkan): kembalikan slot probe
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    @contextmanager
+    def call(self):
+        self.before_call()
+        try:
+            yield
+        except BaseException as e:
+            if self.is_failure(e):
+                self.on_failure()
+            else:
+                self.on_neutral()
+            raise
+        self.on_success()
@@ -1,23 +1,67 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from contextlib import contextmanager
+from contextvars import ContextVar
 import os
+import time
 from dotenv import load_dotenv
+from app.core.metrics import registry
 
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    pool_recycle=1800
+# Dua engine = dua pool terpisah. Koneksi maksimum per proses:
+#   (DB_POOL_SIZE + DB_MAX_OVERFLOW) + (DB_SYNC_POOL_SIZE + DB_SYNC_MAX_OVERFLOW) = 20 + 10 = 30 (default)
+# dikali jumlah worker uvicorn; totalnya harus tetap di bawah max_connections PostgreSQL (default 100).
+POOL_COMMON = dict(pool_pre_ping=True, pool_recycle=1800)
+
+# Async: hampir semua route (AI, profile, resolve user dari token), worker job mapping, bank soal
+ASYNC_POOL_SETTINGS = dict(
+    pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    **POOL_COMMON
+)
+# Sync: tinggal /login & /register (di threadpool), penanda thumbnail avatar, dan script CLI
+SYNC_POOL_SETTINGS = dict(
+    pool_size=int(os.getenv("DB_SYNC_POOL_SIZE", "5")),
+    max_overflow=int(os.getenv("DB_SYNC_MAX_OVERFLOW", "5")),
+    **POOL_COMMON
 )
 
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **SYNC_POOL_SETTINGS)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def to_async_database_url(url: str) -> str:
+    # postgresql://... -> postgresql+asyncpg://..., sqlite://... -> sqlite+aiosqlite://...
+    scheme, sep, rest = url.partition("://")
+    driver_map = {
+        "postgresql": "postgresql+asyncpg",
+        "postgresql+psycopg2": "postgresql+asyncpg",
+        "postgres": "postgresql+asyncpg",
+        "sqlite": "sqlite+aiosqlite",
+    }
+    return driver_map.get(scheme, scheme) + sep + rest
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_database_url(SQLALCHEMY_DATABASE_URL)
+
+# Engine async untuk route async (AI & profile), supaya query tidak memblok event loop
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **ASYNC_POOL_SETTINGS)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    # Objek tetap bisa dibaca setelah commit tanpa lazy load (tidak didukung di async)
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 def get_db():
@@ -25,4 +69,113 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@contextmanager
+def count_queries(*binds):
+    """Hitung statement SQL yang dieksekusi di dalam blok (untuk cek N+1 / budget query)."""
+    binds = binds or (engine, async_engine.sync_engine)
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for bind in binds:
+        event.listen(bind, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for bind in binds:
+            event.remove(bind, "before_cursor_execute", _before_cursor_execute)
+
+
+# --- METRIK QUERY & POOL ---
+
+DB_QUERY_SECONDS = registry.histogram(
+    "db_query_seconds", "Durasi eksekusi statement SQL per engine & jenis statement",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+DB_POOL_CONNECTIONS = registry.gauge("db_pool_connections", "Koneksi pool database per engine & state")
+DB_POOL_SATURATION = registry.gauge("db_pool_saturation", "Proporsi koneksi terpakai dari kapasitas pool (size + overflow)")
+DB_CONNECTIONS_OPENED = registry.counter("db_connections_opened_total", "Koneksi database baru yang dibuka pool")
+
+QUERY_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+class QueryStats:
+    """Akumulasi query DB untuk satu request (diisi event engine, dibaca middleware metrik)."""
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Ikut tersalin ke threadpool (route sync) dan greenlet engine async, jadi query di keduanya terhitung
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries():
+    """Kumpulkan jumlah & durasi query yang dieksekusi di dalam blok (termasuk yang lewat engine async)."""
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip()[:6].upper()
+    return keyword if keyword in QUERY_OPERATIONS else "OTHER"
+
+
+def _instrument(bind, name: str):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        DB_QUERY_SECONDS.observe(elapsed, engine=name, operation=_operation(statement))
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+    def handle_error(context):
+        # Statement gagal tidak sampai after_cursor_execute; buang waktu mulainya supaya stack tetap sejajar
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    def connect(dbapi_connection, connection_record):
+        DB_CONNECTIONS_OPENED.inc(engine=name)
+
+    event.listen(bind, "before_cursor_execute", before_cursor_execute)
+    event.listen(bind, "after_cursor_execute", after_cursor_execute)
+    event.listen(bind, "handle_error", handle_error)
+    event.listen(bind.pool, "connect", connect)
+
+
+def _collect_pool_metrics():
+    for name, pool, settings in (
+        ("sync", engine.pool, SYNC_POOL_SETTINGS),
+        ("async", async_engine.sync_engine.pool, ASYNC_POOL_SETTINGS),
+    ):
+        if not isinstance(pool, QueuePool):
+            continue
+        checked_out = pool.checkedout()
+        DB_POOL_CONNECTIONS.set(checked_out, engine=name, state="checked_out")
+        DB_POOL_CONNECTIONS.set(pool.checkedin(), engine=name, state="idle")
+        DB_POOL_CONNECTIONS.set(max(pool.overflow(), 0), engine=name, state="overflow")
+        DB_POOL_SATURATION.set(checked_out / (pool.size() + settings["max_overflow"]), engine=name)
+
+
+_instrument(engine, "sync")
+_instrument(async_engine.sync_engine, "async")
+registry.on_collect(_collect_pool_metrics)
@@ -0,0 +1,90 @@
+import logging
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.db import track_queries
+from app.core.metrics import registry
+from app.core.tracing import tracer
+
+HTTP_REQUESTS = registry.counter("http_requests_total", "Request HTTP per route, method & status")
+HTTP_REQUEST_SECONDS = registry.histogram("http_request_seconds", "Durasi request HTTP per route (sampai body selesai dikirim)")
+HTTP_IN_PROGRESS = registry.gauge("http_requests_in_progress", "Request HTTP yang sedang diproses")
+HTTP_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "Jumlah query DB per request",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250),
+)
+HTTP_DB_SECONDS = registry.histogram("http_request_db_seconds", "Total waktu query DB per request")
+
+# Scrape metrik sendiri tidak ikut dihitung
+EXCLUDED_PATHS = {"/metrics"}
+
+# Access log terstruktur (JSON, ikut sampling LOG_SAMPLE_RATE); access log bawaan uvicorn tetap apa adanya
+access_logger = logging.getLogger("app.access")
+
+
+def route_template(scope: Scope) -> str:
+    # Label pakai template route (/ai/mapping/jobs/{job_id}), bukan path mentah, supaya jumlah seri tetap kecil
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI murni (tidak membungkus body seperti BaseHTTPMiddleware, jadi aman untuk SSE):
+    latensi & status per route, query DB per request, span server OpenTelemetry, dan header Server-Timing.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        status_code = 500
+
+        # Header hanya di-decode kalau tracing aktif (untuk membaca traceparent dari client / gateway)
+        carrier = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]} if tracer.enabled else None
+        with track_queries() as stats, tracer.span(
+            method, kind="server", carrier=carrier, **{"http.request.method": method, "url.path": scope["path"]}
+        ) as span:
+
+            async def send_wrapper(message: Message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    # Query yang terjadi sebelum header terkirim (untuk SSE: sebelum stream dimulai)
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", (
+                        f'db;dur={stats.seconds * 1000:.1f};desc="{stats.queries} queries", '
+                        f"app;dur={(time.perf_counter() - started) * 1000:.1f}"
+                    ))
+                await send(message)
+
+            HTTP_IN_PROGRESS.inc(method=method)
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                HTTP_IN_PROGRESS.dec(method=method)
+                route = route_template(scope)
+                elapsed = time.perf_counter() - started
+                HTTP_REQUESTS.inc(route=route, method=method, status=str(status_code))
+                HTTP_REQUEST_SECONDS.observe(elapsed, route=route, method=method)
+                HTTP_DB_QUERIES.observe(stats.queries, route=route, method=method)
+                HTTP_DB_SECONDS.observe(stats.seconds, route=route, method=method)
+                span.update_name(f"{method} {route}")
+                span.set_attribute("http.route", route)
+                span.set_attribute("http.response.status_code", status_code)
+                span.set_attribute("db.query_count", stats.queries)
+                access_logger.info("%s %s %s", method, route, status_code, extra={
+                    "method": method,
+                    "route": route,
+                    "status_code": status_code,
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "db_queries": stats.queries,
+                    "db_ms": round(stats.seconds * 1000, 1),
+                })
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from app.core.metrics import registry
+
+LIMITER_ACTIVE = registry.gauge("concurrency_limiter_active", "Panggilan yang sedang berjalan per limiter")
+LIMITER_QUEUE_DEPTH = registry.gauge("concurrency_limiter_queue_depth", "Panggilan yang sedang antri per limiter")
+LIMITER_WAIT = registry.histogram("concurrency_limiter_wait_seconds", "Waktu antri sebelum mendapat slot")
+LIMITER_REJECTED = registry.counter("concurrency_limiter_rejected_total", "Panggilan yang ditolak (antrian penuh / timeout)")
+
+
+class ConcurrencyLimiter:
+    """
+    Batasi jumlah panggilan bersamaan dengan antrian terbatas (FIFO).
+    Antrian penuh -> 429, menunggu lebih lama dari queue_timeout -> 503, keduanya dengan Retry-After.
+    Tidak memakai asyncio.Semaphore supaya aman dipakai dari event loop mana pun (test client, script).
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _reject(self, status_code: int, reason: str, detail: str) -> HTTPException:
+        LIMITER_REJECTED.inc(limiter=self.name, reason=reason)
+        return HTTPException(status_code=status_code, detail=detail, headers={"Retry-After": str(self.retry_after)})
+
+    def _update_gauges(self):
+        LIMITER_ACTIVE.set(self._active, limiter=self.name)
+        LIMITER_QUEUE_DEPTH.set(len(self._waiters), limiter=self.name)
+
+    async def _acquire(self):
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            LIMITER_WAIT.observe(0.0, limiter=self.name)
+            self._update_gauges()
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject(429, "queue_full", "AI Service sedang penuh, silakan coba lagi beberapa saat lagi.")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Slot sudah diserahkan tepat saat timeout/batal: kembalikan
+                self._release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._update_gauges()
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject(503, "queue_timeout", "AI Service sedang sibuk, silakan coba lagi beberapa saat lagi.")
+            raise
+        finally:
+            LIMITER_WAIT.observe(time.perf_counter() - started, limiter=self.name)
+
+    def _release(self):
+        # Serahkan slot langsung ke antrian terdepan yang masih menunggu
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self._active -= 1
+        self._update_gauges()
+
+    @asynccontextmanager
+    async def acquire(self):
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
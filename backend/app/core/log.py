@@ -0,0 +1,139 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from app.core import request_context
+from app.core.metrics import registry
+
+# Log JSON satu baris per record ke stdout. Format, redaksi, dan I/O dikerjakan thread listener,
+# thread request / event loop hanya memasukkan record ke antrian.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Batas panjang teks per field (prompt, body respons AI, dsb.)
+LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "2000"))
+LOG_REDACT_PII = os.getenv("LOG_REDACT_PII", "True").lower() == "true"
+
+LOG_RECORDS_DROPPED = registry.counter("log_records_dropped_total", "Record log yang dibuang karena antrian penuh")
+LOG_RECORDS_SAMPLED_OUT = registry.counter("log_records_sampled_out_total", "Record log INFO/DEBUG yang tidak ditulis karena sampling")
+
+# Urutan penting: email dulu (bisa berisi angka), lalu NIK 16 digit, lalu nomor HP Indonesia
+PII_PATTERNS = (
+    (re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}"), "[EMAIL]"),
+    (re.compile(r"(?<!\d)\d{16}(?!\d)"), "[NIK]"),
+    (re.compile(r"(?<![\d+])(?:\+62|62|0)8\d{1,3}[\s-]?\d{3,4}[\s-]?\d{3,5}(?!\d)"), "[PHONE]"),
+)
+
+# Atribut bawaan LogRecord; sisanya (dari `extra=`) ditulis sebagai field JSON
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "correlation_id"}
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in PII_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _clean(value, limit: int = LOG_MAX_FIELD_CHARS):
+    """Redaksi PII + potong teks panjang; hanya `limit` karakter pertama yang dipindai (prompt ChatML bisa sangat besar)."""
+    if isinstance(value, (bool, int, float)) or value is None:
+        return value
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False, default=str)
+    length = len(value)
+    # Sisa 32 karakter supaya NIK / nomor HP yang terpotong batas tetap dikenali utuh sebelum dipotong
+    text = value[:limit + 32] if length > limit else value
+    if LOG_REDACT_PII:
+        text = redact(text)
+    if length > limit:
+        text = f"{text[:limit]}...(+{length - limit} karakter)"
+    return text
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": _clean(record.getMessage()),
+        }
+        for key in ("request_id", "correlation_id"):
+            value = getattr(record, key, None)
+            if value:
+                entry[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = _clean(value)
+        if record.exc_info:
+            entry["exc"] = _clean(self.formatException(record.exc_info), LOG_MAX_FIELD_CHARS * 4)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Dijalankan di thread pemanggil: tempel id request (contextvar) dan terapkan sampling per request."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and not request_context.log_sampled():
+            LOG_RECORDS_SAMPLED_OUT.inc()
+            return False
+        record.request_id = request_context.request_id()
+        record.correlation_id = request_context.correlation_id()
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Antrian in-process: record tidak perlu di-pickle / diformat di sini (QueueHandler bawaan memformat
+        # seluruh pesan + traceback di thread pemanggil). Cukup bekukan pesannya karena args bisa berubah.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Lebih baik kehilangan log daripada request menunggu stdout
+            LOG_RECORDS_DROPPED.inc()
+
+
+_listener: QueueListener | None = None
+
+
+def setup_logging():
+    """Pasang handler antrian di root logger (idempoten). Dipanggil sekali saat aplikasi di-import."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+    # Baris "HTTP Request: ..." per panggilan sudah tercakup log upstream di ai_service
+    for name in ("httpx", "httpcore"):
+        logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    # Kosongkan antrian sebelum proses berhenti
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
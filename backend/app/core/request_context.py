@@ -0,0 +1,95 @@
+import os
+import random
+import re
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_ID_HEADER = "X-Request-ID"
+CORRELATION_ID_HEADER = "X-Correlation-ID"
+# Proporsi request yang log INFO/DEBUG-nya ditulis (WARNING ke atas selalu ditulis)
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+
+# Id dari client / gateway hanya dipakai kalau formatnya wajar (tidak bisa dipakai menyuntik isi log)
+_VALID_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+_request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+_correlation_id: ContextVar[str | None] = ContextVar("correlation_id", default=None)
+_log_sampled: ContextVar[bool | None] = ContextVar("log_sampled", default=None)
+
+
+def request_id() -> str | None:
+    return _request_id.get()
+
+
+def correlation_id() -> str | None:
+    return _correlation_id.get()
+
+
+def log_sampled() -> bool:
+    """Keputusan sampling log untuk request aktif; di luar request (worker, script) diundi per record."""
+    sampled = _log_sampled.get()
+    return sampled if sampled is not None else random.random() < LOG_SAMPLE_RATE
+
+
+@contextmanager
+def bind(request_id: str, correlation_id: str | None = None):
+    """Pasang id untuk blok kode (request HTTP, job worker); semua log & panggilan AI di dalamnya ikut membawa id ini."""
+    tokens = (
+        _request_id.set(request_id),
+        _correlation_id.set(correlation_id or request_id),
+        # Satu keputusan per request supaya log satu request tidak terpotong sebagian
+        _log_sampled.set(random.random() < LOG_SAMPLE_RATE),
+    )
+    try:
+        yield
+    finally:
+        _log_sampled.reset(tokens[2])
+        _correlation_id.reset(tokens[1])
+        _request_id.reset(tokens[0])
+
+
+def outgoing_headers() -> dict:
+    # Header untuk panggilan ke service lain (AI service) supaya log kedua sisi bisa disambungkan
+    headers = {}
+    if _request_id.get():
+        headers[REQUEST_ID_HEADER] = _request_id.get()
+    if _correlation_id.get():
+        headers[CORRELATION_ID_HEADER] = _correlation_id.get()
+    return headers
+
+
+def _valid(value: str | None) -> str | None:
+    return value if value and _VALID_ID.match(value) else None
+
+
+class RequestContextMiddleware:
+    """
+    Request id per request (dipakai ulang dari header X-Request-ID kalau valid) dan correlation id
+    (X-Correlation-ID dari client, default = request id). Keduanya dikembalikan di header respons.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]
+                   if k in (b"x-request-id", b"x-correlation-id")}
+        rid = _valid(headers.get("x-request-id")) or uuid.uuid4().hex
+        cid = _valid(headers.get("x-correlation-id")) or rid
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                response_headers[REQUEST_ID_HEADER] = rid
+                response_headers[CORRELATION_ID_HEADER] = cid
+            await send(message)
+
+        with bind(rid, cid):
+            await self.app(scope, receive, send_wrapper)
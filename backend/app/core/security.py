@@ -1,14 +1,43 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
+from typing import Any, Union, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from jose import jwt
 from passlib.context import CryptContext
+from fastapi import HTTPException
+from app.core.metrics import registry
+import asyncio
+import multiprocessing
 import os
- 
-SECRET_KEY = os.getenv("SECRET_KEY", "rahasia_default_kalau_lupa_set_env") 
+import threading
+import time
+
+SECRET_KEY = os.getenv("SECRET_KEY", "rahasia_default_kalau_lupa_set_env")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Skema pertama dipakai untuk hash baru, sisanya dianggap deprecated (di-rehash saat login)
+PASSWORD_SCHEMES = [s.strip() for s in os.getenv("PASSWORD_SCHEMES", "bcrypt").split(",") if s.strip()]
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Executor khusus hashing: "thread" (bcrypt/argon2 melepas GIL) atau "process"
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread").lower()
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+# Maksimal job hashing yang antri + berjalan sebelum request ditolak 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+pwd_context = CryptContext(
+    schemes=PASSWORD_SCHEMES,
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    # Hash dengan cost berbeda dari konfigurasi dianggap perlu di-update
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+PASSWORD_HASH_PENDING = registry.gauge("password_hash_pending", "Job hashing password yang sedang antri/berjalan")
+PASSWORD_HASH_SECONDS = registry.histogram("password_hash_seconds", "Durasi hashing/verifikasi password (termasuk antrian)")
+PASSWORD_HASH_REJECTED = registry.counter("password_hash_rejected_total", "Job hashing yang ditolak karena executor penuh")
+PASSWORD_REHASHED = registry.counter("password_rehashed_total", "Password yang di-rehash saat login karena skema/cost berubah")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -16,8 +45,74 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    # Hash baru dikembalikan jika skema/cost hash lama sudah tidak sesuai konfigurasi
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """Menjalankan hashing/verifikasi password di executor terbatas, di luar event loop & threadpool request."""
+
+    def __init__(self, kind: str = PASSWORD_HASH_EXECUTOR, workers: int = PASSWORD_HASH_WORKERS,
+                 max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    async def _run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                PASSWORD_HASH_REJECTED.inc()
+                raise HTTPException(
+                    status_code=503,
+                    detail="Server sedang sibuk memproses login, silakan coba lagi.",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            PASSWORD_HASH_PENDING.set(self._pending)
+
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            PASSWORD_HASH_SECONDS.observe(time.perf_counter() - started)
+            with self._lock:
+                self._pending -= 1
+                PASSWORD_HASH_PENDING.set(self._pending)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+
+
+password_hasher = PasswordHasher()
+
 def create_access_token(subject: Union[str, Any]) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+from app.core.metrics import registry
+
+T = TypeVar("T")
+
+SINGLEFLIGHT_CALLS = registry.counter("singleflight_calls_total", "Pemanggilan lewat single-flight (leader = panggilan asli, coalesced = ikut menunggu)")
+SINGLEFLIGHT_INFLIGHT = registry.gauge("singleflight_inflight", "Panggilan upstream yang sedang berjalan per grup")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Gabungkan panggilan async yang identik dan sedang berjalan bersamaan menjadi satu.
+    Pemanggil dengan key sama menunggu task yang sama: hasil maupun error diterima semua.
+    Kalau satu pemanggil dibatalkan, task tetap jalan untuk pemanggil lain; task baru
+    dibatalkan kalau semua pemanggilnya sudah pergi.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(func()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task, key=key: self._forget(key, task))
+            SINGLEFLIGHT_CALLS.inc(group=self.name, result="leader")
+            SINGLEFLIGHT_INFLIGHT.set(len(self._calls), group=self.name)
+        else:
+            SINGLEFLIGHT_CALLS.inc(group=self.name, result="coalesced")
+
+        call.waiters += 1
+        try:
+            # shield: batalnya satu pemanggil tidak ikut membatalkan task bersama
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: str, task: asyncio.Task):
+        call = self._calls.get(key)
+        if call is not None and call.task is task:
+            del self._calls[key]
+            SINGLEFLIGHT_INFLIGHT.set(len(self._calls), group=self.name)
+        # Hindari warning "exception was never retrieved" kalau semua pemanggil sudah pergi
+        if not task.cancelled():
+            task.exception()
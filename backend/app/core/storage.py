@@ -1,12 +1,64 @@
 from minio import Minio
+import functools
+import logging
 import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
 from dotenv import load_dotenv
+from minio.commonconfig import ENABLED, CopySource, Filter
+from minio.datatypes import PostPolicy
+from minio.error import S3Error
+from minio.lifecycleconfig import Expiration, LifecycleConfig, Rule
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+from app.core.metrics import registry
+from app.core.tracing import tracer
 
 load_dotenv()
- 
+
+logger = logging.getLogger(__name__)
+
+STORAGE_OPERATION_SECONDS = registry.histogram("storage_operation_seconds", "Latensi operasi MinIO per jenis & hasil")
+
+# Operasi client MinIO yang dipakai aplikasi; get_object diukur sampai header respons (body dibaca pemanggil)
+STORAGE_OPERATIONS = (
+    "bucket_exists", "make_bucket", "put_object", "get_object", "stat_object", "remove_object", "copy_object",
+    "presigned_post_policy", "presigned_get_object", "get_bucket_lifecycle", "set_bucket_lifecycle",
+)
+
+
+def _timed(operation: str):
+    original = getattr(Minio, operation)
+
+    @functools.wraps(original)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            with tracer.span(f"MinIO {operation}", kind="client", **{"storage.operation": operation}):
+                return original(self, *args, **kwargs)
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            STORAGE_OPERATION_SECONDS.observe(time.perf_counter() - started, operation=operation, outcome=outcome)
+
+    return wrapper
+
+
+class InstrumentedMinio(Minio):
+    """Client MinIO yang mencatat latensi setiap operasi (semua pemanggil otomatis terukur)."""
+
+
+for _operation in STORAGE_OPERATIONS:
+    setattr(InstrumentedMinio, _operation, _timed(_operation))
+
+
 is_secure = os.getenv("MINIO_SECURE", "False").lower() == "true"
 
-minio_client = Minio(
+minio_client = InstrumentedMinio(
     os.getenv("MINIO_ENDPOINT"),
     access_key=os.getenv("MINIO_ACCESS_KEY"),
     secret_key=os.getenv("MINIO_SECRET_KEY"),
@@ -14,10 +66,291 @@ minio_client = Minio(
 )
 
 bucket_name = os.getenv("MINIO_BUCKET", "dtp-upload")
- 
+
+# Upload presigned masuk ke prefix ini dulu dan baru dipindah ke folder final saat dikonfirmasi.
+# Yang tidak pernah dikonfirmasi dihapus otomatis oleh lifecycle rule bucket.
+UPLOAD_PENDING_PREFIX = os.getenv("UPLOAD_PENDING_PREFIX", "pending")
+UPLOAD_PENDING_EXPIRE_DAYS = int(os.getenv("UPLOAD_PENDING_EXPIRE_DAYS", "1"))
+PENDING_LIFECYCLE_RULE_ID = "expire-unconfirmed-uploads"
+
+
+def ensure_pending_upload_expiry():
+    """Pasang lifecycle rule untuk prefix pending; rule lain yang sudah ada di bucket tetap dipertahankan."""
+    config = minio_client.get_bucket_lifecycle(bucket_name)
+    rules = [rule for rule in (config.rules if config else []) if rule.rule_id != PENDING_LIFECYCLE_RULE_ID]
+    rules.append(Rule(
+        ENABLED,
+        rule_filter=Filter(prefix=f"{UPLOAD_PENDING_PREFIX}/"),
+        rule_id=PENDING_LIFECYCLE_RULE_ID,
+        expiration=Expiration(days=UPLOAD_PENDING_EXPIRE_DAYS),
+    ))
+    minio_client.set_bucket_lifecycle(bucket_name, LifecycleConfig(rules))
+
+
 try:
     if not minio_client.bucket_exists(bucket_name):
-        print(f"Bucket {bucket_name} tidak ditemukan, membuat baru...")
+        logger.info("Bucket %s tidak ditemukan, membuat baru...", bucket_name)
         minio_client.make_bucket(bucket_name)
+    ensure_pending_upload_expiry()
 except Exception as e:
-    print(f"⚠️ Warning: Gagal konek ke MinIO. Pastikan VPN/SSH Tunnel aktif jika di lokal. Error: {e}")
\ No newline at end of file
+    logger.warning("Gagal konek ke MinIO. Pastikan VPN/SSH Tunnel aktif jika di lokal. Error: %s", e)
+
+# --- STREAMING UPLOAD ---
+
+MiB = 1024 * 1024
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1 * MiB)))
+# MinIO mensyaratkan part multipart minimal 5 MiB
+UPLOAD_PART_SIZE = max(int(os.getenv("UPLOAD_PART_SIZE", str(5 * MiB))), 5 * MiB)
+MAX_AVATAR_SIZE = int(os.getenv("MAX_AVATAR_SIZE", str(2 * MiB)))
+MAX_CERTIFICATION_SIZE = int(os.getenv("MAX_CERTIFICATION_SIZE", str(10 * MiB)))
+# Masa berlaku presigned URL untuk upload langsung dari browser
+UPLOAD_PRESIGN_EXPIRES = int(os.getenv("UPLOAD_PRESIGN_EXPIRES", "900"))
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "application/pdf": "pdf",
+    "image/webp": "webp",
+}
+
+UPLOAD_BYTES = registry.counter("storage_upload_bytes_total", "Total byte yang diupload ke MinIO")
+UPLOAD_SECONDS = registry.histogram("storage_upload_seconds", "Durasi upload ke MinIO")
+UPLOAD_THROUGHPUT = registry.histogram(
+    "storage_upload_throughput_bytes_per_second",
+    "Throughput upload ke MinIO",
+    buckets=(64 * 1024, 256 * 1024, MiB, 4 * MiB, 16 * MiB, 64 * MiB, 256 * MiB),
+)
+UPLOAD_REJECTED = registry.counter("storage_upload_rejected_total", "Upload yang ditolak (tipe/ukuran)")
+PRESIGNED_UPLOADS = registry.counter("storage_presigned_uploads_total", "Presigned upload yang diterbitkan/dikonfirmasi")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def sniff_content_type(head: bytes) -> Optional[Tuple[str, str]]:
+    """Tebak tipe file dari magic bytes di awal file. Return (content_type, ekstensi)."""
+    if head.startswith(b"\xff\xd8\xff"):
+        content_type = "image/jpeg"
+    elif head.startswith(b"\x89PNG\r\n\x1a\n"):
+        content_type = "image/png"
+    elif head.startswith(b"%PDF-"):
+        content_type = "application/pdf"
+    elif head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        content_type = "image/webp"
+    else:
+        return None
+    return content_type, CONTENT_TYPE_EXTENSIONS[content_type]
+
+
+class _SizeLimitedReader:
+    """File-like untuk put_object: chunk pertama yang sudah dibaca + sisa file, gagal kalau melebihi batas."""
+
+    def __init__(self, head: bytes, stream, max_size: int):
+        self._head = head
+        self._stream = stream
+        self.max_size = max_size
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if self._head:
+            if size is None or size < 0 or size >= len(self._head):
+                data, self._head = self._head, b""
+            else:
+                data, self._head = self._head[:size], self._head[size:]
+        else:
+            data = self._stream.read(UPLOAD_CHUNK_SIZE if size is None or size < 0 else min(size, UPLOAD_CHUNK_SIZE))
+
+        self.bytes_read += len(data)
+        if self.bytes_read > self.max_size:
+            raise UploadTooLarge()
+        return data
+
+
+def public_url(object_name: str) -> str:
+    # Format: http://IP_VPS:PORT/bucket/folder/file.ext
+    endpoint = os.getenv("MINIO_ENDPOINT")
+    return f"http://{endpoint}/{bucket_name}/{object_name}"
+
+
+def bucket_upload_url() -> str:
+    # Target form POST (presigned post policy) = URL bucket
+    scheme = "https" if is_secure else "http"
+    return f"{scheme}://{os.getenv('MINIO_ENDPOINT')}/{bucket_name}"
+
+
+async def stream_upload(
+    file: UploadFile,
+    folder: str,
+    owner_id: int,
+    allowed_types: Iterable[str],
+    max_size: int,
+    invalid_type_message: str,
+) -> Tuple[str, str]:
+    """
+    Upload file ke MinIO secara streaming (multipart) di worker thread.
+    Tipe file ditentukan dari isi chunk pertama, bukan dari content_type kiriman client.
+    Return (object_name, public_url).
+    """
+    head = await file.read(UPLOAD_CHUNK_SIZE)
+    sniffed = sniff_content_type(head)
+    if sniffed is None or sniffed[0] not in allowed_types:
+        UPLOAD_REJECTED.inc(folder=folder, reason="type")
+        raise HTTPException(status_code=400, detail=invalid_type_message)
+
+    too_large = HTTPException(status_code=413, detail=f"Ukuran file maksimal {max_size // MiB} MB")
+    if file.size is not None and file.size > max_size:
+        UPLOAD_REJECTED.inc(folder=folder, reason="size")
+        raise too_large
+
+    content_type, extension = sniffed
+    # Path: folder/USER_ID_UUID.ext
+    object_name = f"{folder}/{owner_id}_{uuid.uuid4()}.{extension}"
+    reader = _SizeLimitedReader(head, file.file, max_size)
+
+    started = time.perf_counter()
+    try:
+        await run_in_threadpool(
+            minio_client.put_object,
+            bucket_name,
+            object_name,
+            reader,
+            length=-1,
+            part_size=UPLOAD_PART_SIZE,
+            content_type=content_type,
+        )
+    except UploadTooLarge:
+        UPLOAD_REJECTED.inc(folder=folder, reason="size")
+        raise too_large
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Gagal upload MinIO: {str(e)}")
+
+    elapsed = time.perf_counter() - started
+    UPLOAD_BYTES.inc(reader.bytes_read, folder=folder)
+    UPLOAD_SECONDS.observe(elapsed, folder=folder)
+    if elapsed > 0:
+        UPLOAD_THROUGHPUT.observe(reader.bytes_read / elapsed, folder=folder)
+
+    return object_name, public_url(object_name)
+
+
+# --- PRESIGNED UPLOAD (BROWSER -> MINIO LANGSUNG) ---
+def _owned_prefix(folder: str, owner_id: int) -> str:
+    return f"{UPLOAD_PENDING_PREFIX}/{folder}/{owner_id}_"
+
+
+def _presigned_post_fields(object_name: str, content_type: str, max_size: int) -> Dict[str, str]:
+    # Policy ditandatangani: MinIO sendiri menolak key lain, Content-Type lain, atau ukuran di luar batas
+    policy = PostPolicy(bucket_name, datetime.now(timezone.utc) + timedelta(seconds=UPLOAD_PRESIGN_EXPIRES))
+    policy.add_equals_condition("key", object_name)
+    policy.add_equals_condition("Content-Type", content_type)
+    policy.add_content_length_range_condition(1, max_size)
+    fields = {"key": object_name, "Content-Type": content_type}
+    fields.update(minio_client.presigned_post_policy(policy))
+    return fields
+
+
+async def presign_upload(
+    folder: str,
+    owner_id: int,
+    content_type: str,
+    size: int,
+    allowed_types: Iterable[str],
+    max_size: int,
+    invalid_type_message: str,
+) -> Tuple[str, str, Dict[str, str]]:
+    """
+    Terbitkan presigned POST policy untuk upload langsung ke MinIO (ke prefix pending).
+    Ukuran & Content-Type dikunci di policy; isi file tetap dicek ulang saat konfirmasi.
+    Return (object_name, upload_url, form_fields).
+    """
+    if content_type not in allowed_types:
+        UPLOAD_REJECTED.inc(folder=folder, reason="type")
+        raise HTTPException(status_code=400, detail=invalid_type_message)
+    if size <= 0 or size > max_size:
+        UPLOAD_REJECTED.inc(folder=folder, reason="size")
+        raise HTTPException(status_code=413, detail=f"Ukuran file maksimal {max_size // MiB} MB")
+
+    object_name = f"{_owned_prefix(folder, owner_id)}{uuid.uuid4()}.{CONTENT_TYPE_EXTENSIONS[content_type]}"
+    try:
+        # Bisa memicu lookup region ke MinIO (sekali), jadi dijalankan di worker thread
+        fields = await run_in_threadpool(_presigned_post_fields, object_name, content_type, max_size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Gagal membuat URL upload MinIO: {str(e)}")
+
+    PRESIGNED_UPLOADS.inc(folder=folder, status="issued")
+    return object_name, bucket_upload_url(), fields
+
+
+def _read_head(object_name: str, length: int) -> bytes:
+    response = minio_client.get_object(bucket_name, object_name, offset=0, length=length)
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+
+async def _reject_object(folder: str, object_name: str, reason: str, error: HTTPException):
+    UPLOAD_REJECTED.inc(folder=folder, reason=reason)
+    PRESIGNED_UPLOADS.inc(folder=folder, status="rejected")
+    try:
+        await run_in_threadpool(minio_client.remove_object, bucket_name, object_name)
+    except Exception as e:
+        logger.warning("Gagal menghapus upload yang ditolak di MinIO: %s", e)
+    raise error
+
+
+async def confirm_upload(
+    object_name: str,
+    folder: str,
+    owner_id: int,
+    allowed_types: Iterable[str],
+    max_size: int,
+    invalid_type_message: str,
+) -> Tuple[str, str]:
+    """
+    Verifikasi object hasil presigned upload (pemilik, ukuran, tipe dari isi file), lalu pindahkan
+    dari prefix pending ke folder final. Object yang melanggar batasan langsung dihapus.
+    Return (object_name final, public_url).
+    """
+    prefix = _owned_prefix(folder, owner_id)
+    if not object_name.startswith(prefix) or "/" in object_name[len(prefix):]:
+        raise HTTPException(status_code=403, detail="File upload tidak valid untuk user ini")
+
+    try:
+        stat = await run_in_threadpool(minio_client.stat_object, bucket_name, object_name)
+    except S3Error as e:
+        if e.code in ("NoSuchKey", "NoSuchObject"):
+            raise HTTPException(status_code=404, detail="File belum diupload ke storage")
+        raise HTTPException(status_code=500, detail=f"Gagal cek file di MinIO: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Gagal cek file di MinIO: {str(e)}")
+
+    if stat.size > max_size:
+        await _reject_object(folder, object_name, "size", HTTPException(
+            status_code=413, detail=f"Ukuran file maksimal {max_size // MiB} MB"
+        ))
+
+    head = await run_in_threadpool(_read_head, object_name, 16)
+    sniffed = sniff_content_type(head)
+    # Content-Type yang tersimpan harus sama dengan isi file supaya disajikan dengan benar
+    if sniffed is None or sniffed[0] not in allowed_types or stat.content_type != sniffed[0]:
+        await _reject_object(folder, object_name, "type", HTTPException(
+            status_code=400, detail=invalid_type_message
+        ))
+
+    final_name = object_name[len(UPLOAD_PENDING_PREFIX) + 1:]
+    try:
+        await run_in_threadpool(minio_client.copy_object, bucket_name, final_name, CopySource(bucket_name, object_name))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Gagal memindahkan file di MinIO: {str(e)}")
+    try:
+        await run_in_threadpool(minio_client.remove_object, bucket_name, object_name)
+    except Exception as e:
+        # Tidak fatal: sisa di prefix pending dihapus lifecycle rule
+        logger.warning("Gagal menghapus upload pending di MinIO: %s", e)
+
+    PRESIGNED_UPLOADS.inc(folder=folder, status="confirmed")
+    UPLOAD_BYTES.inc(stat.size, folder=folder)
+    return final_name, public_url(final_name)
@@ -0,0 +1,87 @@
+import logging
+import os
+from contextlib import contextmanager
+
+# Export span OpenTelemetry (opsional) ke collector lokal, mis. OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318
+# Butuh paket tambahan: pip install opentelemetry-sdk opentelemetry-exporter-otlp-proto-http
+# Tanpa endpoint / paket, semua span no-op sehingga tidak ada overhead.
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "dtp-backend")
+
+logger = logging.getLogger(__name__)
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value):
+        pass
+
+    def update_name(self, name: str):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    def __init__(self):
+        self._tracer = None
+        self._provider = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._tracer is not None
+
+    def start(self):
+        if not OTEL_EXPORTER_OTLP_ENDPOINT or self._tracer is not None:
+            return
+        try:
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError as e:
+            logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT diisi tapi paket OpenTelemetry belum terpasang (%s), tracing mati", e.name)
+            return
+
+        provider = TracerProvider(resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+        # Export di thread latar (batch), request tidak menunggu collector
+        exporter = OTLPSpanExporter(endpoint=OTEL_EXPORTER_OTLP_ENDPOINT.rstrip("/") + "/v1/traces")
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+        # Sengaja tidak dijadikan provider global: FastAPI akan ikut membuat span server kedua untuk request yang sama
+        self._provider = provider
+        self._tracer = provider.get_tracer("dtp-backend")
+
+    def shutdown(self):
+        if self._provider is not None:
+            self._provider.shutdown()
+            self._provider = None
+            self._tracer = None
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", carrier: dict | None = None, **attributes):
+        """
+        Span baru (anak dari span aktif). `carrier` = header request masuk (traceparent) untuk span server.
+        Exception di dalam blok otomatis tercatat di span.
+        """
+        if self._tracer is None:
+            yield _NOOP_SPAN
+            return
+        from opentelemetry.propagate import extract
+        from opentelemetry.trace import SpanKind
+
+        context = extract(carrier) if carrier is not None else None
+        with self._tracer.start_as_current_span(
+            name, context=context, kind=SpanKind[kind.upper()], attributes=attributes
+        ) as span:
+            yield span
+
+    def inject(self, headers: dict) -> dict:
+        # Teruskan konteks trace (traceparent) ke service lain, mis. AI service
+        if self._tracer is not None:
+            from opentelemetry.propagate import inject
+            inject(headers)
+        return headers
+
+
+# Instance tunggal, dinyalakan/dimatikan oleh lifespan di app.main
+tracer = Tracer()
@@ -5,9 +5,14 @@ from app.core.security import get_password_hash
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
-def create_user(db: Session, user: schemas.UserCreate):
-    # 1. Hash password
-    hashed_password = get_password_hash(user.password)
+def update_password_hash(db: Session, user: models.User, hashed_password: str):
+    user.hashed_password = hashed_password
+    db.commit()
+
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: str = None):
+    # 1. Hash password (route sudah meng-hash di executor khusus; fallback sync untuk script)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     
     # 2. Buat User Object
     db_user = models.User(
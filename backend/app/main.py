@@ -1,17 +1,46 @@
 from fastapi import FastAPI, Request, status
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import os
-from app.core.db import engine, Base 
+from app.core.log import setup_logging
+
+# Logging JSON non-blocking dipasang sebelum modul lain di-import supaya log saat import ikut terformat
+setup_logging()
+
+from app.core.db import async_engine
+from app.core.http_metrics import MetricsMiddleware
+from app.core.request_context import RequestContextMiddleware
+from app.core.metrics import registry
+from app.core.tracing import tracer
+from app.core.security import password_hasher
 from app.api.main import api_router   
+from app.services.ai_service import ai_service
+from app.services.question_bank import question_bank
+from app.services.mapping_jobs import mapping_jobs
 from app import models               
 
-# Create Tables
-Base.metadata.create_all(bind=engine)
+# Skema database dikelola Alembic: jalankan `alembic upgrade head` sebelum aplikasi start
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Export span OpenTelemetry (hanya jika OTEL_EXPORTER_OTLP_ENDPOINT diisi)
+    tracer.start()
+    # HTTP client ke AI service dipakai ulang selama aplikasi hidup (keep-alive + pooling)
+    ai_service.start()
+    # Worker job talent mapping (antrian di tabel mapping_jobs)
+    mapping_jobs.start()
+    yield
+    await mapping_jobs.stop()
+    await question_bank.aclose()
+    await ai_service.aclose()
+    await async_engine.dispose()
+    password_hasher.shutdown()
+    tracer.shutdown()
 
-app = FastAPI(title="DTP Backend API")
+app = FastAPI(title="DTP Backend API", lifespan=lifespan)
 
 # Setup Folder Uploads
 os.makedirs("uploads/certifications", exist_ok=True)
@@ -35,8 +64,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After", "Location", "X-History-Has-More", "Server-Timing", "X-Request-ID", "X-Correlation-ID"],
 )
 
+# Metrik per route + query DB per request (/metrics) dan span OpenTelemetry; paling luar supaya mencakup CORS
+app.add_middleware(MetricsMiddleware)
+
+# Request id / correlation id per request (log, header respons, header ke AI service); dipasang terakhir = paling luar
+app.add_middleware(RequestContextMiddleware)
+
 # Custom Error Handler (Bahasa Indonesia)
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -88,3 +124,7 @@ app.include_router(api_router)
 @app.get("/")
 def root():
     return {"message": "DTP Backend Modular is Ready!"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
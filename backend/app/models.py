@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Date, Text, Float, DateTime, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Date, Text, Float, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.db import Base
@@ -31,12 +31,19 @@ class Profile(Base):
     address = Column(Text)
     bio = Column(Text)
     avatar_url = Column(String)
+    # Object avatar yang thumbnail-nya sudah lengkap (diisi generate_avatar_variants)
+    avatar_variants_object = Column(String, nullable=True)
     skills = Column(JSON, default=[])
     linkedin_url = Column(String, nullable=True)
     instagram_username = Column(String, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Satu user satu profile; juga dipakai join user -> profile di setiap request
+        Index("ux_profiles_user_id", "user_id", unique=True),
+    )
+
     user = relationship("User", back_populates="profile")
     educations = relationship("Education", back_populates="profile")
     certifications = relationship("Certification", back_populates="profile")
@@ -49,7 +56,7 @@ class Profile(Base):
 class Education(Base):
     __tablename__ = "educations"
     id = Column(Integer, primary_key=True, index=True)
-    profile_id = Column(Integer, ForeignKey("profiles.id"))
+    profile_id = Column(Integer, ForeignKey("profiles.id"), index=True)
     level = Column(String) 
     institution_name = Column(String)
     faculty = Column(String, nullable=True)       # Baru: Fakultas
@@ -66,7 +73,7 @@ class Education(Base):
 class Certification(Base):
     __tablename__ = "certifications"
     id = Column(Integer, primary_key=True, index=True)
-    profile_id = Column(Integer, ForeignKey("profiles.id"))
+    profile_id = Column(Integer, ForeignKey("profiles.id"), index=True)
     
     name = Column(String)
     organizer = Column(String)
@@ -82,7 +89,7 @@ class Certification(Base):
 class Experience(Base):
     __tablename__ = "experiences"
     id = Column(Integer, primary_key=True, index=True)
-    profile_id = Column(Integer, ForeignKey("profiles.id"))
+    profile_id = Column(Integer, ForeignKey("profiles.id"), index=True)
     
     position = Column(String)                     # Jabatan
     company_name = Column(String)                 # Nama Perusahaan
@@ -108,10 +115,39 @@ class Mapping(Base):
     confidence = Column(Float)
     is_revised = Column(Boolean, default=False)
     note = Column(Text)
+    level_kompetensi = Column(Integer, nullable=True)
+    # sha256 transkrip interview yang menghasilkan mapping ini (untuk pakai ulang hasil)
+    transcript_hash = Column(String(64), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     profile = relationship("Profile", back_populates="mappings")
 
+    __table_args__ = (
+        Index("ix_mappings_profile_transcript", "profile_id", "transcript_hash"),
+    )
+
+class MappingJob(Base):
+    __tablename__ = "mapping_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    profile_id = Column(Integer, ForeignKey("profiles.id"), nullable=True)
+
+    # queued -> running -> done / failed
+    status = Column(String, nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    result = Column(JSON, nullable=True)          # MappingResponse lengkap
+    error = Column(Text, nullable=True)
+    error_status = Column(Integer, nullable=True)  # Status HTTP dari AI service (kalau gagal)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_mapping_jobs_status_id", "status", "id"),
+        Index("ix_mapping_jobs_user_status", "user_id", "status"),
+    )
+
 class AssessmentAttempt(Base):
     __tablename__ = "assessment_attempts"
     id = Column(Integer, primary_key=True, index=True)
@@ -152,6 +188,27 @@ class AssessmentResult(Base):
 
     attempt = relationship("AssessmentAttempt", back_populates="result")
 
+    __table_args__ = (
+        # Hasil assessment terbaru per profile (ORDER BY created_at DESC LIMIT 1)
+        Index("ix_assessments_profile_created", "profile_id", "created_at"),
+    )
+
+class CompetencyStatus(Base):
+    """Status assessment terakhir per profile per area, diperbarui di transaksi submit assessment."""
+    __tablename__ = "competency_statuses"
+    id = Column(Integer, primary_key=True, index=True)
+    profile_id = Column(Integer, ForeignKey("profiles.id"), nullable=False)
+
+    area_fungsi = Column(String, nullable=False)   # Kode area: DSC, TKTI, PPD, CYBER, TI, LTI
+    status = Column(String, nullable=False)        # lulus / gagal
+    score = Column(Float)
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ux_competency_statuses_profile_area", "profile_id", "area_fungsi", unique=True),
+    )
+
 class FinalLevel(Base):
     __tablename__ = "final_levels"
     id = Column(Integer, primary_key=True, index=True)
@@ -176,10 +233,39 @@ class InterviewLog(Base):
     
     # Apa yang AI jawab
     ai_response = Column(Text, nullable=False)
+
+    # Isi JSON blok <RESULT> di ai_response, di-parse sekali saat disimpan
+    result_payload = Column(JSON, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relasi ke User
     user = relationship("User", back_populates="logs")
 
- 
\ No newline at end of file
+    __table_args__ = (
+        # History & transkrip selalu dibaca per user urut (created_at, id)
+        Index("ix_interview_logs_user_created", "user_id", "created_at", "id"),
+    )
+
+
+class QuestionBankItem(Base):
+    __tablename__ = "question_bank"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Nama panjang area (yang dikirim ke AI service), bukan kode DSC/TKTI/...
+    area_fungsi = Column(String, nullable=False)
+    level_kompetensi = Column(Integer, nullable=False)
+
+    # sha256 dari isi soal (area, level, soal, opsi, kunci) supaya soal kembar tidak tersimpan dua kali
+    content_hash = Column(String(64), unique=True, nullable=False)
+
+    aspek_kritis = Column(Text)
+    soal = Column(Text, nullable=False)
+    opsi_jawaban = Column(JSON, nullable=False)
+    jawaban_benar = Column(String, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_question_bank_area_level", "area_fungsi", "level_kompetensi"),
+    )
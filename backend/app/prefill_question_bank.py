@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+import logging
+from app.core.db import async_engine
+from app.services.ai_service import ai_service
+from app.services.question_bank import question_bank, QUESTION_POOL_TARGET
+from app.api.routes.ai_integration import AREA_MAPPING
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Jalankan: python -m app.prefill_question_bank --levels 1 2 3
+# Aman diulang: pool yang sudah mencapai target dilewati, soal kembar diabaikan.
+
+async def prefill(levels, target: int) -> None:
+    ai_service.start()
+    try:
+        for area in AREA_MAPPING.values():
+            for level in levels:
+                added = await question_bank.refill(area, level, target=target)
+                logger.info("%s level %d: +%d soal", area, level, added)
+    finally:
+        await ai_service.aclose()
+        await async_engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Isi bank soal assessment untuk semua area fungsi")
+    # Frontend saat ini selalu meminta level 1
+    parser.add_argument("--levels", type=int, nargs="+", default=[1])
+    parser.add_argument("--target", type=int, default=QUESTION_POOL_TARGET)
+    args = parser.parse_args()
+    asyncio.run(prefill(args.levels, args.target))
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Dict, List, Optional
+from datetime import datetime
 
 # --- A. SCHEMA INTERVIEW ---
 class InterviewRequest(BaseModel):
@@ -37,6 +38,16 @@ class MappingResponse(BaseModel):
     success: bool
     message: str
     data: Dict[str, CompetencyLevel] 
+
+class MappingJobResponse(BaseModel):
+    job_id: int
+    status: str  # queued, running, done, failed
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[MappingResponse] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
     
 
 # --- C. SCHEMA QUESTION GENERATION ---
@@ -92,4 +103,13 @@ class AssessmentSubmitRequest(BaseModel):
 class AssessmentResultResponse(BaseModel):
     success: bool
     score: float
-    message: str
\ No newline at end of file
+    message: str
+
+class CompetencyStatusResponse(BaseModel):
+    area_fungsi: str  # Kode area: DSC, TKTI, PPD, CYBER, TI, LTI
+    status: str
+    score: Optional[float] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, EmailStr, field_validator, model_validator
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, computed_field, field_validator, model_validator
+from typing import Optional, List, Dict
 from datetime import date
 from enum import Enum
+from app.services.avatar_variants import variant_urls
 
 
 class GenderEnum(str, Enum):
@@ -193,6 +194,7 @@ class ProfileFullResponse(BaseModel):
     instagram_username: Optional[str] = None
     
     avatar_url: Optional[str] = None
+    avatar_variants_object: Optional[str] = Field(default=None, exclude=True)
     skills: List[str] = [] 
     
     # Nested Objects
@@ -200,5 +202,37 @@ class ProfileFullResponse(BaseModel):
     certifications: List[CertificationResponse] = []
     experiences: List[ExperienceResponse] = []
 
+    # URL thumbnail WebP per ukuran, mis. {"64": ..., "128": ..., "256": ...}
+    # Dibuat di background setelah upload; selama belum selesai isinya {} dan frontend memakai avatar_url
+    @computed_field
+    @property
+    def avatar_variants(self) -> Dict[str, str]:
+        return variant_urls(self.avatar_url, self.avatar_variants_object)
+
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# --- SCHEMAS UNTUK UPLOAD LANGSUNG KE STORAGE (PRESIGNED URL) ---
+class UploadKindEnum(str, Enum):
+    AVATAR = "avatar"
+    CERTIFICATION = "certification"
+
+class UploadPresignRequest(BaseModel):
+    kind: UploadKindEnum
+    content_type: str
+    size: int  # dalam byte
+
+class UploadPresignResponse(BaseModel):
+    upload_url: str     # POST multipart/form-data ke URL ini: semua `fields` dulu, lalu `file` paling akhir
+    fields: Dict[str, str]
+    object_name: str    # Dikirim kembali saat konfirmasi
+    content_type: str
+    max_size: int
+    expires_in: int     # detik
+
+class AvatarUploadConfirm(BaseModel):
+    object_name: str
+
+class CertificationUploadConfirm(CertificationBase):
+    object_name: str
+    proof_url: Optional[str] = None  # Diisi server dari object_name
@@ -1,45 +1,326 @@
+import asyncio
+import hashlib
 import httpx
+import json
+import logging
 import os
+import random
+import time
+from contextlib import contextmanager
 from fastapi import HTTPException
 from dotenv import load_dotenv
 from app.schemas import ai_schema
+from app.core.metrics import registry
+from app.core.singleflight import SingleFlight
+from app.core.limiter import ConcurrencyLimiter
+from app.core.circuit_breaker import CircuitBreaker, OPEN
+from app.core import request_context
+from app.core.tracing import tracer
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# --- KONFIGURASI HTTP CLIENT KE AI SERVICE ---
+AI_CONNECT_TIMEOUT = float(os.getenv("AI_CONNECT_TIMEOUT", "60"))
+AI_POOL_TIMEOUT = float(os.getenv("AI_POOL_TIMEOUT", "30"))
+AI_MAX_CONNECTIONS = int(os.getenv("AI_MAX_CONNECTIONS", "100"))
+AI_MAX_KEEPALIVE = int(os.getenv("AI_MAX_KEEPALIVE", "20"))
+AI_KEEPALIVE_EXPIRY = float(os.getenv("AI_KEEPALIVE_EXPIRY", "30"))
+# HTTP/2 hanya aktif untuk base URL https (httpx tidak melakukan h2c di http biasa)
+AI_HTTP2 = os.getenv("AI_HTTP2", "False").lower() == "true"
+
+# Timeout baca per endpoint (detik)
+AI_ENDPOINT_TIMEOUTS = {
+    "/interview": float(os.getenv("AI_TIMEOUT_INTERVIEW", "300")),
+    "/talent-mapping": float(os.getenv("AI_TIMEOUT_MAPPING", "300")),
+    "/question-generation": float(os.getenv("AI_TIMEOUT_QUESTIONS", "300")),
+}
+AI_DEFAULT_TIMEOUT = 300.0
+
+# Batas panggilan bersamaan ke AI service per endpoint (model hanya satu, jadi antrian dibatasi)
+AI_ENDPOINT_CONCURRENCY = {
+    "/interview": int(os.getenv("AI_CONCURRENCY_INTERVIEW", "8")),
+    "/talent-mapping": int(os.getenv("AI_CONCURRENCY_MAPPING", "2")),
+    "/question-generation": int(os.getenv("AI_CONCURRENCY_QUESTIONS", "2")),
+}
+AI_DEFAULT_CONCURRENCY = int(os.getenv("AI_CONCURRENCY_DEFAULT", "4"))
+# Maksimal panggilan yang antri per endpoint; lebih dari ini langsung 429
+AI_QUEUE_SIZE = int(os.getenv("AI_QUEUE_SIZE", "32"))
+# Lama maksimal menunggu slot sebelum 503 (detik)
+AI_QUEUE_TIMEOUT = float(os.getenv("AI_QUEUE_TIMEOUT", "30"))
+AI_RETRY_AFTER = int(os.getenv("AI_RETRY_AFTER", "10"))
+
+# Circuit breaker: buka setelah N kegagalan berturut-turut, coba lagi (half-open) setelah reset timeout
+AI_BREAKER_FAILURES = int(os.getenv("AI_BREAKER_FAILURES", "5"))
+AI_BREAKER_RESET_TIMEOUT = float(os.getenv("AI_BREAKER_RESET_TIMEOUT", "30"))
+AI_BREAKER_PROBES = int(os.getenv("AI_BREAKER_PROBES", "1"))
+# Retry (exponential backoff + full jitter) untuk panggilan idempotent
+AI_RETRY_ATTEMPTS = int(os.getenv("AI_RETRY_ATTEMPTS", "2"))
+AI_RETRY_BASE_DELAY = float(os.getenv("AI_RETRY_BASE_DELAY", "0.5"))
+AI_RETRY_MAX_DELAY = float(os.getenv("AI_RETRY_MAX_DELAY", "8"))
+
+# --- METRIK ---
+AI_POOL_CONNECTIONS = registry.gauge("ai_http_pool_connections", "Koneksi di pool HTTP ke AI service per state")
+AI_POOL_WAIT = registry.histogram("ai_http_pool_wait_seconds", "Waktu tunggu mendapatkan koneksi dari pool AI")
+AI_CONNECTIONS_OPENED = registry.counter("ai_http_connections_opened_total", "Jumlah koneksi TCP baru ke AI service")
+AI_RETRIES = registry.counter("ai_http_retries_total", "Retry panggilan ke AI service")
+AI_UPSTREAM_SECONDS = registry.histogram(
+    "ai_upstream_seconds", "Latensi panggilan ke AI service per endpoint (tanpa waktu antri limiter)"
+)
+AI_UPSTREAM_FIRST_CHUNK = registry.histogram(
+    "ai_upstream_first_chunk_seconds", "Waktu sampai potongan teks pertama dari AI service (streaming)"
+)
+
+
+def _is_upstream_failure(e: BaseException) -> bool:
+    # Hanya masalah di sisi AI service (koneksi/timeout/5xx) yang dihitung breaker.
+    # PoolTimeout = pool koneksi kita sendiri penuh (lonjakan lokal), bukan tanda AI service bermasalah
+    if isinstance(e, httpx.PoolTimeout):
+        return False
+    if isinstance(e, httpx.TransportError):
+        return True
+    return isinstance(e, httpx.HTTPStatusError) and e.response.status_code >= 500
+
+def _is_retryable(e: BaseException) -> bool:
+    # Read timeout tidak di-retry: AI sudah memproses lama dan kemungkinan besar masih sibuk.
+    # PoolTimeout juga tidak: retry hanya menambah antrian di pool yang sudah penuh
+    if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)):
+        return True
+    return isinstance(e, httpx.HTTPStatusError) and e.response.status_code in (502, 503, 504)
+
+def _backoff_delay(attempt: int) -> float:
+    return random.uniform(0, min(AI_RETRY_MAX_DELAY, AI_RETRY_BASE_DELAY * (2 ** attempt)))
+
+def _to_http_exception(e: Exception) -> HTTPException:
+    if isinstance(e, httpx.RemoteProtocolError):
+        logger.error("AI service putus koneksi mendadak")
+        return HTTPException(status_code=502, detail="AI Service terputus di tengah jalan. Kemungkinan server AI restart/crash.")
+    if isinstance(e, httpx.HTTPStatusError):
+        return HTTPException(status_code=e.response.status_code, detail=f"AI Error: {e.response.text}")
+    logger.error("Gagal menghubungi AI service: %r", e)
+    return HTTPException(status_code=500, detail=f"Gagal menghubungi AI Service (Timeout/Koneksi): {str(e)}")
+
+
 class AIService:
     def __init__(self): 
         self.base_url = os.getenv("TIM_AI_URL", "http://127.0.0.1:5000")
-    
-    async def _post_request(self, endpoint: str, payload: dict):
-        url = f"{self.base_url}{endpoint}"
-        print(f"🚀 Nembak ke: {url} | Payload: {payload}") 
+        self._client: httpx.AsyncClient | None = None
+        # Panggilan identik yang sedang berjalan (soal, mapping) cukup dikirim sekali ke AI service
+        self._singleflight = SingleFlight("ai_service")
+        self._limiters: dict[str, ConcurrencyLimiter] = {}
+        # Satu breaker untuk seluruh AI service (satu host, satu model)
+        self.breaker = CircuitBreaker(
+            name="ai_service",
+            failure_threshold=AI_BREAKER_FAILURES,
+            reset_timeout=AI_BREAKER_RESET_TIMEOUT,
+            half_open_probes=AI_BREAKER_PROBES,
+            is_failure=_is_upstream_failure,
+        )
+        registry.on_collect(self._collect_pool_metrics)
+
+    # --- LIFECYCLE (dipanggil dari lifespan aplikasi) ---
+    def start(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=AI_MAX_CONNECTIONS,
+                max_keepalive_connections=AI_MAX_KEEPALIVE,
+                keepalive_expiry=AI_KEEPALIVE_EXPIRY,
+            )
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=limits,
+                http2=AI_HTTP2,
+                timeout=httpx.Timeout(AI_DEFAULT_TIMEOUT, connect=AI_CONNECT_TIMEOUT, pool=AI_POOL_TIMEOUT),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Fallback kalau dipakai di luar lifespan (script, worker)
+        return self.start()
+
+    def _timeout_for(self, endpoint: str) -> httpx.Timeout:
+        read_timeout = AI_ENDPOINT_TIMEOUTS.get(endpoint, AI_DEFAULT_TIMEOUT)
+        return httpx.Timeout(read_timeout, connect=AI_CONNECT_TIMEOUT, pool=AI_POOL_TIMEOUT)
+
+    def _limiter_for(self, endpoint: str) -> ConcurrencyLimiter:
+        limiter = self._limiters.get(endpoint)
+        if limiter is None:
+            limiter = ConcurrencyLimiter(
+                name=f"ai{endpoint}",
+                limit=AI_ENDPOINT_CONCURRENCY.get(endpoint, AI_DEFAULT_CONCURRENCY),
+                max_queue=AI_QUEUE_SIZE,
+                queue_timeout=AI_QUEUE_TIMEOUT,
+                retry_after=AI_RETRY_AFTER,
+            )
+            self._limiters[endpoint] = limiter
+        return limiter
+
+    def _pool_tracer(self):
+        # Hook trace httpcore: event pertama setelah koneksi didapat dari pool
+        # adalah connect_tcp (koneksi baru) atau send_request_headers (koneksi dipakai ulang)
+        started = time.perf_counter()
+        observed = False
+
+        async def trace(event_name: str, info: dict):
+            nonlocal observed
+            if event_name == "connection.connect_tcp.started":
+                AI_CONNECTIONS_OPENED.inc()
+            if not observed and event_name.endswith(("connect_tcp.started", "send_request_headers.started")):
+                observed = True
+                AI_POOL_WAIT.observe(time.perf_counter() - started)
+
+        return trace
+
+    def pool_stats(self) -> dict:
+        stats = {"in_use": 0, "idle": 0, "total": 0}
+        if self._client is None:
+            return stats
+        pool = getattr(self._client._transport, "_pool", None)
+        for conn in getattr(pool, "connections", []):
+            if conn.is_closed():
+                continue
+            stats["total"] += 1
+            if conn.is_idle():
+                stats["idle"] += 1
+            else:
+                stats["in_use"] += 1
+        return stats
+
+    def _collect_pool_metrics(self):
+        stats = self.pool_stats()
+        AI_POOL_CONNECTIONS.set(stats["in_use"], state="in_use")
+        AI_POOL_CONNECTIONS.set(stats["idle"], state="idle")
+
+    async def _coalesced_post(self, endpoint: str, payload: dict, retries: int = 0):
+        body = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        key = f"{endpoint}:{hashlib.sha256(body.encode('utf-8')).hexdigest()}"
+        return await self._singleflight.do(key, lambda: self._post_request(endpoint, payload, retries))
+
+    async def _send(self, endpoint: str, payload: dict):
+        # Breaker dicek sebelum antri supaya saat AI mati request langsung gagal
+        with self.breaker.call():
+            # Slot dipegang selama menunggu respons AI (antrian penuh/timeout -> 429/503)
+            async with self._limiter_for(endpoint).acquire():
+                with self._upstream_timer(endpoint, "post", payload) as outcome:
+                    response = await self.client.post(
+                        endpoint,
+                        json=payload,
+                        headers=self._headers(),
+                        timeout=self._timeout_for(endpoint),
+                        extensions={"trace": self._pool_tracer()},
+                    )
+                    outcome["status"] = str(response.status_code)
+
+            if response.status_code >= 400:
+                logger.warning("Error dari AI service", extra={"endpoint": endpoint, "status_code": response.status_code,
+                                                               "body": response.text})
+
+            response.raise_for_status()
+            return response.json()
+
+    async def _post_request(self, endpoint: str, payload: dict, retries: int = 0):
+        """POST ke AI service. `retries` hanya untuk panggilan idempotent (soal, mapping)."""
+        # Isi payload (percakapan lengkap, data diri) hanya di level DEBUG; dipotong & diredaksi oleh formatter log
+        logger.debug("Request ke AI service", extra={"endpoint": endpoint, "payload": payload})
+
+        for attempt in range(retries + 1):
+            try:
+                return await self._send(endpoint, payload)
+            except HTTPException:
+                raise
+            except Exception as e:
+                # Tidak perlu retry kalau breaker baru saja terbuka
+                if attempt < retries and _is_retryable(e) and self.breaker.state != OPEN:
+                    delay = _backoff_delay(attempt)
+                    AI_RETRIES.inc(endpoint=endpoint)
+                    logger.warning("Retry %d/%d ke AI service %s dalam %.2fs: %r", attempt + 1, retries, endpoint, delay, e)
+                    await asyncio.sleep(delay)
+                    continue
+                raise _to_http_exception(e)
+
+    async def _stream_request(self, endpoint: str, payload: dict):
+        """
+        POST ke AI service dan relay potongan teks begitu datang.
+        Mendukung upstream SSE (text/event-stream), teks chunked, dan JSON biasa (fallback satu potong).
+        """
+        logger.debug("Request stream ke AI service", extra={"endpoint": endpoint, "payload": payload})
 
         try:
- 
-            timeout_config = httpx.Timeout(300.0, connect=60.0)
- 
-            async with httpx.AsyncClient(timeout=timeout_config) as client:
-                response = await client.post(
-                    url, 
-                    json=payload,
-                    headers={"Connection": "close"}  
-                ) 
-                
-                if response.status_code >= 400:
-                     print(f"❌ Error dari AI: {response.text}")
-                
-                response.raise_for_status()
-                return response.json()
-                
-        except httpx.RemoteProtocolError:
-            
-            print("❌ AI Service putus koneksi mendadak.")
-            raise HTTPException(status_code=502, detail="AI Service terputus di tengah jalan. Kemungkinan server AI restart/crash.")
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=e.response.status_code, detail=f"AI Error: {e.response.text}")
+            with self.breaker.call():
+                # Slot dipegang sampai stream selesai
+                async with self._limiter_for(endpoint).acquire():
+                    with self._upstream_timer(endpoint, "stream", payload) as outcome:
+                        async with self.client.stream(
+                            "POST",
+                            endpoint,
+                            json=payload,
+                            headers=self._headers(),
+                            timeout=self._timeout_for(endpoint),
+                            extensions={"trace": self._pool_tracer()},
+                        ) as response:
+                            outcome["status"] = str(response.status_code)
+                            if response.status_code >= 400:
+                                await response.aread()
+                                logger.warning("Error dari AI service", extra={
+                                    "endpoint": endpoint, "status_code": response.status_code, "body": response.text
+                                })
+                                response.raise_for_status()
+
+                            async for chunk in self._iter_stream(response):
+                                if "first_chunk" not in outcome:
+                                    outcome["first_chunk"] = time.perf_counter()
+                                    AI_UPSTREAM_FIRST_CHUNK.observe(outcome["first_chunk"] - outcome["started"],
+                                                                    endpoint=endpoint)
+                                yield chunk
+
+        except HTTPException:
+            raise
         except Exception as e:
-            print(f"❌ Exception Fatal: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Gagal menghubungi AI Service (Timeout/Koneksi): {str(e)}")
+            raise _to_http_exception(e)
+
+    async def _iter_stream(self, response: httpx.Response):
+        content_type = response.headers.get("content-type", "")
+        if "text/event-stream" in content_type:
+            async for line in response.aiter_lines():
+                token = _parse_sse_data(line)
+                if token:
+                    yield token
+        elif "application/json" in content_type:
+            data = json.loads(await response.aread())
+            yield ai_schema.InterviewResponse(**data).data.answer
+        else:
+            async for text in response.aiter_text():
+                yield text
+
+    def _headers(self) -> dict:
+        # Request id & correlation id (log kedua service bisa disambungkan) + traceparent jika tracing aktif
+        return tracer.inject(request_context.outgoing_headers())
+
+    @contextmanager
+    def _upstream_timer(self, endpoint: str, mode: str, payload: dict):
+        """Latensi satu panggilan ke AI service (+ span OpenTelemetry); `status` diisi pemanggil setelah respons datang."""
+        outcome = {"status": "error", "started": time.perf_counter()}
+        with tracer.span(f"AI {endpoint}", kind="client", **{"ai.endpoint": endpoint, "ai.mode": mode}) as span:
+            try:
+                yield outcome
+            finally:
+                elapsed = time.perf_counter() - outcome["started"]
+                AI_UPSTREAM_SECONDS.observe(elapsed, endpoint=endpoint, mode=mode, status=outcome["status"])
+                if outcome["status"].isdigit():
+                    span.set_attribute("http.response.status_code", int(outcome["status"]))
+                # Ringkasan saja: ukuran payload, bukan isinya
+                logger.info("Panggilan AI service selesai", extra={
+                    "endpoint": endpoint, "mode": mode, "status": outcome["status"],
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "payload_chars": sum(len(v) for v in payload.values() if isinstance(v, str)),
+                })
 
     # A. INTERVIEW (Update Format Payload)
     async def get_interview_reply(self, prompt: str) -> ai_schema.InterviewResponse:
@@ -49,6 +330,14 @@ class AIService:
         data = await self._post_request("/interview", payload) 
         return ai_schema.InterviewResponse(**data)
  
+    async def stream_interview_reply(self, prompt: str):
+        payload = {
+            "prompt": prompt,
+            "stream": True
+        }
+        async for chunk in self._stream_request("/interview", payload):
+            yield chunk
+
     async def analyze_talent_mapping(self, full_interview_text: str) -> ai_schema.MappingResponse:
  
         
@@ -57,7 +346,7 @@ class AIService:
             "history": []  
         }
         
-        data = await self._post_request("/talent-mapping", payload)
+        data = await self._coalesced_post("/talent-mapping", payload, retries=AI_RETRY_ATTEMPTS)
         return ai_schema.MappingResponse(**data)
  
     async def generate_questions(self, area: str, level: int) -> ai_schema.QuestionResponse:
@@ -66,5 +355,30 @@ class AIService:
             "area_fungsi": area,
             "level_kompetensi": level
         }
-        data = await self._post_request("/question-generation", payload)
-        return ai_schema.QuestionResponse(**data)
\ No newline at end of file
+        data = await self._coalesced_post("/question-generation", payload, retries=AI_RETRY_ATTEMPTS)
+        return ai_schema.QuestionResponse(**data)
+
+
+def _parse_sse_data(line: str) -> str | None:
+    # Ambil isi baris `data:` dari SSE upstream; payload boleh JSON ({"token": ...}) atau teks mentah
+    if not line.startswith("data:"):
+        return None
+    data = line[5:]
+    if data.startswith(" "):
+        data = data[1:]
+    if data.strip() == "[DONE]":
+        return None
+    try:
+        parsed = json.loads(data)
+    except ValueError:
+        return data
+    if isinstance(parsed, dict):
+        for key in ("token", "text", "delta", "answer"):
+            if isinstance(parsed.get(key), str):
+                return parsed[key]
+        return None
+    return parsed if isinstance(parsed, str) else data
+
+
+# Instance tunggal, client-nya dibuka/ditutup oleh lifespan di app.main
+ai_service = AIService()
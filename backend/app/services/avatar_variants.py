@@ -0,0 +1,161 @@
+import io
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+from PIL import Image, ImageOps
+from minio.error import S3Error
+from sqlalchemy import update
+from app import models
+from app.core.db import SessionLocal
+from app.core.metrics import registry
+from app.core.storage import minio_client, bucket_name
+
+logger = logging.getLogger(__name__)
+
+# Ukuran thumbnail avatar (persegi, px)
+AVATAR_VARIANT_SIZES = tuple(
+    int(s) for s in os.getenv("AVATAR_VARIANT_SIZES", "64,128,256").split(",") if s.strip()
+)
+AVATAR_VARIANT_QUALITY = int(os.getenv("AVATAR_VARIANT_QUALITY", "80"))
+AVATAR_FOLDER = "avatars"
+# Nama variant diturunkan dari nama object asli (UUID), jadi isinya tidak pernah berubah
+VARIANT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Tolak gambar raksasa (decompression bomb) sebelum di-decode
+Image.MAX_IMAGE_PIXELS = int(os.getenv("AVATAR_MAX_PIXELS", str(40_000_000)))
+
+AVATAR_VARIANTS_GENERATED = registry.counter("avatar_variants_generated_total", "Thumbnail avatar yang dibuat")
+AVATAR_VARIANT_FAILURES = registry.counter("avatar_variant_failures_total", "Avatar yang gagal dibuatkan thumbnail")
+AVATAR_VARIANT_SECONDS = registry.histogram("avatar_variant_seconds", "Durasi pembuatan thumbnail satu avatar")
+
+
+def variant_name(path: str, size: int) -> Optional[str]:
+    """
+    avatars/1_uuid.png -> avatars/thumbs/1_uuid_64.webp
+    Berlaku juga untuk URL publik lengkap. Return None jika bukan avatar asli.
+    """
+    head, _, filename = path.rpartition("/")
+    if not filename or not (head == AVATAR_FOLDER or head.endswith(f"/{AVATAR_FOLDER}")):
+        return None
+    stem = filename.rsplit(".", 1)[0]
+    return f"{head}/thumbs/{stem}_{size}.webp"
+
+
+def variant_urls(avatar_url: Optional[str], ready_object: Optional[str] = None) -> Dict[str, str]:
+    """URL thumbnail, hanya jika thumbnail untuk avatar ini sudah selesai dibuat (`ready_object`)."""
+    if not avatar_url or not ready_object or object_name_from_url(avatar_url) != ready_object:
+        return {}
+    urls = {}
+    for size in AVATAR_VARIANT_SIZES:
+        url = variant_name(avatar_url, size)
+        if url is None:
+            return {}
+        urls[str(size)] = url
+    return urls
+
+
+def object_name_from_url(url: str) -> str:
+    # URL: http://IP:PORT/bucket_name/avatars/filename.jpg
+    return url.split(f"/{bucket_name}/")[-1]
+
+
+def _exists(object_name: str) -> bool:
+    try:
+        minio_client.stat_object(bucket_name, object_name)
+        return True
+    except S3Error as e:
+        if e.code in ("NoSuchKey", "NoSuchObject"):
+            return False
+        raise
+
+
+def _render(image: Image.Image, size: int) -> bytes:
+    # Crop tengah jadi persegi lalu resize
+    thumb = ImageOps.fit(image, (size, size), method=Image.LANCZOS)
+    buffer = io.BytesIO()
+    thumb.save(buffer, format="WEBP", quality=AVATAR_VARIANT_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def _mark_ready(profile_id: int, avatar_url: str, object_name: str):
+    # Lewat primary key; avatar_url dicocokkan persis karena avatar bisa sudah diganti selama thumbnail dibuat
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(models.Profile)
+            .where(models.Profile.id == profile_id, models.Profile.avatar_url == avatar_url)
+            .values(avatar_variants_object=object_name)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def generate_avatar_variants(profile_id: int, avatar_url: str) -> List[str]:
+    """
+    Buat thumbnail WebP untuk avatar profile di MinIO lalu tandai profile-nya (avatar_variants_object).
+    Idempotent: variant yang sudah ada dilewati, dan file asli hanya diunduh kalau masih ada variant yang kurang.
+    Sinkron (dipanggil dari BackgroundTasks / worker thread). Return nama variant yang baru dibuat.
+    """
+    object_name = object_name_from_url(avatar_url)
+    missing = {}
+    try:
+        for size in AVATAR_VARIANT_SIZES:
+            name = variant_name(object_name, size)
+            if name is None:
+                return []
+            if not _exists(name):
+                missing[size] = name
+        if not missing:
+            _mark_ready(profile_id, avatar_url, object_name)
+            return []
+    except Exception as e:
+        AVATAR_VARIANT_FAILURES.inc()
+        logger.warning("Gagal membuat thumbnail avatar %s: %s", object_name, e)
+        return []
+
+    started = time.perf_counter()
+    try:
+        response = minio_client.get_object(bucket_name, object_name)
+        try:
+            original = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+        with Image.open(io.BytesIO(original)) as image:
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+            created = []
+            for size, name in missing.items():
+                data = _render(image, size)
+                minio_client.put_object(
+                    bucket_name,
+                    name,
+                    io.BytesIO(data),
+                    length=len(data),
+                    content_type="image/webp",
+                    metadata={"Cache-Control": VARIANT_CACHE_CONTROL},
+                )
+                created.append(name)
+        _mark_ready(profile_id, avatar_url, object_name)
+    except Exception as e:
+        AVATAR_VARIANT_FAILURES.inc()
+        logger.warning("Gagal membuat thumbnail avatar %s: %s", object_name, e)
+        return []
+
+    AVATAR_VARIANTS_GENERATED.inc(len(created))
+    AVATAR_VARIANT_SECONDS.observe(time.perf_counter() - started)
+    return created
+
+
+def remove_avatar_variants(object_name: str):
+    for size in AVATAR_VARIANT_SIZES:
+        name = variant_name(object_name, size)
+        if name is None:
+            return
+        try:
+            minio_client.remove_object(bucket_name, name)
+        except Exception as e:
+            logger.warning("Gagal menghapus thumbnail avatar di MinIO: %s", e)
@@ -0,0 +1,72 @@
+from typing import Optional
+from sqlalchemy import select, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+
+AREA_CODES = ("DSC", "TKTI", "PPD", "CYBER", "TI", "LTI")
+
+# Nama area dari AI service / frontend -> kode area (dicek berurutan, "data" paling akhir sebagai fallback)
+AREA_ALIASES = [
+    ("sains data", "DSC"),
+    ("kecerdasan artifisial", "DSC"),
+    ("data science", "DSC"),
+    ("tata kelola", "TKTI"),
+    ("governance", "TKTI"),
+    ("produk digital", "PPD"),
+    ("digital product", "PPD"),
+    ("keamanan informasi", "CYBER"),
+    ("siber", "CYBER"),
+    ("cyber", "CYBER"),
+    ("layanan ti", "LTI"),
+    ("layanan teknologi", "LTI"),
+    ("infrastruktur", "TI"),
+    ("data", "DSC"),
+]
+
+
+def area_code(name: Optional[str]) -> Optional[str]:
+    """Kode area (DSC, TKTI, ...) dari kode itu sendiri, key mapping AI (Sains_Data_...) atau nama area."""
+    if not name:
+        return None
+    key = name.strip().upper()
+    if key in AREA_CODES:
+        return key
+    text = name.replace("_", " ").lower()
+    for needle, code in AREA_ALIASES:
+        if needle in text:
+            return code
+    return None
+
+
+def _upsert(db: AsyncSession):
+    # INSERT ... ON CONFLICT DO UPDATE (Postgres di production, SQLite untuk dev)
+    dialect = sqlite if db.bind.dialect.name == "sqlite" else postgresql
+    return dialect.insert(models.CompetencyStatus)
+
+
+async def record_status(db: AsyncSession, profile_id: int, area: str, status: str,
+                        score: float, assessment_id: int):
+    """Simpan status terbaru satu area. Tidak commit: dipanggil di dalam transaksi submit assessment."""
+    stmt = _upsert(db).values(
+        profile_id=profile_id, area_fungsi=area, status=status, score=score, assessment_id=assessment_id
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["profile_id", "area_fungsi"],
+        set_={
+            "status": stmt.excluded.status,
+            "score": stmt.excluded.score,
+            "assessment_id": stmt.excluded.assessment_id,
+            "updated_at": func.now(),
+        }
+    ))
+
+
+async def get_statuses(db: AsyncSession, profile_id: Optional[int]) -> dict[str, str]:
+    """{kode area: status} untuk satu profile, satu lookup di index unik (profile_id, area_fungsi)."""
+    if not profile_id:
+        return {}
+    result = await db.execute(select(models.CompetencyStatus.area_fungsi, models.CompetencyStatus.status).where(
+        models.CompetencyStatus.profile_id == profile_id
+    ))
+    return {area: status for area, status in result.all()}
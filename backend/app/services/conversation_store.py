@@ -0,0 +1,157 @@
+import os
+import threading
+from collections import OrderedDict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.services.response_sanitizer import clean_think_tag
+
+# Batas panjang prompt ChatML yang dikirim ke AI service (karakter, kira-kira 4 karakter per token)
+PROMPT_MAX_CHARS = int(os.getenv("AI_PROMPT_MAX_CHARS", "24000"))
+# Jumlah sesi percakapan yang disimpan di memori (LRU)
+CONVERSATION_CACHE_SIZE = int(os.getenv("CONVERSATION_CACHE_SIZE", "1000"))
+
+
+# --- RENDER CHATML ---
+def render_system(system_prompt: str) -> str:
+    return f"<|im_start|>system\n{system_prompt}\n<|im_end|>\n"
+
+def render_turn(user_prompt: str, ai_response: str) -> str:
+    return (
+        f"\n<|im_start|>user\n{user_prompt}\n<|im_end|>\n"
+        f"\n<|im_start|>assistant\n{ai_response}\n<|im_end|>\n"
+    )
+
+def render_pending(current_input: str) -> str:
+    return f"\n<|im_start|>user\n{current_input}\n\nData konteks terkait kompetensi:\n{{context}}\n<|im_end|>\n\n<|im_start|>assistant"
+
+def render_omitted(count: int) -> str:
+    return f"\n<|im_start|>system\n({count} giliran percakapan sebelumnya tidak ditampilkan karena batas panjang percakapan)\n<|im_end|>\n"
+
+
+class Conversation:
+    """
+    Prefix ChatML yang sudah dirender untuk satu sesi interview.
+    Giliran pertama (data profil) selalu dipertahankan; kalau melebihi budget,
+    giliran paling lama setelahnya yang dibuang.
+    """
+
+    def __init__(self, system_prompt: str, max_chars: int = PROMPT_MAX_CHARS):
+        self.system_block = render_system(system_prompt)
+        self.max_chars = max_chars
+        self.turns: list[str] = []
+        self.omitted = 0
+        self.last_log_id: int | None = None
+        self._prefix = self.system_block
+
+    def append(self, log_id: int, user_prompt: str, ai_response: str):
+        turn = render_turn(user_prompt, ai_response)
+        self.turns.append(turn)
+        self._prefix += turn
+        self.last_log_id = log_id
+
+        # Buang permanen giliran yang tidak akan pernah muat lagi supaya memori tetap terbatas
+        if len(self._prefix) > self.max_chars * 2:
+            kept = self._fit(self.max_chars)
+            self.omitted += len(self.turns) - len(kept)
+            self.turns = kept
+            self._prefix = self.system_block + "".join(self.turns)
+
+    def build_prompt(self, current_input: str) -> str:
+        pending = render_pending(current_input)
+        if not self.omitted and len(self._prefix) + len(pending) <= self.max_chars:
+            return self._prefix + pending
+
+        budget = self.max_chars - len(pending)
+        kept = self._fit(budget)
+        omitted = self.omitted + len(self.turns) - len(kept)
+        if omitted and len(kept) > 1:
+            # Catatan pemotongan diselipkan setelah giliran pertama (data profil)
+            body = kept[0] + render_omitted(omitted) + "".join(kept[1:])
+        elif omitted:
+            body = "".join(kept) + render_omitted(omitted)
+        else:
+            body = "".join(kept)
+        return self.system_block + body + pending
+
+    def _fit(self, budget: int) -> list[str]:
+        if not self.turns:
+            return []
+
+        first = self.turns[0]
+        remaining = budget - len(self.system_block) - len(first) - len(render_omitted(len(self.turns)))
+        tail = []
+        for turn in reversed(self.turns[1:]):
+            if len(turn) > remaining:
+                break
+            tail.append(turn)
+            remaining -= len(turn)
+        tail.reverse()
+        return [first] + tail
+
+
+class ConversationStore:
+    """
+    Cache LRU per user untuk prefix ChatML sesi interview.
+    Validitas dicek dengan id log terakhir di DB (1 baris), jadi aman kalau
+    ada worker lain yang menulis log; kalau tidak cocok, prefix dibangun ulang sekali.
+    """
+
+    def __init__(self, system_prompt: str, max_sessions: int = CONVERSATION_CACHE_SIZE):
+        self.system_prompt = system_prompt
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[int, Conversation] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, db: AsyncSession, user_id: int) -> Conversation:
+        latest_id = await db.scalar(select(models.InterviewLog.id).where(
+            models.InterviewLog.user_id == user_id
+        ).order_by(models.InterviewLog.id.desc()).limit(1))
+
+        with self._lock:
+            conversation = self._sessions.get(user_id)
+            if conversation is not None and conversation.last_log_id == latest_id:
+                self._sessions.move_to_end(user_id)
+                return conversation
+
+        conversation = await self._load(db, user_id)
+        self._put(user_id, conversation)
+        return conversation
+
+    def append(self, user_id: int, log_id: int, previous_log_id: int | None, user_prompt: str, ai_response: str):
+        """
+        Tambah giliran baru ke cache. `previous_log_id` = id log tepat sebelum log ini di DB;
+        kalau prefix di cache tidak berakhir di sana (request lain / worker lain menulis di antaranya),
+        cache dibuang supaya get() berikutnya membangun ulang dari DB dengan urutan yang benar.
+        """
+        with self._lock:
+            conversation = self._sessions.get(user_id)
+            if conversation is None:
+                return
+            if conversation.last_log_id != previous_log_id:
+                del self._sessions[user_id]
+                return
+            conversation.append(log_id, user_prompt, ai_response)
+            self._sessions.move_to_end(user_id)
+
+    def reset(self, user_id: int) -> Conversation:
+        conversation = Conversation(self.system_prompt)
+        self._put(user_id, conversation)
+        return conversation
+
+    async def _load(self, db: AsyncSession, user_id: int) -> Conversation:
+        conversation = Conversation(self.system_prompt)
+        result = await db.execute(select(models.InterviewLog).where(
+            models.InterviewLog.user_id == user_id
+        ).order_by(models.InterviewLog.created_at.asc(), models.InterviewLog.id.asc()))
+        logs = result.scalars().all()
+        for log in logs:
+            conversation.append(log.id, log.user_prompt, clean_think_tag(log.ai_response))
+        return conversation
+
+    def _put(self, user_id: int, conversation: Conversation):
+        with self._lock:
+            self._sessions[user_id] = conversation
+            self._sessions.move_to_end(user_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
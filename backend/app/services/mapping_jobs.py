@@ -0,0 +1,316 @@
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.core import request_context
+from app.core.db import AsyncSessionLocal
+from app.core.metrics import registry
+from app.schemas import ai_schema
+from app.services.ai_service import ai_service
+from app.services.competency_status import area_code, get_statuses
+from app.services.response_sanitizer import clean_think_tag
+
+logger = logging.getLogger(__name__)
+
+# Jumlah worker mapping per proses aplikasi (0 = tidak menjalankan worker di proses ini)
+MAPPING_WORKERS = int(os.getenv("MAPPING_WORKERS", "2"))
+# Interval cek job baru kalau antrian kosong (detik)
+MAPPING_WORKER_POLL = float(os.getenv("MAPPING_WORKER_POLL", "2"))
+# Job `running` lebih lama dari ini dianggap ditinggal worker yang mati dan diambil ulang
+MAPPING_JOB_STALE_AFTER = float(os.getenv("MAPPING_JOB_STALE_AFTER", "900"))
+MAPPING_JOB_MAX_ATTEMPTS = int(os.getenv("MAPPING_JOB_MAX_ATTEMPTS", "3"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+MAPPING_SOURCE = "ai_interview"
+
+MAPPING_JOBS = registry.counter("mapping_jobs_total", "Job mapping per status akhir")
+MAPPING_JOB_SECONDS = registry.histogram("mapping_job_seconds", "Durasi eksekusi job mapping")
+MAPPING_JOB_QUEUE_SECONDS = registry.histogram("mapping_job_queue_seconds", "Waktu job mapping menunggu di antrian")
+MAPPING_REUSED = registry.counter("mapping_results_reused_total", "Mapping yang memakai hasil tersimpan (transkrip tidak berubah)")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite mengembalikan datetime naive
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def build_transcript(db: AsyncSession, user_id: int) -> str:
+    logs_result = await db.execute(select(models.InterviewLog).where(
+        models.InterviewLog.user_id == user_id
+    ).order_by(models.InterviewLog.created_at.asc()))
+    logs = logs_result.scalars().all()
+
+    if not logs:
+        return "User belum melakukan interview."
+    return " ".join([
+        f"User berkata: {log.user_prompt}. AI menjawab: {clean_think_tag(log.ai_response)}."
+        for log in logs
+    ])
+
+
+async def apply_assessment_status(db: AsyncSession, profile_id: int, result: ai_schema.MappingResponse):
+    # Status per area dari competency_statuses (area yang belum di-assess tetap "unassessed")
+    statuses = await get_statuses(db, profile_id)
+    if statuses and result.data:
+        for area_key, area_data in result.data.items():
+            status = statuses.get(area_code(area_key))
+            if area_data and area_data.level_kompetensi > 0 and status:
+                area_data.status = status
+
+
+def transcript_hash(full_text: str) -> str:
+    return hashlib.sha256(full_text.encode("utf-8")).hexdigest()
+
+
+async def find_stored_mapping(db: AsyncSession, profile_id: int, digest: str) -> ai_schema.MappingResponse | None:
+    result = await db.execute(select(models.Mapping).where(
+        models.Mapping.profile_id == profile_id,
+        models.Mapping.transcript_hash == digest,
+        models.Mapping.sumber == MAPPING_SOURCE
+    ).order_by(models.Mapping.id))
+    rows = result.scalars().all()
+    if not rows:
+        return None
+
+    MAPPING_REUSED.inc()
+    # Kalau pernah tersimpan lebih dari sekali untuk transkrip yang sama, baris terbaru yang dipakai
+    data = {
+        row.area_fungsi: ai_schema.CompetencyLevel(
+            level_kompetensi=row.level_kompetensi or 0,
+            kecocokan=row.confidence or 0.0
+        )
+        for row in rows
+    }
+    return ai_schema.MappingResponse(success=True, message="Talent mapping (hasil tersimpan)", data=data)
+
+
+async def with_assessment_status(db: AsyncSession, profile_id: int | None,
+                                 job: ai_schema.MappingJobResponse) -> ai_schema.MappingJobResponse:
+    # Status assessment ditempel saat dibaca, jadi hasil tersimpan selalu memakai status terbaru
+    if job.result is not None and profile_id:
+        await apply_assessment_status(db, profile_id, job.result)
+    return job
+
+
+def to_response(job: models.MappingJob) -> ai_schema.MappingJobResponse:
+    return ai_schema.MappingJobResponse(
+        job_id=job.id,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result=job.result,
+        error=job.error,
+        error_status=job.error_status,
+    )
+
+
+class MappingJobQueue:
+    """
+    Antrian job talent mapping di tabel `mapping_jobs`.
+    Worker (task asyncio di lifespan aplikasi) mengambil job dengan SELECT ... FOR UPDATE SKIP LOCKED,
+    jadi aman dijalankan di beberapa proses/instance sekaligus.
+    """
+
+    def __init__(self):
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+        # Notifikasi lokal untuk yang menunggu job selesai di proses ini
+        self._finished: dict[int, asyncio.Event] = {}
+
+    # --- SISI API ---
+    async def submit(self, db: AsyncSession, user_id: int, profile_id: int | None) -> models.MappingJob:
+        # Klik ganda / retry: pakai job yang masih aktif milik user
+        existing = await db.scalar(select(models.MappingJob).where(
+            models.MappingJob.user_id == user_id,
+            models.MappingJob.status.in_(ACTIVE_STATUSES)
+        ).order_by(models.MappingJob.id.desc()).limit(1))
+        if existing:
+            return existing
+
+        # Transkrip belum berubah sejak mapping terakhir: pakai hasil tersimpan tanpa ke AI service
+        if profile_id:
+            digest = transcript_hash(await build_transcript(db, user_id))
+            stored = await find_stored_mapping(db, profile_id, digest)
+            if stored is not None:
+                now = _now()
+                job = models.MappingJob(
+                    user_id=user_id, profile_id=profile_id, status=DONE, result=stored.model_dump(),
+                    created_at=now, started_at=now, finished_at=now
+                )
+                db.add(job)
+                await db.commit()
+                MAPPING_JOBS.inc(status=DONE)
+                return job
+
+        job = models.MappingJob(user_id=user_id, profile_id=profile_id, status=QUEUED, created_at=_now())
+        db.add(job)
+        await db.commit()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, db: AsyncSession, user_id: int, job_id: int) -> models.MappingJob:
+        job = await db.scalar(select(models.MappingJob).where(
+            models.MappingJob.id == job_id,
+            models.MappingJob.user_id == user_id
+        ).execution_options(populate_existing=True))
+        if not job:
+            raise HTTPException(status_code=404, detail="Job mapping tidak ditemukan")
+        return job
+
+    async def wait(self, db: AsyncSession, user_id: int, job_id: int, timeout: float) -> ai_schema.MappingJobResponse:
+        """Tunggu job selesai (notifikasi lokal, fallback polling DB untuk job di proses lain)."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        event = self._finished.setdefault(job_id, asyncio.Event())
+        try:
+            while True:
+                job = to_response(await self.get(db, user_id, job_id))
+                # Lepas koneksi DB selama menunggu
+                await db.rollback()
+                remaining = deadline - loop.time()
+                if job.status not in ACTIVE_STATUSES or remaining <= 0:
+                    return job
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=min(MAPPING_WORKER_POLL, remaining))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if not event.is_set():
+                self._finished.pop(job_id, None)
+
+    # --- SISI WORKER ---
+    def start(self, workers: int = MAPPING_WORKERS):
+        if self._tasks or workers <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker_loop(i)) for i in range(workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    async def _worker_loop(self, index: int):
+        while True:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Worker mapping %d error: %s", index, e)
+                processed = False
+
+            if not processed:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=MAPPING_WORKER_POLL)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _claim(self, db: AsyncSession) -> models.MappingJob | None:
+        stale_before = _now() - timedelta(seconds=MAPPING_JOB_STALE_AFTER)
+        job = await db.scalar(
+            select(models.MappingJob).where(or_(
+                models.MappingJob.status == QUEUED,
+                and_(models.MappingJob.status == RUNNING, models.MappingJob.started_at < stale_before)
+            )).order_by(models.MappingJob.id).limit(1).with_for_update(skip_locked=True)
+        )
+        if job is None:
+            await db.rollback()
+            return None
+
+        if job.attempts >= MAPPING_JOB_MAX_ATTEMPTS:
+            job.status = FAILED
+            job.error = "Job mapping gagal diproses berulang kali"
+            job.finished_at = _now()
+            await db.commit()
+            MAPPING_JOBS.inc(status=FAILED)
+            self._notify(job.id)
+            return job
+
+        job.status = RUNNING
+        job.attempts += 1
+        job.started_at = _now()
+        await db.commit()
+        if job.created_at:
+            MAPPING_JOB_QUEUE_SECONDS.observe((job.started_at - _as_utc(job.created_at)).total_seconds())
+        return job
+
+    async def run_once(self) -> bool:
+        """Ambil dan jalankan satu job. Return False kalau antrian kosong."""
+        async with AsyncSessionLocal() as db:
+            job = await self._claim(db)
+            if job is None:
+                return False
+            if job.status != RUNNING:
+                return True
+            job_id, user_id, profile_id = job.id, job.user_id, job.profile_id
+
+            started = _now()
+            # Log & panggilan AI dari job ini membawa id job (tidak ada request HTTP yang aktif)
+            with request_context.bind(f"mapping-job-{job_id}"):
+                try:
+                    full_text = await build_transcript(db, user_id)
+                    digest = transcript_hash(full_text)
+                    result = await find_stored_mapping(db, profile_id, digest) if profile_id else None
+                    if result is None:
+                        # Transaksi baca ditutup supaya koneksi tidak dipegang selama panggilan AI
+                        await db.rollback()
+                        result = await ai_service.analyze_talent_mapping(full_text)
+                        if profile_id:
+                            self._store_mappings(db, profile_id, digest, result)
+                    job_values = dict(status=DONE, result=result.model_dump(), error=None, error_status=None)
+                except HTTPException as e:
+                    await db.rollback()
+                    job_values = dict(status=FAILED, error=str(e.detail), error_status=e.status_code)
+                    logger.warning("Job mapping %d gagal: %s", job_id, e.detail, extra={"status_code": e.status_code})
+                except Exception:
+                    # Payload AI tidak valid, error DB, dsb.: job langsung FAILED supaya penunggu tidak menunggu sampai timeout
+                    await db.rollback()
+                    logger.exception("Job mapping %d error tak terduga", job_id)
+                    job_values = dict(status=FAILED, error="Terjadi kesalahan saat memproses talent mapping", error_status=500)
+
+            job_values["finished_at"] = _now()
+            await db.execute(update(models.MappingJob).where(models.MappingJob.id == job_id).values(**job_values))
+            await db.commit()
+
+            MAPPING_JOBS.inc(status=job_values["status"])
+            MAPPING_JOB_SECONDS.observe((job_values["finished_at"] - started).total_seconds())
+            self._notify(job_id)
+            return True
+
+    def _store_mappings(self, db: AsyncSession, profile_id: int, digest: str, result: ai_schema.MappingResponse):
+        # Satu baris Mapping per area (termasuk level 0) supaya hasil bisa dibangun ulang utuh
+        for area_key, area_data in (result.data or {}).items():
+            if not area_data:
+                continue
+            db.add(models.Mapping(
+                profile_id=profile_id,
+                sumber=MAPPING_SOURCE,
+                area_fungsi=area_key,
+                level_kompetensi=area_data.level_kompetensi,
+                confidence=area_data.kecocokan,
+                transcript_hash=digest,
+            ))
+
+    def _notify(self, job_id: int):
+        event = self._finished.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+
+mapping_jobs = MappingJobQueue()
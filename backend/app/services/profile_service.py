@@ -1,141 +1,157 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from app import models
 from app.schemas import profile_schema
 from fastapi import HTTPException
 
 
 class ProfileService:
-    
+
     # 1. Get Profil Lengkap
-    def get_profile_by_user_id(self, db: Session, user_id: int):
-        profile = db.query(models.Profile).filter(models.Profile.user_id == user_id).first()
+    async def get_profile_by_user_id(self, db: AsyncSession, user_id: int):
+        result = await db.execute(select(models.Profile).where(models.Profile.user_id == user_id))
+        profile = result.scalars().first()
+        if not profile:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return profile
+
+    # 1b. Get Profil + Pendidikan, Sertifikasi, Pengalaman dalam satu query
+    async def get_full_profile(self, db: AsyncSession, user_id: int):
+        # Join ketiga relasi sekaligus aman karena masing-masing dibatasi maksimal 3 baris (maks 27 baris hasil join)
+        stmt = select(models.Profile).options(
+            joinedload(models.Profile.educations),
+            joinedload(models.Profile.certifications),
+            joinedload(models.Profile.experiences),
+        ).where(models.Profile.user_id == user_id).execution_options(populate_existing=True)
+        result = await db.execute(stmt)
+        profile = result.unique().scalars().first()
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
         return profile
 
+    async def _count(self, db: AsyncSession, model, profile_id: int) -> int:
+        return await db.scalar(
+            select(func.count()).select_from(model).where(model.profile_id == profile_id)
+        )
+
     # 2. Update Data Diri (Partial)
-    def update_profile(self, db: Session, user_id: int, data: profile_schema.ProfileUpdate):
-        profile = self.get_profile_by_user_id(db, user_id)
-        
+    async def update_profile(self, db: AsyncSession, user_id: int, data: profile_schema.ProfileUpdate):
+        profile = await self.get_profile_by_user_id(db, user_id)
+
         # Update field yang dikirim saja
         update_data = data.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(profile, key, value)
-        
-        db.commit()
-        db.refresh(profile)
-        return profile
+
+        await db.commit()
+        return await self.get_full_profile(db, user_id)
 
 ## -- EDUCATION --
-    def add_education(self, db: Session, user_id: int, education: profile_schema.EducationCreate):
-        profile = self.get_profile_by_user_id(db, user_id)
-         
-        count = db.query(models.Education).filter(models.Education.profile_id == profile.id).count()
+    async def add_education(self, db: AsyncSession, user_id: int, education: profile_schema.EducationCreate):
+        profile = await self.get_profile_by_user_id(db, user_id)
+
+        count = await self._count(db, models.Education, profile.id)
         if count >= 3:
             raise HTTPException(status_code=400, detail="Maksimal hanya boleh 3 data pendidikan.")
-             
+
         new_edu = models.Education(**education.dict(), profile_id=profile.id)
         db.add(new_edu)
-        db.commit()
-        db.refresh(new_edu)
+        await db.commit()
+        await db.refresh(new_edu)
         return new_edu
 
     # 4. Hapus Pendidikan
-    def delete_education(self, db: Session, user_id: int, education_id: int):
-        profile = self.get_profile_by_user_id(db, user_id)
-        edu = db.query(models.Education).filter(
+    async def delete_education(self, db: AsyncSession, user_id: int, education_id: int):
+        profile = await self.get_profile_by_user_id(db, user_id)
+        result = await db.execute(select(models.Education).where(
             models.Education.id == education_id,
             models.Education.profile_id == profile.id
-        ).first()
-        
+        ))
+        edu = result.scalars().first()
+
         if not edu:
             raise HTTPException(status_code=404, detail="Education not found")
-            
-        db.delete(edu)
-        db.commit()
+
+        await db.delete(edu)
+        await db.commit()
         return {"message": "Education deleted"}
-    
+
 ## -- CERTIFICATION --
-    def add_certification(self, db: Session, user_id: int, cert: profile_schema.CertificationCreate):
-        profile = self.get_profile_by_user_id(db, user_id)
-        
+    async def add_certification(self, db: AsyncSession, user_id: int, cert: profile_schema.CertificationCreate):
+        profile = await self.get_profile_by_user_id(db, user_id)
+
         # Cek Maksimal 3
-        count = db.query(models.Certification).filter(models.Certification.profile_id == profile.id).count()
+        count = await self._count(db, models.Certification, profile.id)
         if count >= 3:
             raise HTTPException(status_code=400, detail="Maksimal hanya boleh 3 sertifikasi.")
 
         new_cert = models.Certification(**cert.dict(), profile_id=profile.id)
         db.add(new_cert)
-        db.commit()
-        db.refresh(new_cert)
+        await db.commit()
+        await db.refresh(new_cert)
         return new_cert
-    
-    def delete_certification(self, db: Session, user_id: int, cert_id: int):
-        profile = self.get_profile_by_user_id(db, user_id)
-        
-        # Cari sertifikat milik user ini
-        cert = db.query(models.Certification).filter(
-            models.Certification.id == cert_id,
-            models.Certification.profile_id == profile.id
-        ).first()
-        
-        if not cert:
-            raise HTTPException(status_code=404, detail="Certification not found")
 
-        db.delete(cert)
-        db.commit()
+    async def delete_certification(self, db: AsyncSession, user_id: int, cert_id: int):
+        cert = await self.get_certification(db, user_id, cert_id)
+
+        await db.delete(cert)
+        await db.commit()
         return {"message": "Certification deleted successfully"}
-    
-    def get_certification(self, db: Session, user_id: int, cert_id: int):
-        profile = self.get_profile_by_user_id(db, user_id)
-        
-        cert = db.query(models.Certification).filter(
+
+    async def get_certification(self, db: AsyncSession, user_id: int, cert_id: int):
+        profile = await self.get_profile_by_user_id(db, user_id)
+
+        # Cari sertifikat milik user ini
+        result = await db.execute(select(models.Certification).where(
             models.Certification.id == cert_id,
             models.Certification.profile_id == profile.id
-        ).first()
-        
+        ))
+        cert = result.scalars().first()
+
         if not cert:
             raise HTTPException(status_code=404, detail="Certification not found")
-            
+
         return cert
 
 ## -- EXPERIENCE --
-    def add_experience(self, db: Session, user_id: int, exp: profile_schema.ExperienceCreate):
-        profile = self.get_profile_by_user_id(db, user_id)
-         
-        count = db.query(models.Experience).filter(models.Experience.profile_id == profile.id).count()
+    async def add_experience(self, db: AsyncSession, user_id: int, exp: profile_schema.ExperienceCreate):
+        profile = await self.get_profile_by_user_id(db, user_id)
+
+        count = await self._count(db, models.Experience, profile.id)
         if count >= 3:
             raise HTTPException(status_code=400, detail="Maksimal hanya boleh 3 pengalaman kerja.")
 
         new_exp = models.Experience(**exp.dict(), profile_id=profile.id)
         db.add(new_exp)
-        db.commit()
-        db.refresh(new_exp)
+        await db.commit()
+        await db.refresh(new_exp)
         return new_exp
-    
-    def delete_experience(self, db: Session, user_id: int, exp_id: int):
-        profile = self.get_profile_by_user_id(db, user_id)
-        
+
+    async def delete_experience(self, db: AsyncSession, user_id: int, exp_id: int):
+        profile = await self.get_profile_by_user_id(db, user_id)
+
         # Cari data pengalaman
-        exp = db.query(models.Experience).filter(
+        result = await db.execute(select(models.Experience).where(
             models.Experience.id == exp_id,
             models.Experience.profile_id == profile.id
-        ).first()
-        
+        ))
+        exp = result.scalars().first()
+
         if not exp:
             raise HTTPException(status_code=404, detail="Experience not found")
-            
-        db.delete(exp)
-        db.commit()
+
+        await db.delete(exp)
+        await db.commit()
         return {"message": "Experience deleted successfully"}
 
 ## -- AVATAR --
-    def remove_avatar(self, db: Session, user_id: int):
-        profile = self.get_profile_by_user_id(db, user_id)
-        
+    async def remove_avatar(self, db: AsyncSession, user_id: int):
+        profile = await self.get_profile_by_user_id(db, user_id)
+
         # Set url jadi null
         profile.avatar_url = None
-        
-        db.commit()
-        db.refresh(profile)
-        return profile
\ No newline at end of file
+        profile.avatar_variants_object = None
+
+        await db.commit()
+        return await self.get_full_profile(db, user_id)
@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import List, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.core.db import AsyncSessionLocal
+from app.core.metrics import registry
+from app.schemas import ai_schema
+from app.services.ai_service import ai_service
+
+logger = logging.getLogger(__name__)
+
+# Jumlah soal yang dikirim per attempt (diambil acak dari pool)
+QUESTION_SET_SIZE = int(os.getenv("QUESTION_SET_SIZE", "10"))
+# Refill di background kalau isi pool di bawah batas ini, sampai mencapai target
+QUESTION_POOL_MIN = int(os.getenv("QUESTION_POOL_MIN", str(QUESTION_SET_SIZE * 3)))
+QUESTION_POOL_TARGET = int(os.getenv("QUESTION_POOL_TARGET", str(QUESTION_SET_SIZE * 6)))
+# Batas panggilan generate per refill (berhenti lebih cepat kalau AI hanya menghasilkan soal kembar)
+QUESTION_REFILL_MAX_ROUNDS = int(os.getenv("QUESTION_REFILL_MAX_ROUNDS", "10"))
+# Jeda minimal antar refill untuk pool yang sama (detik)
+QUESTION_REFILL_COOLDOWN = float(os.getenv("QUESTION_REFILL_COOLDOWN", "300"))
+
+QUESTION_BANK_REQUESTS = registry.counter("question_bank_requests_total", "Permintaan soal (hit = dari bank, miss = generate langsung)")
+QUESTION_BANK_GENERATED = registry.counter("question_bank_generated_total", "Soal baru yang masuk ke bank soal")
+QUESTION_BANK_POOL_SIZE = registry.gauge("question_bank_pool_size", "Jumlah soal di bank per area & level")
+
+
+def content_hash(area: str, level: int, item: ai_schema.QuestionItem) -> str:
+    payload = json.dumps({
+        "area": area,
+        "level": level,
+        "soal": item.soal.strip(),
+        "opsi": item.opsi_jawaban.model_dump(),
+        "kunci": item.jawaban_benar.strip().lower(),
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _insert_ignore(db: AsyncSession):
+    # INSERT ... ON CONFLICT DO NOTHING (Postgres di production, SQLite untuk dev)
+    dialect = sqlite if db.bind.dialect.name == "sqlite" else postgresql
+    return dialect.insert(models.QuestionBankItem)
+
+
+class QuestionBank:
+    """
+    Bank soal per (area, level) yang disimpan di DB.
+    Request biasa cukup mengambil sampel acak dari pool; AI service hanya dipanggil
+    kalau pool masih kosong/kurang, atau di background saat pool menipis.
+    """
+
+    def __init__(self):
+        self._refilling: dict[Tuple[str, int], asyncio.Task] = {}
+        self._last_refill: dict[Tuple[str, int], float] = {}
+
+    async def get_questions(self, db: AsyncSession, area: str, level: int) -> ai_schema.QuestionResponse:
+        pool_size = await self._pool_size(db, area, level)
+
+        if pool_size < QUESTION_SET_SIZE:
+            # Pool belum cukup: generate langsung (sekali), simpan, dan kirim hasilnya
+            QUESTION_BANK_REQUESTS.inc(result="miss")
+            response = await ai_service.generate_questions(area, level)
+            added = await self.store(db, area, level, response.data.kumpulan_soal)
+            self._schedule_refill(area, level, pool_size + added)
+            return response
+
+        QUESTION_BANK_REQUESTS.inc(result="hit")
+        result = await db.execute(
+            select(models.QuestionBankItem).where(
+                models.QuestionBankItem.area_fungsi == area,
+                models.QuestionBankItem.level_kompetensi == level,
+            ).order_by(func.random()).limit(QUESTION_SET_SIZE)
+        )
+        rows = result.scalars().all()
+        self._schedule_refill(area, level, pool_size)
+
+        return ai_schema.QuestionResponse(
+            success=True,
+            message="Soal berhasil dibuat",
+            data=ai_schema.QuestionData(
+                area_fungsi=area,
+                level_kompetensi=level,
+                kumpulan_soal=[
+                    ai_schema.QuestionItem(
+                        nomor_soal=i,
+                        aspek_kritis=row.aspek_kritis or "",
+                        soal=row.soal,
+                        opsi_jawaban=row.opsi_jawaban,
+                        jawaban_benar=row.jawaban_benar,
+                    )
+                    for i, row in enumerate(rows, start=1)
+                ],
+            ),
+        )
+
+    async def store(self, db: AsyncSession, area: str, level: int, items: List[ai_schema.QuestionItem]) -> int:
+        if not items:
+            return 0
+        rows = {
+            content_hash(area, level, item): {
+                "area_fungsi": area,
+                "level_kompetensi": level,
+                "content_hash": content_hash(area, level, item),
+                "aspek_kritis": item.aspek_kritis,
+                "soal": item.soal,
+                "opsi_jawaban": item.opsi_jawaban.model_dump(),
+                "jawaban_benar": item.jawaban_benar,
+            }
+            for item in items
+        }
+        stmt = _insert_ignore(db).values(list(rows.values())).on_conflict_do_nothing(
+            index_elements=["content_hash"]
+        ).returning(models.QuestionBankItem.id)
+        result = await db.execute(stmt)
+        added = len(result.all())
+        await db.commit()
+        QUESTION_BANK_GENERATED.inc(added, area=area, level=str(level))
+        return added
+
+    async def refill(self, area: str, level: int, target: int = QUESTION_POOL_TARGET) -> int:
+        """Generate soal sampai pool mencapai target. Return jumlah soal baru."""
+        total_added = 0
+        async with AsyncSessionLocal() as db:
+            for _ in range(QUESTION_REFILL_MAX_ROUNDS):
+                if await self._pool_size(db, area, level) >= target:
+                    break
+                response = await ai_service.generate_questions(area, level)
+                added = await self.store(db, area, level, response.data.kumpulan_soal)
+                total_added += added
+                if added == 0:
+                    break
+            await self._pool_size(db, area, level)
+        return total_added
+
+    def _schedule_refill(self, area: str, level: int, pool_size: int):
+        key = (area, level)
+        if pool_size >= QUESTION_POOL_MIN or key in self._refilling:
+            return
+        if time.monotonic() - self._last_refill.get(key, float("-inf")) < QUESTION_REFILL_COOLDOWN:
+            return
+        self._last_refill[key] = time.monotonic()
+        task = asyncio.create_task(self._refill_task(area, level))
+        self._refilling[key] = task
+
+    async def _refill_task(self, area: str, level: int):
+        try:
+            added = await self.refill(area, level)
+            logger.info("Bank soal %s level %s: +%d soal", area, level, added)
+        except Exception as e:
+            logger.warning("Gagal mengisi bank soal %s level %s: %s", area, level, e)
+        finally:
+            self._refilling.pop((area, level), None)
+
+    async def _pool_size(self, db: AsyncSession, area: str, level: int) -> int:
+        size = await db.scalar(
+            select(func.count()).select_from(models.QuestionBankItem).where(
+                models.QuestionBankItem.area_fungsi == area,
+                models.QuestionBankItem.level_kompetensi == level,
+            )
+        )
+        QUESTION_BANK_POOL_SIZE.set(size, area=area, level=str(level))
+        return size
+
+    async def aclose(self):
+        tasks = list(self._refilling.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+question_bank = QuestionBank()
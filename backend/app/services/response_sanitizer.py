@@ -0,0 +1,203 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+RESULT_OPEN = "<RESULT>"
+RESULT_CLOSE = "</RESULT>"
+
+# Semua tag yang relevan dicari sekaligus dalam satu scan
+_TAG_PATTERN = re.compile(r"</?think>|</?RESULT>")
+
+
+@dataclass(frozen=True)
+class SanitizedResponse:
+    # Teks bersih yang disimpan / dikirim ke client (blok <think> dibuang, RESULT diselamatkan)
+    text: str
+    # Isi JSON blok <RESULT> pertama, None jika tidak ada atau bukan JSON object
+    result: Optional[dict]
+
+
+def sanitize_response(text: str) -> SanitizedResponse:
+    """
+    Satu kali scan: buang <think>...</think> dan ambil blok <RESULT> pertama sekaligus.
+    Hasil `.text` sama dengan versi regex lama: <think> yang tidak ditutup dibiarkan apa adanya,
+    dan RESULT yang hanya ada di dalam blok <think> ditempel di akhir teks.
+    """
+    if not text:
+        return SanitizedResponse("", None)
+
+    kept = []
+    pos = 0
+    think_start = -1
+    # <RESULT> yang muncul di dalam blok <think> yang (belum) ditutup
+    result_in_think = False
+    result_kept = False
+    result_open = -1
+    result_span = None
+
+    for match in _TAG_PATTERN.finditer(text):
+        tag = match.group()
+        if tag == THINK_OPEN:
+            if think_start == -1:
+                think_start = match.start()
+                result_in_think = False
+        elif tag == THINK_CLOSE:
+            if think_start != -1:
+                kept.append(text[pos:think_start])
+                pos = match.end()
+                think_start = -1
+        elif tag == RESULT_OPEN:
+            if think_start == -1:
+                result_kept = True
+            else:
+                result_in_think = True
+            if result_open == -1:
+                result_open = match.start()
+        elif result_open != -1 and result_span is None:
+            result_span = (result_open, match.end())
+
+    # Blok <think> terakhir tidak pernah ditutup: ikut disimpan beserta RESULT di dalamnya
+    if think_start != -1 and result_in_think:
+        result_kept = True
+    kept.append(text[pos:])
+    cleaned = "".join(kept).strip()
+
+    result = None
+    if result_span is not None:
+        start, end = result_span
+        if not result_kept:
+            cleaned = cleaned + "\n\n" + text[start:end]
+        try:
+            payload = json.loads(text[start + len(RESULT_OPEN):end - len(RESULT_CLOSE)])
+            result = payload if isinstance(payload, dict) else None
+        except ValueError:
+            result = None
+
+    return SanitizedResponse(cleaned.strip(), result)
+
+
+def clean_think_tag(text: str) -> str:
+    return sanitize_response(text).text
+
+
+def render_result(text: str, result: dict, status: str) -> str:
+    """Ganti isi blok <RESULT> dengan `result` + status terbaru, tanpa parsing ulang teks."""
+    start = text.find(RESULT_OPEN)
+    if start == -1:
+        return text
+    end = text.find(RESULT_CLOSE, start)
+    if end == -1:
+        return text
+    payload = json.dumps({**result, "status": status})
+    return f"{text[:start]}{RESULT_OPEN}{payload}{text[end:]}"
+
+
+def _partial_tag_suffix(text: str, tag: str) -> int:
+    # Panjang akhiran `text` yang merupakan awalan `tag` (tag terpotong antar chunk)
+    for size in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:size]):
+            return size
+    return 0
+
+
+class ThinkTagStripper:
+    """
+    Versi incremental dari clean_think_tag untuk respons streaming.
+    feed() mengembalikan teks yang aman dikirim ke client, finish() mengembalikan sisanya.
+    Teks final yang disimpan ke DB ada di `.text`, hasilnya sama dengan clean_think_tag(teks_utuh).
+    """
+
+    def __init__(self):
+        self._raw = []
+        self._emitted = []
+        self._pending = ""
+        self._think = []
+        self._in_think = False
+        self._started = False
+        self._finished = False
+        self._held_space = ""
+        self._sanitized = None
+
+    def feed(self, chunk: str) -> str:
+        if not chunk:
+            return ""
+        self._raw.append(chunk)
+        self._sanitized = None
+        self._pending += chunk
+        out = []
+
+        while True:
+            tag = THINK_CLOSE if self._in_think else THINK_OPEN
+            idx = self._pending.find(tag)
+            if idx == -1:
+                keep = _partial_tag_suffix(self._pending, tag)
+                cut = len(self._pending) - keep
+                self._consume(self._pending[:cut], out)
+                self._pending = self._pending[cut:]
+                break
+
+            self._consume(self._pending[:idx], out)
+            self._pending = self._pending[idx + len(tag):]
+            if self._in_think:
+                self._think = []
+            self._in_think = not self._in_think
+
+        return self._emit("".join(out))
+
+    def finish(self) -> str:
+        if self._finished:
+            return ""
+        self._finished = True
+
+        out = []
+        # <think> yang tidak pernah ditutup tidak dihapus oleh regex, jadi dikembalikan apa adanya
+        if self._in_think:
+            out.append(THINK_OPEN + "".join(self._think))
+        out.append(self._pending)
+        self._pending = ""
+        tail = self._emit("".join(out))
+
+        final_text = self.text
+        streamed = "".join(self._emitted)
+        if final_text != streamed and final_text.startswith(streamed):
+            # RESULT yang diselamatkan dari dalam blok <think>
+            rescued = final_text[len(streamed):]
+            self._emitted.append(rescued)
+            tail += rescued
+        return tail
+
+    @property
+    def sanitized(self) -> SanitizedResponse:
+        if self._sanitized is None:
+            self._sanitized = sanitize_response("".join(self._raw))
+        return self._sanitized
+
+    @property
+    def text(self) -> str:
+        return self.sanitized.text
+
+    def _consume(self, body: str, out: list):
+        if not body:
+            return
+        if self._in_think:
+            self._think.append(body)
+        else:
+            out.append(body)
+
+    def _emit(self, text: str) -> str:
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._started = True
+
+        # Spasi di ujung ditahan dulu: clean_think_tag melakukan strip() di akhir
+        text = self._held_space + text
+        body = text.rstrip()
+        self._held_space = text[len(body):]
+        if body:
+            self._emitted.append(body)
+        return body
@@ -0,0 +1,107 @@
+"""
+Benchmark throughput submit assessment (lonjakan tulis di akhir ujian).
+
+Jalankan dari folder backend (DATABASE_URL diarahkan ke DB dev/test):
+    python -m benchmarks.assessment_submit --requests 500 --concurrency 50 --min-questions 20 --max-questions 50
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import date
+import httpx
+
+from app.main import app
+from app import models
+from app.core.db import SessionLocal, count_queries
+from app.core.security import create_access_token
+
+OPTIONS = {"a": "Pilihan A", "b": "Pilihan B", "c": "Pilihan C", "d": "Pilihan D"}
+
+
+def seed_profiles(count: int) -> list[str]:
+    db = SessionLocal()
+    try:
+        emails = []
+        for _ in range(count):
+            suffix = uuid.uuid4().hex[:10]
+            user = models.User(username=f"submit_{suffix}", email=f"submit_{suffix}@dtp.test", hashed_password="-")
+            db.add(user)
+            db.flush()
+            db.add(models.Profile(user_id=user.id, nik=suffix, full_name="Submit Bench", gender="Laki-laki",
+                                  birth_date=date(2000, 1, 1)))
+            emails.append(user.email)
+        db.commit()
+        return emails
+    finally:
+        db.close()
+
+
+def build_payload(questions: int) -> dict:
+    return {
+        "area_fungsi": "DSC",
+        "jawaban": [
+            {
+                "nomor_soal": i + 1,
+                "soal": f"Soal nomor {i + 1} tentang pengolahan data",
+                "opsi_jawaban": OPTIONS,
+                "jawaban_user": OPTIONS[random.choice("abcd")],
+                "kunci_jawaban": random.choice("abcd"),
+            }
+            for i in range(questions)
+        ],
+    }
+
+
+async def run(total: int, concurrency: int, min_q: int, max_q: int, tokens: list[str]):
+    latencies = []
+    statuses = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    payloads = [build_payload(random.randint(min_q, max_q)) for _ in range(total)]
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        # Warm-up (cache auth) + hitung statement SQL untuk satu submit
+        headers = {"Authorization": f"Bearer {tokens[0]}"}
+        await client.post("/ai/assessment/submit", json=build_payload(max_q), headers=headers)
+        with count_queries() as statements:
+            await client.post("/ai/assessment/submit", json=build_payload(max_q), headers=headers)
+
+        async def one_submit(i: int):
+            async with semaphore:
+                headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+                started = time.perf_counter()
+                response = await client.post("/ai/assessment/submit", json=payloads[i], headers=headers)
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[one_submit(i) for i in range(total)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"statements per submit ({max_q} soal)={len(statements)}")
+    print(f"requests={total} concurrency={concurrency} questions={min_q}-{max_q} "
+          f"elapsed={elapsed:.2f}s throughput={total / elapsed:.1f} submit/s")
+    print(f"latency p50={statistics.median(latencies) * 1000:.0f}ms "
+          f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f}ms max={latencies[-1] * 1000:.0f}ms")
+    print(f"status={statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark throughput endpoint /ai/assessment/submit")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--min-questions", type=int, default=20)
+    parser.add_argument("--max-questions", type=int, default=50)
+    args = parser.parse_args()
+
+    tokens = [create_access_token(subject=email) for email in seed_profiles(args.users)]
+    asyncio.run(run(args.requests, args.concurrency, args.min_questions, args.max_questions, tokens))
+
+
+if __name__ == "__main__":
+    main()
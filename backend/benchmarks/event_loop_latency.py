@@ -0,0 +1,119 @@
+"""
+Benchmark latensi event loop saat banyak sesi interview berjalan bersamaan.
+
+Membandingkan pola lama (Session sync dipanggil langsung di handler async) dengan AsyncSession.
+Tiap "giliran interview" melakukan kerja DB yang sama seperti /ai/interview:
+cek id log terakhir, insert InterviewLog, commit.
+
+Jalankan dari folder backend (DATABASE_URL diarahkan ke DB dev/test):
+    python -m benchmarks.event_loop_latency --sessions 50 --turns 5 --db-delay 0.05
+
+--db-delay mensimulasikan round trip Postgres yang lambat (pg_sleep, hanya di PostgreSQL).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from sqlalchemy import select, text
+
+from app import models
+from app.core.db import Base, engine, async_engine, SessionLocal, AsyncSessionLocal
+
+PROBE_INTERVAL = 0.01
+
+
+def seed_user() -> int:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        suffix = uuid.uuid4().hex[:10]
+        user = models.User(username=f"loop_bench_{suffix}", email=f"loop_bench_{suffix}@dtp.test", hashed_password="-")
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def _delay_sql(db_delay: float):
+    if db_delay and engine.dialect.name == "postgresql":
+        return text(f"SELECT pg_sleep({db_delay})")
+    return None
+
+
+async def sync_turn(user_id: int, db_delay: float):
+    # Pola lama: query sync langsung di coroutine -> memblok event loop
+    db = SessionLocal()
+    try:
+        delay = _delay_sql(db_delay)
+        if delay is not None:
+            db.execute(delay)
+        db.query(models.InterviewLog.id).filter(models.InterviewLog.user_id == user_id).order_by(models.InterviewLog.id.desc()).first()
+        db.add(models.InterviewLog(user_id=user_id, user_prompt="bench", ai_response="bench"))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def async_turn(user_id: int, db_delay: float):
+    async with AsyncSessionLocal() as db:
+        delay = _delay_sql(db_delay)
+        if delay is not None:
+            await db.execute(delay)
+        await db.scalar(select(models.InterviewLog.id).where(models.InterviewLog.user_id == user_id).order_by(models.InterviewLog.id.desc()).limit(1))
+        db.add(models.InterviewLog(user_id=user_id, user_prompt="bench", ai_response="bench"))
+        await db.commit()
+
+
+async def run_mode(name: str, turn, user_id: int, sessions: int, turns: int, db_delay: float):
+    lags = []
+    running = True
+
+    async def probe():
+        while running:
+            started = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+    async def session():
+        for _ in range(turns):
+            await turn(user_id, db_delay)
+            # Jeda kecil seperti menunggu AI / user
+            await asyncio.sleep(0)
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*[session() for _ in range(sessions)])
+    elapsed = time.perf_counter() - started
+    running = False
+    await probe_task
+
+    lags.sort()
+    total = sessions * turns
+    p99 = lags[max(int(len(lags) * 0.99) - 1, 0)] if lags else 0
+    print(f"[{name}] turns={total} elapsed={elapsed:.2f}s throughput={total / elapsed:.1f} turn/s "
+          f"loop_lag p50={statistics.median(lags) * 1000 if lags else 0:.1f}ms p99={p99 * 1000:.1f}ms "
+          f"max={(lags[-1] if lags else 0) * 1000:.1f}ms samples={len(lags)}")
+
+
+async def main_async(args):
+    user_id = seed_user()
+    if args.mode in ("sync", "both"):
+        await run_mode("sync-session", sync_turn, user_id, args.sessions, args.turns, args.db_delay)
+    if args.mode in ("async", "both"):
+        await run_mode("async-session", async_turn, user_id, args.sessions, args.turns, args.db_delay)
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark latensi event loop: Session sync vs AsyncSession")
+    parser.add_argument("--sessions", type=int, default=50, help="Jumlah sesi interview bersamaan")
+    parser.add_argument("--turns", type=int, default=5, help="Giliran per sesi")
+    parser.add_argument("--db-delay", type=float, default=0.0, help="Simulasi round trip DB lambat (detik, PostgreSQL)")
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
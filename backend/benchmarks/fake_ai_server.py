@@ -0,0 +1,97 @@
+"""
+Fake AI service untuk menjalankan alur interview, soal, dan mapping tanpa server model.
+
+Jalankan dari folder backend:
+    uvicorn benchmarks.fake_ai_server:app --port 5055
+lalu arahkan backend ke sana: TIM_AI_URL=http://127.0.0.1:5055
+
+Latensi bisa diatur lewat env:
+    FAKE_AI_DELAY              latensi respons non-streaming (detik, default 0.2)
+    FAKE_AI_JITTER             variasi acak latensi, proporsi dari nilainya (default 0 = tetap)
+    FAKE_AI_FIRST_TOKEN_DELAY  jeda sebelum token pertama saat streaming (default 0)
+    FAKE_AI_TOKEN_DELAY        jeda antar token saat streaming (default 0.01)
+    FAKE_AI_TOKEN_SIZE         jumlah karakter per token (default 4)
+"""
+import asyncio
+import json
+import os
+import random
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+FAKE_AI_DELAY = float(os.getenv("FAKE_AI_DELAY", "0.2"))
+FAKE_AI_JITTER = float(os.getenv("FAKE_AI_JITTER", "0"))
+FAKE_AI_FIRST_TOKEN_DELAY = float(os.getenv("FAKE_AI_FIRST_TOKEN_DELAY", "0"))
+FAKE_AI_TOKEN_DELAY = float(os.getenv("FAKE_AI_TOKEN_DELAY", "0.01"))
+FAKE_AI_TOKEN_SIZE = int(os.getenv("FAKE_AI_TOKEN_SIZE", "4"))
+
+INTERVIEW_ANSWER = (
+    "<think>Menilai jawaban kandidat. "
+    '<RESULT>{"area_fungsi": "Sains Data dan Kecerdasan Artifisial", "level": 2}</RESULT></think>'
+    "Terima kasih. Bisa ceritakan proyek data terakhir yang Anda kerjakan?"
+)
+
+app = FastAPI(title="Fake AI Service")
+
+
+async def _sleep(delay: float):
+    if FAKE_AI_JITTER:
+        delay *= random.uniform(1 - FAKE_AI_JITTER, 1 + FAKE_AI_JITTER)
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+async def _stream_tokens(text: str):
+    await _sleep(FAKE_AI_FIRST_TOKEN_DELAY)
+    for i in range(0, len(text), FAKE_AI_TOKEN_SIZE):
+        yield f"data: {json.dumps({'token': text[i:i + FAKE_AI_TOKEN_SIZE]})}\n\n"
+        await _sleep(FAKE_AI_TOKEN_DELAY)
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/interview")
+async def interview(request: Request):
+    body = await request.json()
+    if body.get("stream"):
+        return StreamingResponse(_stream_tokens(INTERVIEW_ANSWER), media_type="text/event-stream")
+    await _sleep(FAKE_AI_DELAY)
+    return {"success": True, "message": "Interview reply", "data": {"answer": INTERVIEW_ANSWER}}
+
+
+@app.post("/question-generation")
+async def question_generation(request: Request):
+    body = await request.json()
+    await _sleep(FAKE_AI_DELAY)
+    return {
+        "success": True,
+        "message": "Soal berhasil dibuat",
+        "data": {
+            "area_fungsi": body["area_fungsi"],
+            "level_kompetensi": body["level_kompetensi"],
+            "kumpulan_soal": [
+                {
+                    "nomor_soal": i,
+                    "aspek_kritis": "Pemahaman konsep",
+                    "soal": f"Soal {i} untuk {body['area_fungsi']} level {body['level_kompetensi']}?",
+                    "opsi_jawaban": {"a": "Pilihan A", "b": "Pilihan B", "c": "Pilihan C", "d": "Pilihan D"},
+                    "jawaban_benar": "a",
+                }
+                for i in range(1, 11)
+            ],
+        },
+    }
+
+
+@app.post("/talent-mapping")
+async def talent_mapping(request: Request):
+    await request.json()
+    await _sleep(FAKE_AI_DELAY)
+    return {
+        "success": True,
+        "message": "Mapping selesai",
+        "data": {
+            "Sains_Data_Kecerdasan_Artifisial": {"level_kompetensi": 3, "kecocokan": 0.82},
+            "Teknologi_dan_Infrastruktur": {"level_kompetensi": 1, "kecocokan": 0.41},
+            "Tata_Kelola_TI": {"level_kompetensi": 0, "kecocokan": 0.05},
+        },
+    }
@@ -0,0 +1,81 @@
+"""
+Benchmark throughput login (hash/verify password di executor khusus).
+
+Jalankan dari folder backend (DATABASE_URL diarahkan ke DB dev/test):
+    python -m benchmarks.login_throughput --requests 200 --concurrency 50
+
+Bandingkan konfigurasi lewat env, mis. PASSWORD_HASH_EXECUTOR=process PASSWORD_HASH_WORKERS=8.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+import httpx
+
+from app.main import app
+from app import models
+from app.core.db import SessionLocal
+from app.core import security
+
+PASSWORD = "benchmark-password"
+
+
+def seed_user() -> str:
+    db = SessionLocal()
+    try:
+        suffix = uuid.uuid4().hex[:10]
+        user = models.User(
+            username=f"login_bench_{suffix}",
+            email=f"login_bench_{suffix}@dtp.test",
+            hashed_password=security.get_password_hash(PASSWORD),
+        )
+        db.add(user)
+        db.commit()
+        return user.email
+    finally:
+        db.close()
+
+
+async def run(total: int, concurrency: int, email: str):
+    latencies = []
+    statuses = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one_login():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/login", data={"username": email, "password": PASSWORD})
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[one_login() for _ in range(total)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"executor={security.password_hasher.kind} workers={security.password_hasher.workers} "
+          f"schemes={','.join(security.PASSWORD_SCHEMES)} bcrypt_rounds={security.BCRYPT_ROUNDS}")
+    print(f"requests={total} concurrency={concurrency} elapsed={elapsed:.2f}s throughput={total / elapsed:.1f} login/s")
+    print(f"latency p50={statistics.median(latencies) * 1000:.0f}ms "
+          f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f}ms max={latencies[-1] * 1000:.0f}ms")
+    print(f"status={statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark throughput endpoint /login")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    email = seed_user()
+    try:
+        asyncio.run(run(args.requests, args.concurrency, email))
+    finally:
+        security.password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Cek alur job talent mapping end-to-end: submit -> worker -> hasil tersimpan -> poll / SSE / endpoint lama -> reuse hasil.
+
+Jalankan dari folder backend dengan fake AI service (DATABASE_URL diarahkan ke DB dev/test):
+    uvicorn benchmarks.fake_ai_server:app --port 5055 &
+    TIM_AI_URL=http://127.0.0.1:5055 python -m benchmarks.mapping_flow
+
+Exit code 1 jika ada langkah yang gagal.
+"""
+import sys
+import time
+import uuid
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import select, func
+
+from app.main import app
+from app import models
+from app.core.db import SessionLocal
+from app.core.security import create_access_token
+
+
+def seed_profile() -> tuple[str, int]:
+    db = SessionLocal()
+    try:
+        suffix = uuid.uuid4().hex[:10]
+        user = models.User(username=f"mapping_{suffix}", email=f"mapping_{suffix}@dtp.test", hashed_password="-")
+        db.add(user)
+        db.flush()
+        profile = models.Profile(user_id=user.id, nik=suffix, full_name="Mapping Flow", gender="Perempuan",
+                                 birth_date=date(2000, 1, 1))
+        db.add(profile)
+        db.flush()
+        db.add(models.InterviewLog(user_id=user.id, user_prompt="Saya analis data", ai_response="<think>x</think>Baik."))
+        db.commit()
+        return user.email, profile.id
+    finally:
+        db.close()
+
+
+def count_mappings(profile_id: int) -> int:
+    db = SessionLocal()
+    try:
+        return db.scalar(select(func.count()).select_from(models.Mapping).where(models.Mapping.profile_id == profile_id))
+    finally:
+        db.close()
+
+
+def check(name: str, ok: bool, detail=""):
+    print(f"{'OK  ' if ok else 'FAIL'} {name} {detail}")
+    return ok
+
+
+def main() -> int:
+    email, profile_id = seed_profile()
+    results = []
+
+    with TestClient(app) as client:
+        client.headers["Authorization"] = f"Bearer {create_access_token(subject=email)}"
+
+        # 1. Submit job, response langsung (202) tanpa menunggu AI
+        started = time.perf_counter()
+        response = client.post("/ai/mapping/jobs")
+        job = response.json()
+        results.append(check("submit", response.status_code == 202 and job["status"] in ("queued", "running"),
+                             f"status={response.status_code} {(time.perf_counter() - started) * 1000:.0f}ms"))
+
+        # Submit ulang selagi job aktif -> job yang sama
+        again = client.post("/ai/mapping/jobs").json()
+        results.append(check("dedupe", again["job_id"] == job["job_id"]))
+
+        # 2. Long polling sampai selesai
+        response = client.get(f"/ai/mapping/jobs/{job['job_id']}", params={"wait": 30})
+        polled = response.json()
+        results.append(check("poll", polled["status"] == "done" and bool(polled["result"]["data"]), polled["status"]))
+        results.append(check("mapping rows", count_mappings(profile_id) > 0, f"rows={count_mappings(profile_id)}"))
+
+        # 3. Subscribe SSE untuk job yang sudah selesai -> langsung event done
+        with client.stream("GET", f"/ai/mapping/jobs/{job['job_id']}/events") as stream:
+            body = "".join(stream.iter_text())
+        results.append(check("events", "event: done" in body))
+
+        # 4. Endpoint lama tetap mengembalikan MappingResponse
+        response = client.post("/ai/mapping")
+        results.append(check("legacy /ai/mapping", response.status_code == 200 and "data" in response.json(),
+                             f"status={response.status_code}"))
+
+        # Transkrip tidak berubah -> hasil tersimpan dipakai ulang, job langsung selesai tanpa ke AI service
+        rows_before = count_mappings(profile_id)
+        response = client.post("/ai/mapping/jobs")
+        reused = response.json()
+        results.append(check("reuse stored result", reused["status"] == "done"
+                             and reused["result"]["data"] == polled["result"]["data"]
+                             and count_mappings(profile_id) == rows_before, reused["status"]))
+
+        # Job milik user lain tidak bisa dibaca
+        response = client.get("/ai/mapping/jobs/999999999")
+        results.append(check("not found", response.status_code == 404))
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
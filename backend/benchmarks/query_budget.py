@@ -0,0 +1,76 @@
+"""
+Cek jumlah query SQL per endpoint supaya pola N+1 tidak muncul lagi.
+
+Jalankan dari folder backend (DATABASE_URL diarahkan ke DB dev/test):
+    python -m benchmarks.query_budget
+
+Exit code 1 jika ada endpoint yang melebihi budget.
+"""
+import sys
+import uuid
+from datetime import date
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app import models
+from app.core.db import SessionLocal, count_queries
+from app.core.security import create_access_token
+
+# Budget query per request (auth sudah ter-cache oleh request sebelumnya)
+QUERY_BUDGETS = {
+    "/profile/": 1,
+    "/profile/completeness": 1,
+}
+
+
+def seed_profile(db) -> str:
+    suffix = uuid.uuid4().hex[:10]
+    user = models.User(username=f"budget_{suffix}", email=f"budget_{suffix}@dtp.test", hashed_password="-")
+    db.add(user)
+    db.flush()
+
+    profile = models.Profile(
+        user_id=user.id, nik=suffix, full_name="Query Budget", gender="Laki-laki",
+        birth_date=date(2000, 1, 1), phone="0800", address="-", bio="-", skills=["SQL"]
+    )
+    db.add(profile)
+    db.flush()
+
+    # Isi penuh (maks 3 per relasi) supaya lazy load per baris kelihatan
+    for i in range(3):
+        db.add(models.Education(profile_id=profile.id, level="S1", institution_name="Kampus", major="TI", enrollment_year=2015 + i))
+        db.add(models.Experience(profile_id=profile.id, position="Engineer", company_name="PT", job_type="Kerja",
+                                 functional_area="Teknologi dan Infrastruktur", start_date=date(2020, 1, 1), description="-"))
+        db.add(models.Certification(profile_id=profile.id, name=f"Sertifikat {i}", organizer="Org", year=date.today().year,
+                                    proof_url="-", description="-", bidang_keahlian="Data"))
+    db.commit()
+    return user.email
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        email = seed_profile(db)
+    finally:
+        db.close()
+
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {create_access_token(subject=email)}"
+
+    failed = False
+    for path, budget in QUERY_BUDGETS.items():
+        client.get(path)  # warm-up (cache auth)
+        with count_queries() as statements:
+            response = client.get(path)
+        status = "OK" if len(statements) <= budget else "OVER BUDGET"
+        print(f"{path:<30} status={response.status_code} queries={len(statements)} budget={budget} {status}")
+        if response.status_code != 200 or len(statements) > budget:
+            failed = True
+            for statement in statements:
+                print(f"    {statement.splitlines()[0][:120]}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
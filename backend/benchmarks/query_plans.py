@@ -0,0 +1,180 @@
+"""
+Cek rencana eksekusi (EXPLAIN) query yang paling sering jalan: semuanya harus memakai index, bukan full scan.
+
+Jalankan dari folder backend setelah migrasi (DATABASE_URL diarahkan ke DB dev/test, SQLite atau PostgreSQL):
+    alembic upgrade head
+    python -m benchmarks.query_plans --users 2000
+
+Data dummy di-seed dulu (lalu ANALYZE) supaya planner PostgreSQL punya statistik yang realistis.
+Exit code 1 jika ada query yang tidak memakai index.
+"""
+import argparse
+import json
+import random
+import sys
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import select, insert, inspect, text
+
+from app import models
+from app.core.db import engine
+
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan", "Bitmap Heap Scan"}
+
+
+def seed(users: int, logs_per_user: int) -> dict:
+    rng = random.Random(7)
+    run = uuid.uuid4().hex[:8]
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        user_ids = [row[0] for row in conn.execute(insert(models.User).returning(models.User.id), [
+            {"username": f"plan_{run}_{i}", "email": f"plan_{run}_{i}@dtp.test", "hashed_password": "-"}
+            for i in range(users)
+        ])]
+        profile_ids = [row[0] for row in conn.execute(insert(models.Profile).returning(models.Profile.id), [
+            {"user_id": user_id, "nik": f"{run}{i:08d}", "full_name": f"Plan {i}", "gender": "Perempuan",
+             "birth_date": date(2000, 1, 1)}
+            for i, user_id in enumerate(user_ids)
+        ])]
+
+        conn.execute(insert(models.Education), [
+            {"profile_id": pid, "level": "S1", "institution_name": "Universitas", "major": "Informatika",
+             "enrollment_year": 2018}
+            for pid in profile_ids
+        ])
+        conn.execute(insert(models.Certification), [
+            {"profile_id": pid, "name": "Sertifikat", "organizer": "Lembaga", "year": 2023}
+            for pid in profile_ids
+        ])
+        conn.execute(insert(models.Experience), [
+            {"profile_id": pid, "position": "Analis", "company_name": "PT Contoh", "job_type": "Fulltime",
+             "start_date": date(2022, 1, 1)}
+            for pid in profile_ids
+        ])
+        conn.execute(insert(models.InterviewLog), [
+            {"user_id": user_id, "user_prompt": f"Pesan {turn}", "ai_response": "Baik.",
+             "created_at": now - timedelta(minutes=logs_per_user - turn)}
+            for user_id in user_ids for turn in range(logs_per_user)
+        ])
+        conn.execute(insert(models.AssessmentResult), [
+            {"profile_id": pid, "score": rng.random() * 100, "threshold": 70, "raw_data": {"status": "lulus"},
+             "created_at": now - timedelta(days=attempt)}
+            for pid in profile_ids for attempt in range(2)
+        ])
+        conn.execute(insert(models.CompetencyStatus), [
+            {"profile_id": pid, "area_fungsi": area, "status": rng.choice(["lulus", "gagal"]), "score": 80}
+            for pid in profile_ids for area in ("DSC", "TKTI", "CYBER")
+        ])
+        conn.execute(insert(models.Mapping), [
+            {"profile_id": pid, "sumber": "ai_interview", "area_fungsi": area, "level_kompetensi": 2,
+             "confidence": 0.5, "transcript_hash": uuid.uuid4().hex * 2}
+            for pid in profile_ids for area in ("DSC", "TKTI")
+        ])
+        conn.execute(insert(models.MappingJob), [
+            {"user_id": user_id, "profile_id": pid, "status": "done", "attempts": 1}
+            for user_id, pid in zip(user_ids, profile_ids)
+        ])
+        conn.execute(insert(models.QuestionBankItem), [
+            {"area_fungsi": f"Area {area}", "level_kompetensi": level, "content_hash": uuid.uuid4().hex * 2,
+             "soal": "Soal?", "opsi_jawaban": {"a": "A"}, "jawaban_benar": "a"}
+            for area in range(10) for level in range(1, 10) for _ in range(max(1, users // 200))
+        ])
+        conn.execute(text("ANALYZE"))
+
+    index = rng.randrange(users)
+    return {"user_id": user_ids[index], "profile_id": profile_ids[index], "email": f"plan_{run}_{index}@dtp.test"}
+
+
+def hot_queries(sample: dict) -> list[tuple[str, list[str], object]]:
+    user_id, profile_id = sample["user_id"], sample["profile_id"]
+    Log = models.InterviewLog
+    # (nama, tabel yang wajib lewat index, statement) - bentuk query sama dengan yang dipakai aplikasi
+    return [
+        ("auth user + profile", ["users", "profiles"],
+         select(models.User.id, models.User.email, models.User.username, models.Profile.id)
+         .outerjoin(models.Profile, models.Profile.user_id == models.User.id)
+         .where(models.User.email == sample["email"])),
+        ("profile by user", ["profiles"], select(models.Profile).where(models.Profile.user_id == user_id)),
+        ("educations", ["educations"], select(models.Education).where(models.Education.profile_id == profile_id)),
+        ("certifications", ["certifications"],
+         select(models.Certification).where(models.Certification.profile_id == profile_id)),
+        ("experiences", ["experiences"], select(models.Experience).where(models.Experience.profile_id == profile_id)),
+        ("interview history page", ["interview_logs"],
+         select(Log.id, Log.user_prompt, Log.ai_response).where(Log.user_id == user_id)
+         .order_by(Log.created_at.desc(), Log.id.desc()).limit(201)),
+        ("interview transcript", ["interview_logs"],
+         select(Log).where(Log.user_id == user_id).order_by(Log.created_at.asc(), Log.id.asc())),
+        ("competency statuses", ["competency_statuses"],
+         select(models.CompetencyStatus.area_fungsi, models.CompetencyStatus.status)
+         .where(models.CompetencyStatus.profile_id == profile_id)),
+        ("stored mapping", ["mappings"],
+         select(models.Mapping).where(models.Mapping.profile_id == profile_id,
+                                      models.Mapping.transcript_hash == "0" * 64)),
+        ("question bank", ["question_bank"],
+         select(models.QuestionBankItem).where(models.QuestionBankItem.area_fungsi == "Area 3",
+                                               models.QuestionBankItem.level_kompetensi == 2)),
+        ("mapping job claim", ["mapping_jobs"],
+         select(models.MappingJob).where(models.MappingJob.status == "queued")
+         .order_by(models.MappingJob.id).limit(1)),
+    ]
+
+
+def _compile(statement) -> str:
+    return str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+
+
+def sqlite_plan(conn, statement, tables: list[str]) -> tuple[bool, str]:
+    rows = conn.execute(text("EXPLAIN QUERY PLAN " + _compile(statement))).fetchall()
+    details = [row[-1] for row in rows]
+    # "SEARCH <tabel> USING ... INDEX" = lookup index; "SCAN <tabel>" = baca seluruh tabel / index
+    ok = all(any(d.startswith(f"SEARCH {table} ") for d in details) for table in tables)
+    return ok, " | ".join(details)
+
+
+def _pg_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _pg_nodes(child)
+
+
+def postgres_plan(conn, statement, tables: list[str]) -> tuple[bool, str]:
+    raw = conn.execute(text("EXPLAIN (FORMAT JSON) " + _compile(statement))).scalar()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    nodes = list(_pg_nodes(plan))
+    ok = all(
+        any(n.get("Relation Name") == table and n["Node Type"] in INDEX_NODES for n in nodes)
+        and not any(n.get("Relation Name") == table and n["Node Type"] == "Seq Scan" for n in nodes)
+        for table in tables
+    )
+    return ok, " > ".join(
+        f"{n['Node Type']}" + (f" on {n['Relation Name']}" if "Relation Name" in n else "")
+        + (f" using {n['Index Name']}" if "Index Name" in n else "")
+        for n in nodes
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000, help="Jumlah user + profile dummy yang di-seed")
+    parser.add_argument("--logs-per-user", type=int, default=10)
+    args = parser.parse_args()
+
+    missing = [t for t in models.Base.metadata.tables if not inspect(engine).has_table(t)]
+    if missing:
+        print(f"Tabel belum ada ({', '.join(missing)}), jalankan `alembic upgrade head` dulu")
+        return 1
+
+    sample = seed(args.users, args.logs_per_user)
+    explain = postgres_plan if engine.dialect.name == "postgresql" else sqlite_plan
+
+    failed = 0
+    with engine.connect() as conn:
+        for name, tables, statement in hot_queries(sample):
+            ok, plan = explain(conn, statement, tables)
+            failed += not ok
+            print(f"{'OK  ' if ok else 'FAIL'} {name:<24} {plan}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Micro-benchmark sanitizer respons AI: versi regex lama vs sanitize_response (satu scan),
+dan patch status RESULT di /ai/history (regex + json per request vs payload tersimpan).
+
+Tidak butuh DB / AI service. Jalankan dari folder backend:
+    python -m benchmarks.response_sanitizer --turns 200 --think-chars 4000 --repeat 20
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import time
+
+from app.services.response_sanitizer import sanitize_response, render_result
+
+STATUS = "Lulus"
+
+
+def legacy_clean_think_tag(text: str) -> str:
+    if not text:
+        return ""
+    result_match = re.search(r'<RESULT>.*?</RESULT>', text, flags=re.DOTALL)
+    result_content = result_match.group(0) if result_match else None
+    cleaned = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL)
+    if result_content and "<RESULT>" not in cleaned:
+        cleaned = cleaned.strip() + "\n\n" + result_content
+    return cleaned.strip()
+
+
+def legacy_patch_status(ai_response: str, status: str) -> str:
+    pattern = r"<RESULT>(.*?)</RESULT>"
+    match = re.search(pattern, ai_response, re.DOTALL)
+    if not match:
+        return ai_response
+    data = json.loads(match.group(1))
+    data['status'] = status
+    return re.sub(pattern, f"<RESULT>{json.dumps(data)}</RESULT>", ai_response, flags=re.DOTALL)
+
+
+def build_responses(turns: int, think_chars: int) -> list[str]:
+    rng = random.Random(42)
+    words = ["data", "model", "pipeline", "analisis", "kompetensi", "proyek", "dashboard", "python"]
+    responses = []
+    for turn in range(turns):
+        think = " ".join(rng.choice(words) for _ in range(think_chars // 8))
+        answer = " ".join(rng.choice(words) for _ in range(60))
+        # Tiap beberapa giliran AI menyimpulkan level di dalam blok <think>
+        if turn % 5 == 4:
+            result = json.dumps({"area_fungsi": "Sains Data dan Kecerdasan Artifisial", "level": turn % 4 + 1})
+            think += f" <RESULT>{result}</RESULT>"
+        responses.append(f"<think>{think}</think>\n{answer}?")
+    return responses
+
+
+def measure(func, items, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            func(item)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def report(name: str, legacy: float, current: float, count: int):
+    print(f"{name:<22} legacy {legacy * 1000:8.2f} ms   baru {current * 1000:8.2f} ms   "
+          f"({count} item, {legacy / current if current else float('inf'):.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200, help="Jumlah giliran interview per transkrip")
+    parser.add_argument("--think-chars", type=int, default=4000, help="Perkiraan panjang blok <think> per giliran")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    responses = build_responses(args.turns, args.think_chars)
+    sanitized = [sanitize_response(text) for text in responses]
+    for text, item in zip(responses, sanitized):
+        assert item.text == legacy_clean_think_tag(text), "Hasil sanitizer berbeda dengan versi lama"
+
+    # Sisi tulis: membersihkan jawaban AI (di versi lama sekaligus dipakai ulang saat membangun transkrip)
+    legacy = measure(legacy_clean_think_tag, responses, args.repeat)
+    current = measure(sanitize_response, responses, args.repeat)
+    report("sanitize", legacy, current, len(responses))
+
+    # Sisi baca: patch status di semua log yang berisi RESULT setiap kali history diambil
+    stored = [(item.text, item.result) for item in sanitized if item.result is not None]
+    for text, result in stored:
+        assert render_result(text, result, STATUS) == legacy_patch_status(text, STATUS)
+    legacy = measure(lambda row: legacy_patch_status(row[0], STATUS), stored, args.repeat)
+    current = measure(lambda row: render_result(row[0], row[1], STATUS), stored, args.repeat)
+    report("history status patch", legacy, current, len(stored))
+
+
+if __name__ == "__main__":
+    main()
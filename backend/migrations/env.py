@@ -0,0 +1,26 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.db import engine, Base
+from app import models  # noqa: F401  (daftarkan semua tabel ke Base.metadata)
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_online() -> None:
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    # Migrasi memeriksa skema yang sudah ada (tabel / kolom / index) sebelum mengubahnya
+    raise SystemExit("Mode offline (--sql) tidak didukung: migrasi butuh koneksi ke database")
+run_migrations_online()
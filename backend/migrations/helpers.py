@@ -0,0 +1,56 @@
+"""
+Helper migrasi yang idempotent.
+Database lama dibuat lewat Base.metadata.create_all, jadi sebagian tabel / index mungkin sudah ada:
+setiap perubahan dicek dulu ke skema yang sebenarnya.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+def _inspector():
+    # Inspector baru setiap kali: cache inspector lama tidak melihat perubahan di migrasi yang sama
+    return sa.inspect(op.get_bind())
+
+
+def is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def has_table(table: str) -> bool:
+    return _inspector().has_table(table)
+
+
+def has_column(table: str, column: str) -> bool:
+    return any(col["name"] == column for col in _inspector().get_columns(table))
+
+
+def has_index(table: str, name: str) -> bool:
+    return any(index["name"] == name for index in _inspector().get_indexes(table))
+
+
+def create_table_if_missing(table: str, *columns, **kwargs) -> bool:
+    if has_table(table):
+        return False
+    op.create_table(table, *columns, **kwargs)
+    return True
+
+
+def add_column_if_missing(table: str, column: sa.Column):
+    if not has_column(table, column.name):
+        op.add_column(table, column)
+
+
+def create_index_if_missing(name: str, table: str, columns: list[str], unique: bool = False):
+    if has_index(table, name):
+        return
+    if is_postgresql():
+        # CONCURRENTLY supaya tabel yang sedang dipakai tidak terkunci selama index dibangun
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+    else:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def drop_index_if_exists(name: str, table: str):
+    if has_table(table) and has_index(table, name):
+        op.drop_index(name, table_name=table)
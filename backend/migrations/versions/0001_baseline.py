@@ -0,0 +1,183 @@
+"""baseline: skema awal yang sebelumnya dibuat lewat create_all
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+
+Database yang sudah berjalan sudah punya tabel-tabel ini, jadi setiap tabel hanya dibuat kalau belum ada.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_table_if_missing, create_index_if_missing, has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_baseline'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Urutan pembuatan (tabel induk dulu); downgrade berjalan terbalik
+TABLES = [
+    "users", "profiles", "educations", "certifications", "experiences", "mappings",
+    "assessment_attempts", "assessment_answers", "assessments", "final_levels", "interview_logs",
+]
+
+
+def _id_column() -> sa.Column:
+    return sa.Column("id", sa.Integer(), primary_key=True)
+
+
+def _created_at() -> sa.Column:
+    return sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    create_table_if_missing(
+        "users",
+        _id_column(),
+        sa.Column("username", sa.String()),
+        sa.Column("email", sa.String()),
+        sa.Column("hashed_password", sa.String()),
+    )
+    create_index_if_missing("ix_users_username", "users", ["username"], unique=True)
+    create_index_if_missing("ix_users_email", "users", ["email"], unique=True)
+
+    create_table_if_missing(
+        "profiles",
+        _id_column(),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("nik", sa.String(), unique=True),
+        sa.Column("full_name", sa.String()),
+        sa.Column("gender", sa.String()),
+        sa.Column("birth_date", sa.Date()),
+        sa.Column("phone", sa.String()),
+        sa.Column("linkedin_url", sa.String(), nullable=True),
+        sa.Column("portfolio_url", sa.String(), nullable=True),
+        sa.Column("address", sa.Text()),
+        sa.Column("bio", sa.Text()),
+        sa.Column("avatar_url", sa.String()),
+        sa.Column("skills", sa.JSON()),
+        sa.Column("instagram_username", sa.String(), nullable=True),
+        _created_at(),
+    )
+
+    create_table_if_missing(
+        "educations",
+        _id_column(),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id")),
+        sa.Column("level", sa.String()),
+        sa.Column("institution_name", sa.String()),
+        sa.Column("faculty", sa.String(), nullable=True),
+        sa.Column("major", sa.String()),
+        sa.Column("enrollment_year", sa.Integer()),
+        sa.Column("graduation_year", sa.Integer(), nullable=True),
+        sa.Column("is_current", sa.Boolean()),
+        sa.Column("gpa", sa.String(), nullable=True),
+        sa.Column("final_project_title", sa.String(), nullable=True),
+    )
+
+    create_table_if_missing(
+        "certifications",
+        _id_column(),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id")),
+        sa.Column("name", sa.String()),
+        sa.Column("organizer", sa.String()),
+        sa.Column("year", sa.Integer()),
+        sa.Column("proof_url", sa.String()),
+        sa.Column("description", sa.Text()),
+        sa.Column("bidang_keahlian", sa.String(), nullable=True),
+    )
+
+    create_table_if_missing(
+        "experiences",
+        _id_column(),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id")),
+        sa.Column("position", sa.String()),
+        sa.Column("company_name", sa.String()),
+        sa.Column("job_type", sa.String()),
+        sa.Column("functional_area", sa.String()),
+        sa.Column("start_date", sa.Date()),
+        sa.Column("end_date", sa.Date(), nullable=True),
+        sa.Column("is_current", sa.Boolean()),
+        sa.Column("description", sa.Text()),
+    )
+
+    create_table_if_missing(
+        "mappings",
+        _id_column(),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id")),
+        sa.Column("sumber", sa.String()),
+        sa.Column("okupasi", sa.String()),
+        sa.Column("area_fungsi", sa.String()),
+        sa.Column("confidence", sa.Float()),
+        sa.Column("is_revised", sa.Boolean()),
+        sa.Column("note", sa.Text()),
+        _created_at(),
+    )
+
+    create_table_if_missing(
+        "assessment_attempts",
+        _id_column(),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id")),
+        sa.Column("status", sa.String()),
+        sa.Column("started_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("submitted_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    create_table_if_missing(
+        "assessment_answers",
+        _id_column(),
+        sa.Column("attempt_id", sa.Integer(), sa.ForeignKey("assessment_attempts.id")),
+        sa.Column("question_no", sa.Integer()),
+        sa.Column("question_text", sa.Text()),
+        sa.Column("options", sa.JSON()),
+        sa.Column("chosen_option", sa.String()),
+        sa.Column("correct_option", sa.String()),
+        sa.Column("is_correct", sa.Boolean()),
+    )
+
+    create_table_if_missing(
+        "assessments",
+        _id_column(),
+        sa.Column("attempt_id", sa.Integer(), sa.ForeignKey("assessment_attempts.id")),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id")),
+        sa.Column("score", sa.Float()),
+        sa.Column("threshold", sa.Float()),
+        sa.Column("raw_data", sa.JSON()),
+        _created_at(),
+    )
+
+    create_table_if_missing(
+        "final_levels",
+        _id_column(),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id")),
+        sa.Column("level", sa.String()),
+        sa.Column("rekomendasi_belajar", sa.Text()),
+        sa.Column("rekomendasi_pekerjaan", sa.Text()),
+        _created_at(),
+    )
+
+    create_table_if_missing(
+        "interview_logs",
+        _id_column(),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("user_prompt", sa.Text(), nullable=False),
+        sa.Column("ai_response", sa.Text(), nullable=False),
+        _created_at(),
+    )
+
+    # Index primary key bawaan model lama (Column(..., index=True))
+    for table in TABLES:
+        create_index_if_missing(f"ix_{table}_id", table, ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(TABLES):
+        if has_table(table):
+            op.drop_table(table)
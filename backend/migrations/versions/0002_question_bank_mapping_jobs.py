@@ -0,0 +1,84 @@
+"""bank soal, antrian job mapping, dan kolom hasil AI tersimpan
+
+Revision ID: 0002_question_bank_mapping_jobs
+Revises: 0001_baseline
+Create Date: 2026-10-17
+
+Tabel baru sudah ikut dibuat create_all di database yang sempat menjalankan versi aplikasi terbaru,
+tetapi kolom baru di tabel lama (mappings, interview_logs) belum: create_all tidak pernah menambah kolom.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import (
+    create_table_if_missing, add_column_if_missing, create_index_if_missing, drop_index_if_exists,
+    has_table, has_column
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_question_bank_mapping_jobs'
+down_revision: Union[str, Sequence[str], None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    create_table_if_missing(
+        "question_bank",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("area_fungsi", sa.String(), nullable=False),
+        sa.Column("level_kompetensi", sa.Integer(), nullable=False),
+        sa.Column("content_hash", sa.String(64), nullable=False, unique=True),
+        sa.Column("aspek_kritis", sa.Text()),
+        sa.Column("soal", sa.Text(), nullable=False),
+        sa.Column("opsi_jawaban", sa.JSON(), nullable=False),
+        sa.Column("jawaban_benar", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    create_index_if_missing("ix_question_bank_id", "question_bank", ["id"])
+    create_index_if_missing("ix_question_bank_area_level", "question_bank", ["area_fungsi", "level_kompetensi"])
+
+    create_table_if_missing(
+        "mapping_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id"), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("error_status", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    create_index_if_missing("ix_mapping_jobs_id", "mapping_jobs", ["id"])
+    create_index_if_missing("ix_mapping_jobs_status_id", "mapping_jobs", ["status", "id"])
+    create_index_if_missing("ix_mapping_jobs_user_status", "mapping_jobs", ["user_id", "status"])
+
+    add_column_if_missing("mappings", sa.Column("level_kompetensi", sa.Integer(), nullable=True))
+    add_column_if_missing("mappings", sa.Column("transcript_hash", sa.String(64), nullable=True))
+    create_index_if_missing("ix_mappings_profile_transcript", "mappings", ["profile_id", "transcript_hash"])
+
+    add_column_if_missing("interview_logs", sa.Column("result_payload", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if has_column("interview_logs", "result_payload"):
+        with op.batch_alter_table("interview_logs") as batch:
+            batch.drop_column("result_payload")
+
+    drop_index_if_exists("ix_mappings_profile_transcript", "mappings")
+    if has_column("mappings", "transcript_hash"):
+        with op.batch_alter_table("mappings") as batch:
+            batch.drop_column("transcript_hash")
+            batch.drop_column("level_kompetensi")
+
+    for table in ("mapping_jobs", "question_bank"):
+        if has_table(table):
+            op.drop_table(table)
@@ -0,0 +1,57 @@
+"""index untuk query yang paling sering jalan
+
+Revision ID: 0003_hot_query_indexes
+Revises: 0002_question_bank_mapping_jobs
+Create Date: 2026-10-17
+
+- profiles.user_id (unique): join user -> profile di setiap request terautentikasi
+- educations / certifications / experiences.profile_id: halaman profile lengkap
+- interview_logs (user_id, created_at, id): history, transkrip mapping, cache percakapan
+- assessments (profile_id, created_at): hasil assessment terbaru per profile
+Di PostgreSQL index dibangun CONCURRENTLY supaya tabel tidak terkunci.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_if_missing, drop_index_if_exists
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_hot_query_indexes'
+down_revision: Union[str, Sequence[str], None] = '0002_question_bank_mapping_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_educations_profile_id", "educations", ["profile_id"]),
+    ("ix_certifications_profile_id", "certifications", ["profile_id"]),
+    ("ix_experiences_profile_id", "experiences", ["profile_id"]),
+    ("ix_interview_logs_user_created", "interview_logs", ["user_id", "created_at", "id"]),
+    ("ix_assessments_profile_created", "assessments", ["profile_id", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT user_id, COUNT(*) FROM profiles WHERE user_id IS NOT NULL GROUP BY user_id HAVING COUNT(*) > 1"
+    )).fetchall()
+    if duplicates:
+        user_ids = ", ".join(str(row[0]) for row in duplicates[:20])
+        raise RuntimeError(
+            f"Ada user dengan lebih dari satu profile (user_id: {user_ids}). "
+            "Rapikan data tersebut dulu sebelum index unik profiles.user_id dibuat."
+        )
+    create_index_if_missing("ux_profiles_user_id", "profiles", ["user_id"], unique=True)
+
+    for name, table, columns in INDEXES:
+        create_index_if_missing(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        drop_index_if_exists(name, table)
+    drop_index_if_exists("ux_profiles_user_id", "profiles")
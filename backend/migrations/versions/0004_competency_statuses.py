@@ -0,0 +1,120 @@
+"""status kompetensi per profile per area
+
+Revision ID: 0004_competency_statuses
+Revises: 0003_hot_query_indexes
+Create Date: 2026-10-17
+
+Diisi awal dari hasil assessment yang sudah ada: per (profile, area) diambil hasil terbaru.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_table_if_missing, create_index_if_missing, has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_competency_statuses'
+down_revision: Union[str, Sequence[str], None] = '0003_hot_query_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 1000
+
+# Salinan app.services.competency_status.area_code saat migrasi ini dibuat (migrasi tidak meng-import kode app):
+# key hasil backfill harus sama dengan key yang dipakai submit assessment & /ai/history
+AREA_CODES = ("DSC", "TKTI", "PPD", "CYBER", "TI", "LTI")
+AREA_ALIASES = [
+    ("sains data", "DSC"),
+    ("kecerdasan artifisial", "DSC"),
+    ("data science", "DSC"),
+    ("tata kelola", "TKTI"),
+    ("governance", "TKTI"),
+    ("produk digital", "PPD"),
+    ("digital product", "PPD"),
+    ("keamanan informasi", "CYBER"),
+    ("siber", "CYBER"),
+    ("cyber", "CYBER"),
+    ("layanan ti", "LTI"),
+    ("layanan teknologi", "LTI"),
+    ("infrastruktur", "TI"),
+    ("data", "DSC"),
+]
+
+
+def _area_code(name) -> str | None:
+    if not name:
+        return None
+    name = str(name)
+    key = name.strip().upper()
+    if key in AREA_CODES:
+        return key
+    text = name.replace("_", " ").lower()
+    for needle, code in AREA_ALIASES:
+        if needle in text:
+            return code
+    return None
+
+
+def _backfill():
+    bind = op.get_bind()
+    assessments = sa.table(
+        "assessments",
+        sa.column("id", sa.Integer), sa.column("profile_id", sa.Integer), sa.column("score", sa.Float),
+        sa.column("raw_data", sa.JSON), sa.column("created_at", sa.DateTime(timezone=True)),
+    )
+    statuses = sa.table(
+        "competency_statuses",
+        sa.column("profile_id", sa.Integer), sa.column("area_fungsi", sa.String), sa.column("status", sa.String),
+        sa.column("score", sa.Float), sa.column("assessment_id", sa.Integer),
+        sa.column("updated_at", sa.DateTime(timezone=True)),
+    )
+    if bind.execute(sa.select(sa.func.count()).select_from(statuses)).scalar():
+        return
+
+    latest = {}
+    rows = bind.execute(
+        sa.select(assessments.c.id, assessments.c.profile_id, assessments.c.score, assessments.c.raw_data,
+                  assessments.c.created_at)
+        .where(assessments.c.profile_id.is_not(None))
+        .order_by(assessments.c.created_at, assessments.c.id)
+    )
+    for row in rows:
+        raw_data = row.raw_data or {}
+        area, status = _area_code(raw_data.get("area")), raw_data.get("status")
+        # Area yang tidak dikenali dilewati: key-nya tidak akan pernah dicari runtime
+        if area and status:
+            latest[(row.profile_id, area)] = {
+                "profile_id": row.profile_id, "area_fungsi": area, "status": status,
+                "score": row.score, "assessment_id": row.id, "updated_at": row.created_at,
+            }
+
+    values = list(latest.values())
+    for start in range(0, len(values), BACKFILL_BATCH):
+        bind.execute(statuses.insert(), values[start:start + BACKFILL_BATCH])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    create_table_if_missing(
+        "competency_statuses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id"), nullable=False),
+        sa.Column("area_fungsi", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("score", sa.Float()),
+        sa.Column("assessment_id", sa.Integer(), sa.ForeignKey("assessments.id"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    create_index_if_missing("ix_competency_statuses_id", "competency_statuses", ["id"])
+    create_index_if_missing(
+        "ux_competency_statuses_profile_area", "competency_statuses", ["profile_id", "area_fungsi"], unique=True
+    )
+    _backfill()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if has_table("competency_statuses"):
+        op.drop_table("competency_statuses")
@@ -0,0 +1,34 @@
+"""penanda thumbnail avatar sudah lengkap
+
+Revision ID: 0005_avatar_variants_ready
+Revises: 0004_competency_statuses
+Create Date: 2026-10-17
+
+profiles.avatar_variants_object diisi generate_avatar_variants setelah semua thumbnail ada di MinIO.
+Avatar lama tetap kosong sampai `python -m app.backfill_avatars` dijalankan.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, has_column
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_avatar_variants_ready'
+down_revision: Union[str, Sequence[str], None] = '0004_competency_statuses'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    add_column_if_missing("profiles", sa.Column("avatar_variants_object", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if has_column("profiles", "avatar_variants_object"):
+        with op.batch_alter_table("profiles") as batch:
+            batch.drop_column("avatar_variants_object")